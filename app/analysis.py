@@ -0,0 +1,210 @@
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+from pydantic import BaseModel
+from spacy.tokens import Doc
+from .exceptions import MissingStyleGuideError
+from .models import (
+    GrammarEdit, GrammarResponse, SentimentResponse, StyleIssue, StyleResponse, TextAnalysisResponse
+)
+from .pipeline import parse, parse_many
+from .processors.grammar_enhancement import GrammarEnhancer
+from .processors.sentiment_analyzer import SentimentAnalyzer, SentimentScore
+from .processors.style_guide import StyleGuideName, StyleGuideProcessor, StyleViolation, guide_name
+from .processors.text_edits import EditOp, OffsetMap
+
+# Analysis kinds, one per single-text endpoint
+ANALYZE = "analyze"
+GRAMMAR = "grammar"
+STYLE = "style"
+SENTIMENT = "sentiment"
+
+ANALYSIS_KINDS = (ANALYZE, GRAMMAR, STYLE, SENTIMENT)
+
+# A request to analyze one text: (kind, text, style guide)
+AnalysisTask = Tuple[str, str, Optional[StyleGuideName]]
+
+# The outcome of one task: (result, error message)
+AnalysisOutcome = Tuple[Optional[BaseModel], Optional[str]]
+
+# Initialize processors
+grammar_enhancer = GrammarEnhancer()
+sentiment_analyzer = SentimentAnalyzer()
+style_processor = StyleGuideProcessor()
+
+MISSING_STYLE_GUIDE = "Style guide type must be specified"
+
+
+def build_grammar_response(text: str, enhanced_text: str, issues: List[Dict],
+                           edits: Sequence[EditOp] = ()) -> GrammarResponse:
+    """Build the grammar response for a text, its detected issues and the fixes applied."""
+    word_count = len(text.split())
+    improvement_score = len(issues) / word_count if word_count else 0.0
+    offset_map = OffsetMap(edits)
+    grammar_edits = [
+        GrammarEdit(
+            rule=edit.source,
+            start=edit.start,
+            end=edit.end,
+            enhanced_start=offset_map.map(edit.start),
+            enhanced_end=offset_map.map(edit.end, right=True),
+            replacement=edit.replacement
+        )
+        for edit in edits
+    ]
+    return GrammarResponse(
+        original_text=text,
+        enhanced_text=enhanced_text,
+        issues=issues,
+        improvement_score=1 - improvement_score,
+        edits=grammar_edits
+    )
+
+
+def build_style_response(text: str, style_guide: StyleGuideName, violations: List[StyleViolation]) -> StyleResponse:
+    """Build the style response, scoring compliance from violation severities."""
+    violation_weight = sum(v.severity for v in violations)
+    max_possible_weight = len(violations) * 3  # max severity is 3
+    compliance_score = 1 - (violation_weight / max_possible_weight if max_possible_weight > 0 else 0)
+    return StyleResponse(
+        original_text=text,
+        issues=[StyleIssue(**v.__dict__) for v in violations],
+        style_guide_type=guide_name(style_guide),
+        compliance_score=compliance_score
+    )
+
+
+def build_sentiment_response(text: str, sentiment_score: SentimentScore) -> SentimentResponse:
+    """Build the sentiment response from a computed sentiment score."""
+    return SentimentResponse(
+        text=text,
+        polarity=sentiment_score.polarity,
+        subjectivity=sentiment_score.subjectivity,
+        objectivity=sentiment_score.objectivity,
+        emotional_tone=sentiment_score.emotional_tone,
+        summary=sentiment_analyzer.get_sentiment_summary(sentiment_score)
+    )
+
+
+def style_guide_exists(style_guide: StyleGuideName) -> bool:
+    """Whether a built-in or loaded guide has this name."""
+    return style_processor.has_guide(style_guide)
+
+
+def style_guide_version(style_guide: Optional[StyleGuideName]) -> Optional[str]:
+    """Content hash of a guide, so results computed with an older version can be told apart."""
+    if style_guide is None or not style_processor.has_guide(style_guide):
+        return None
+    return style_processor.guide_version(style_guide)
+
+
+def analysis_components(kind: str, style_guide: Optional[StyleGuideName] = None) -> FrozenSet[str]:
+    """Return the pipeline capabilities needed for one analysis."""
+    if kind == GRAMMAR:
+        return grammar_enhancer.required_components
+    if kind == SENTIMENT:
+        return sentiment_analyzer.required_components
+    if kind == STYLE:
+        if style_guide is None:
+            return frozenset()
+        return style_processor.required_components(style_guide)
+    if kind == ANALYZE:
+        components = grammar_enhancer.required_components | sentiment_analyzer.required_components
+        if style_guide:
+            components |= style_processor.required_components(style_guide)
+        return components
+    raise ValueError(f"Unknown analysis kind: {kind}")
+
+
+def needs_parse(kind: str, style_guide: Optional[StyleGuideName] = None) -> bool:
+    """Whether an analysis needs a parsed Doc; lexical-only style checks don't."""
+    if kind == STYLE:
+        return style_guide is not None and style_processor.needs_doc(style_guide)
+    return True
+
+
+def analyze_doc(kind: str, doc: Doc, style_guide: Optional[StyleGuideName] = None) -> BaseModel:
+    """Run one analysis over an already parsed Doc."""
+    text = doc.text
+    if kind == GRAMMAR:
+        enhancement = grammar_enhancer.enhance(doc)
+        return build_grammar_response(text, enhancement.enhanced_text, enhancement.issues, enhancement.edits)
+    if kind == SENTIMENT:
+        return build_sentiment_response(text, sentiment_analyzer.analyze_sentiment(doc))
+    if kind == STYLE:
+        if style_guide is None:
+            raise MissingStyleGuideError(MISSING_STYLE_GUIDE)
+        return build_style_response(text, style_guide, style_processor.check_style(doc, style_guide))
+    if kind == ANALYZE:
+        enhancement = grammar_enhancer.enhance(doc)
+        style_response = None
+        if style_guide:
+            style_response = build_style_response(text, style_guide, style_processor.check_style(doc, style_guide))
+        return TextAnalysisResponse(
+            grammar=build_grammar_response(text, enhancement.enhanced_text, enhancement.issues, enhancement.edits),
+            style=style_response,
+            sentiment=build_sentiment_response(text, sentiment_analyzer.analyze_sentiment(doc))
+        )
+    raise ValueError(f"Unknown analysis kind: {kind}")
+
+
+def analyze_text(kind: str, text: str, style_guide: Optional[StyleGuideName] = None) -> BaseModel:
+    """Parse ``text`` once with the components ``kind`` needs and analyze it."""
+    if kind == STYLE and style_guide is None:
+        raise MissingStyleGuideError(MISSING_STYLE_GUIDE)
+    if not needs_parse(kind, style_guide):
+        return build_style_response(text, style_guide, style_processor.check_style(text, style_guide))
+    return analyze_doc(kind, parse(text, analysis_components(kind, style_guide)), style_guide)
+
+
+def analyze_batch(tasks: Sequence[AnalysisTask], batch_size: Optional[int] = None) -> List[AnalysisOutcome]:
+    """Analyze many texts with one batched ``nlp.pipe`` pass.
+
+    Results come back in task order. A task that fails yields an error
+    message instead of a result without failing the rest of the batch.
+    """
+    outcomes: List[Optional[AnalysisOutcome]] = [None] * len(tasks)
+    runnable = []
+    for index, (kind, text, style_guide) in enumerate(tasks):
+        if kind == STYLE and style_guide is None:
+            outcomes[index] = (None, MISSING_STYLE_GUIDE)
+        elif not needs_parse(kind, style_guide):
+            try:
+                outcomes[index] = (analyze_text(kind, text, style_guide), None)
+            except Exception as e:
+                outcomes[index] = (None, str(e))
+        else:
+            runnable.append(index)
+
+    components: FrozenSet[str] = frozenset()
+    for index in runnable:
+        kind, _, style_guide = tasks[index]
+        components |= analysis_components(kind, style_guide)
+
+    docs = parse_many([tasks[index][1] for index in runnable], components, batch_size=batch_size)
+    for index, doc in zip(runnable, docs):
+        kind, _, style_guide = tasks[index]
+        if isinstance(doc, Exception):
+            outcomes[index] = (None, str(doc))
+            continue
+        try:
+            outcomes[index] = (analyze_doc(kind, doc, style_guide), None)
+        except Exception as e:
+            outcomes[index] = (None, str(e))
+    return outcomes
+
+
+def analyze_text_json(kind: str, text: str, style_guide: Optional[StyleGuideName] = None) -> str:
+    """Analyze ``text`` and return the response serialized as JSON.
+
+    This is the entry point executed in pool workers: only the short task
+    tuple goes in and one JSON string comes back, which the API returns
+    without serializing it again.
+    """
+    return analyze_text(kind, text, style_guide).model_dump_json()
+
+
+def analyze_batch_json(tasks: Sequence[AnalysisTask], batch_size: Optional[int] = None) -> List[Tuple[Optional[str], Optional[str]]]:
+    """Analyze a batch and return each result serialized as JSON."""
+    return [
+        (result.model_dump_json() if result is not None else None, error)
+        for result, error in analyze_batch(tasks, batch_size)
+    ]
@@ -0,0 +1,147 @@
+"""Offline asset management.
+
+Models and corpora are installed once with an explicit bootstrap step (at
+image build time, or from a machine with network access) and the service
+only verifies they are present. Nothing is downloaded at runtime.
+
+    python -m app.assets bootstrap   # download everything that is missing
+    python -m app.assets check       # exit non-zero if anything is missing
+    python -m app.assets import-time # measure the cold import of app.main
+"""
+import argparse
+import importlib.util
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+from .config import get_settings
+from .exceptions import ModelNotFoundError
+
+# NLTK resources used by TextOptimizer, mapped to their nltk.data paths
+NLTK_RESOURCES: Dict[str, str] = {
+    "wordnet": "corpora/wordnet",
+    "stopwords": "corpora/stopwords",
+}
+
+# Cold-start budget for `import app.main`, tracked by tests/test_startup.py
+IMPORT_TIME_BUDGET_SECONDS = 3.0
+
+BOOTSTRAP_HINT = "run `python -m app.assets bootstrap` to install it"
+
+_nltk_verified = False
+
+
+def spacy_model_installed(model_name: Optional[str] = None) -> bool:
+    """Check whether a spaCy model is installed as a package or a directory."""
+    model_name = model_name or get_settings().nlp_model
+    if os.path.isdir(model_name):
+        return True
+    return importlib.util.find_spec(model_name) is not None
+
+
+def missing_nltk_resources() -> List[str]:
+    """Return the NLTK resources that are not installed."""
+    import nltk
+
+    missing = []
+    for name, path in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            # WordNet and friends may only be shipped as zip archives
+            try:
+                nltk.data.find(f"{path}.zip")
+            except LookupError:
+                missing.append(name)
+    return missing
+
+
+def require_spacy_model(model_name: Optional[str] = None) -> None:
+    """Raise ModelNotFoundError if the spaCy model is not installed."""
+    model_name = model_name or get_settings().nlp_model
+    if not spacy_model_installed(model_name):
+        raise ModelNotFoundError(f"spaCy model '{model_name}' is not installed; {BOOTSTRAP_HINT}")
+
+
+def require_nltk_resources() -> None:
+    """Raise ModelNotFoundError if any NLTK resource is not installed."""
+    global _nltk_verified
+    if _nltk_verified:
+        return
+    missing = missing_nltk_resources()
+    if missing:
+        raise ModelNotFoundError(f"NLTK resources {missing} are not installed; {BOOTSTRAP_HINT}")
+    _nltk_verified = True
+
+
+def check_assets(include_nltk: bool = True) -> List[str]:
+    """Return a description of every missing asset without downloading anything."""
+    missing = []
+    model_name = get_settings().nlp_model
+    if not spacy_model_installed(model_name):
+        missing.append(f"spacy:{model_name}")
+    if include_nltk:
+        missing.extend(f"nltk:{name}" for name in missing_nltk_resources())
+    return missing
+
+
+def bootstrap_assets() -> List[str]:
+    """Download every missing asset and return what was installed."""
+    installed = []
+    model_name = get_settings().nlp_model
+    if not spacy_model_installed(model_name):
+        import spacy.cli
+
+        spacy.cli.download(model_name)
+        installed.append(f"spacy:{model_name}")
+
+    import nltk
+
+    for name in missing_nltk_resources():
+        if not nltk.download(name, quiet=True):
+            raise ModelNotFoundError(f"Could not download NLTK resource '{name}'")
+        installed.append(f"nltk:{name}")
+    return installed
+
+
+def measure_import_time(module: str = "app.main") -> float:
+    """Measure the cold import time of ``module`` in a fresh interpreter."""
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - start)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Install or verify offline NLP assets")
+    parser.add_argument("command", choices=["bootstrap", "check", "import-time"])
+    args = parser.parse_args(argv)
+
+    if args.command == "bootstrap":
+        installed = bootstrap_assets()
+        print(f"Installed: {', '.join(installed)}" if installed else "All assets already installed")
+        return 0
+    if args.command == "check":
+        missing = check_assets()
+        if missing:
+            print(f"Missing: {', '.join(missing)}")
+            return 1
+        print("All assets installed")
+        return 0
+
+    elapsed = measure_import_time()
+    print(f"import app.main: {elapsed:.2f}s (budget {IMPORT_TIME_BUDGET_SECONDS:.2f}s)")
+    return 0 if elapsed <= IMPORT_TIME_BUDGET_SECONDS else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
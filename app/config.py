@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 class Settings(BaseSettings):
     app_name: str = "Text Semantic Optimizer"
@@ -13,6 +14,55 @@ class Settings(BaseSettings):
     # Cache settings
     cache_ttl: int = 3600  # 1 hour
     cache_size: int = 1000
+
+    # Persistent parse store (disabled unless a path is configured)
+    doc_store_path: Optional[str] = None
+    doc_store_max_entries: int = 100000
+    doc_store_max_bytes: int = 512 * 1024 * 1024
+    doc_store_min_chars: int = 200
+    doc_store_touch_interval: float = 60.0  # seconds between access-time updates of one entry
+    
+    # User-defined style guides (*.yaml, *.yml, *.json), reloaded when they change
+    style_guides_dir: Optional[str] = None
+    style_guides_poll_interval: float = 2.0
+    
+    # Compact sentiment lexicon directory (see app.processors.lexicon); built-in word lists if unset
+    sentiment_lexicon_path: Optional[str] = None
+    
+    # Corpus IDF model directory for key phrases (see app.key_phrases); uniform weights if unset
+    idf_model_path: Optional[str] = None
+    
+    # WordNet synonym index directory (see app.synonyms); ranked from WordNet on demand if unset
+    synonym_index_path: Optional[str] = None
+    synonym_cache_size: int = 4096
+    
+    # Sentence embeddings for coherence ("auto", "vectors", "tensor" or "hashed"; see app.similarity)
+    sentence_embedding: str = "auto"
+    sentence_embedding_hash_dim: int = 2048
+    off_topic_ratio: float = 0.5
+    
+    # Batch analysis
+    batch_size: int = 64
+    max_batch_items: int = 1000
+    
+    # Analysis executor ("process" or "thread")
+    executor_type: str = "process"
+    executor_workers: Optional[int] = None  # defaults to the CPU count
+    executor_max_pending: int = 64
+    
+    # Micro-batching of concurrent single-text requests (0 disables it)
+    microbatch_window_ms: float = 5.0
+    microbatch_max_size: int = 32
+    microbatch_max_chars: int = 20000
+    
+    # Streaming analysis of long documents
+    stream_window_chars: int = 5000
+    stream_overlap_sentences: int = 1
+    
+    # Incremental editing sessions
+    session_max_count: int = 1000
+    session_ttl: int = 3600  # 1 hour
+    session_store_path: Optional[str] = None  # SQLite file shared by workers; in memory if unset
     
     # Rate limiting
     rate_limit_requests: int = 100
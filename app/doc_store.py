@@ -0,0 +1,198 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional
+
+import spacy
+from spacy.tokens import Doc
+
+from .config import get_settings
+from .storage import SqliteConnections
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    key TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS docs_last_access ON docs (last_access);
+CREATE INDEX IF NOT EXISTS docs_fingerprint ON docs (fingerprint);
+"""
+
+
+# Bumped whenever the serialized form of a stored Doc changes, so old rows are purged
+_FORMAT_VERSION = 2
+
+
+def model_fingerprint(nlp: spacy.Language) -> str:
+    """Identify the model, spaCy version and storage format a Doc was produced with."""
+    meta = nlp.meta
+    return (f"{meta.get('lang')}_{meta.get('name')}-{meta.get('version')}"
+            f"|spacy-{spacy.__version__}|format-{_FORMAT_VERSION}")
+
+
+def doc_to_bytes(doc: Doc) -> bytes:
+    """Serialize a Doc with its annotations and ``doc.tensor``.
+
+    Unlike DocBin this keeps the tensor, which sentence embeddings fall back
+    on for pipelines without static vectors (see ``app.similarity``), so a
+    stored Doc gives the same results as a fresh parse.
+    """
+    return doc.to_bytes(exclude=["user_data"])
+
+
+def doc_from_bytes(data: bytes, vocab: spacy.vocab.Vocab) -> Doc:
+    """Restore a Doc serialized with :func:`doc_to_bytes`."""
+    return Doc(vocab).from_bytes(data)
+
+
+class DocStore:
+    """On-disk store of parsed Docs shared by all worker processes on a host.
+
+    Docs are stored as serialized bytes in an SQLite database in WAL mode, so any
+    number of processes can read while one writes. Entries are keyed by a
+    hash of the text, the pipeline components that produced them and the
+    model fingerprint, so a change of ``Settings.nlp_model`` or of the spaCy
+    version never serves stale parses; rows written under an old fingerprint
+    are purged the first time the new one writes. Once the store exceeds
+    ``max_entries`` or ``max_bytes`` the least recently used rows are evicted.
+
+    A read only writes when the row's access time is more than
+    ``touch_interval`` seconds old, so hits on hot entries don't take the
+    write lock; eviction order is precise to within that interval.
+    """
+
+    def __init__(self, path: str, max_entries: int = 100000, max_bytes: int = 512 * 1024 * 1024,
+                 evict_interval: int = 64, touch_interval: float = 60.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.evict_interval = evict_interval
+        self.touch_interval = touch_interval
+        self.errors = 0
+        self._connections = SqliteConnections(path)
+        self._puts_since_evict = 0
+        self._purged_fingerprints = set()
+        self._lock = threading.Lock()
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        return self._connections.get()
+
+    @staticmethod
+    def make_key(text: str, fingerprint: str, components: Optional[Iterable[str]] = None) -> str:
+        """Build the store key for ``text`` parsed with ``components``."""
+        component_key = ",".join(sorted(components)) if components is not None else "*"
+        payload = f"{fingerprint}\0{component_key}\0{text}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, text: str, nlp: spacy.Language,
+            components: Optional[Iterable[str]] = None) -> Optional[Doc]:
+        """Return the stored Doc for ``text``, or None if it was never stored."""
+        fingerprint = model_fingerprint(nlp)
+        key = self.make_key(text, fingerprint, components)
+        conn = self._connection()
+        # The key already hashes the fingerprint
+        row = conn.execute("SELECT data, last_access FROM docs WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[1] > self.touch_interval:
+            conn.execute("UPDATE docs SET last_access = ? WHERE key = ?", (now, key))
+        return doc_from_bytes(row[0], nlp.vocab)
+
+    def put(self, text: str, doc: Doc, nlp: spacy.Language,
+            components: Optional[Iterable[str]] = None) -> None:
+        """Store the parsed ``doc`` for ``text``."""
+        fingerprint = model_fingerprint(nlp)
+        if fingerprint not in self._purged_fingerprints:
+            self._purge_other_fingerprints(fingerprint)
+        key = self.make_key(text, fingerprint, components)
+        data = doc_to_bytes(doc)
+        self._connection().execute(
+            "INSERT OR REPLACE INTO docs (key, fingerprint, data, size, last_access) VALUES (?, ?, ?, ?, ?)",
+            (key, fingerprint, data, len(data), time.time()),
+        )
+        with self._lock:
+            self._puts_since_evict += 1
+            evict = self._puts_since_evict >= self.evict_interval
+            if evict:
+                self._puts_since_evict = 0
+        if evict:
+            self.evict()
+
+    def record_error(self, operation: str, error: Exception) -> None:
+        """Log and count a failed read or write; callers carry on without the store."""
+        with self._lock:
+            self.errors += 1
+        logger.warning(f"Parse store {operation} failed ({self.path}): {error}")
+
+    def _purge_other_fingerprints(self, fingerprint: str) -> None:
+        """Delete rows written by a different model or spaCy version."""
+        self._connection().execute("DELETE FROM docs WHERE fingerprint != ?", (fingerprint,))
+        self._purged_fingerprints.add(fingerprint)
+
+    def evict(self) -> int:
+        """Evict least recently used rows until the store is within its bounds."""
+        conn = self._connection()
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM docs").fetchone()
+        evicted = 0
+        if count > self.max_entries:
+            excess = count - self.max_entries
+            conn.execute(
+                "DELETE FROM docs WHERE key IN (SELECT key FROM docs ORDER BY last_access LIMIT ?)",
+                (excess,),
+            )
+            evicted += excess
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM docs").fetchone()
+        if total > self.max_bytes:
+            # Walk from the oldest entry until enough bytes have been freed
+            to_free = total - self.max_bytes
+            keys = []
+            for key, size in conn.execute("SELECT key, size FROM docs ORDER BY last_access"):
+                keys.append(key)
+                to_free -= size
+                if to_free <= 0:
+                    break
+            conn.executemany("DELETE FROM docs WHERE key = ?", [(key,) for key in keys])
+            evicted += len(keys)
+        return evicted
+
+    def clear(self) -> None:
+        """Delete every stored Doc."""
+        self._connection().execute("DELETE FROM docs")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of stored Docs and their total size."""
+        count, total = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM docs"
+        ).fetchone()
+        return {
+            "path": self.path,
+            "entries": count,
+            "bytes": total,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "errors": self.errors,
+        }
+
+
+@lru_cache()
+def get_doc_store() -> Optional[DocStore]:
+    """Return the configured parse store, or None when it is disabled."""
+    settings = get_settings()
+    if not settings.doc_store_path:
+        return None
+    return DocStore(
+        settings.doc_store_path,
+        max_entries=settings.doc_store_max_entries,
+        max_bytes=settings.doc_store_max_bytes,
+        touch_interval=settings.doc_store_touch_interval,
+    )
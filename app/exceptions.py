@@ -30,4 +30,44 @@ class InvalidConfigurationError(TextOptimizationError):
 
 class ModelNotFoundError(TextOptimizationError):
     """Raised when required NLP model is not found"""
-    pass
\ No newline at end of file
+    pass
+
+class MissingStyleGuideError(TextOptimizationError):
+    """Raised when a style analysis is requested without a style guide"""
+    pass
+
+class ExecutorBusyError(TextOptimizationError):
+    """Raised when the analysis queue is full"""
+    pass
+
+class SessionNotFoundError(TextOptimizationError):
+    """Raised when an editing session does not exist or has expired"""
+    pass
+
+class SessionConflictError(TextOptimizationError):
+    """Raised when an edit is based on an outdated session version"""
+    pass
+
+class InvalidEditError(TextOptimizationError):
+    """Raised when an edit range is out of bounds or overlaps another edit"""
+    pass
+
+class UnknownStyleGuideError(TextOptimizationError):
+    """Raised when a style guide name is not defined"""
+    pass
+
+class InvalidStyleGuideError(TextOptimizationError):
+    """Raised when a style guide file cannot be parsed or compiled"""
+    pass
+
+class InvalidLexiconError(TextOptimizationError):
+    """Raised when a sentiment lexicon cannot be built or loaded"""
+    pass
+
+class InvalidIdfModelError(TextOptimizationError):
+    """Raised when a key phrase IDF model cannot be fitted or loaded"""
+    pass
+
+class InvalidSynonymIndexError(TextOptimizationError):
+    """Raised when a synonym index cannot be built or loaded"""
+    pass
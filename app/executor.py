@@ -0,0 +1,214 @@
+import asyncio
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import get_settings
+from .exceptions import ExecutorBusyError, InvalidConfigurationError
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_TYPES = ("process", "thread")
+
+# A pool worker rewrites its memory report after a task at most this often
+REPORT_INTERVAL_SECONDS = 10.0
+
+# Where this process, if it is a pool worker, publishes its memory report
+_reports_dir: Optional[str] = None
+_last_report = 0.0
+
+
+def _publish_report() -> None:
+    """Write this worker's model memory report to ``<pid>.json`` in the reports directory."""
+    global _last_report
+    from .model_registry import memory_report
+
+    if _reports_dir is None:
+        return
+    _last_report = time.monotonic()
+    path = os.path.join(_reports_dir, f"{os.getpid()}.json")
+    try:
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(memory_report(), f)
+        os.replace(f"{path}.tmp", path)
+    except OSError as e:
+        logger.warning(f"Could not publish the memory report of worker {os.getpid()}: {e}")
+
+
+def _initialize_worker(model_name: str, reports_dir: Optional[str] = None) -> None:
+    """Preload the model and processors in a freshly started pool worker."""
+    global _reports_dir
+    from .model_registry import get_nlp
+    from . import analysis  # noqa: F401  (builds the processor singletons)
+
+    get_nlp(model_name)
+    if reports_dir is not None:
+        _reports_dir = reports_dir
+        _publish_report()
+
+
+def _run_task(func: Callable, *args: Any) -> Any:
+    """Run a task in a pool worker, refreshing the worker's memory report now and then."""
+    try:
+        return func(*args)
+    finally:
+        if _reports_dir is not None and time.monotonic() - _last_report >= REPORT_INTERVAL_SECONDS:
+            _publish_report()
+
+
+def _ping() -> int:
+    """No-op task used to start pool workers ahead of the first request."""
+    return os.getpid()
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class AnalysisExecutor:
+    """Bounded executor that keeps CPU-bound analysis off the event loop.
+
+    ``process`` mode runs analysis in a pool of worker processes, each with
+    the model preloaded; ``thread`` mode uses a thread pool in this process.
+    At most ``max_pending`` tasks may be queued or running at once; beyond
+    that :meth:`run` fails fast with :class:`ExecutorBusyError` instead of
+    letting the queue grow without bound.
+
+    Pool workers publish their own model memory reports to a temporary
+    directory, when they start and after tasks, so :meth:`worker_reports`
+    reads them without queueing work behind analysis.
+    """
+
+    def __init__(self, executor_type: str = "process", max_workers: Optional[int] = None,
+                 max_pending: int = 64, model_name: Optional[str] = None):
+        if executor_type not in EXECUTOR_TYPES:
+            raise InvalidConfigurationError(f"Invalid executor type: {executor_type}")
+        self.executor_type = executor_type
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.model_name = model_name or get_settings().nlp_model
+        self._pool: Optional[Executor] = None
+        self._reports_dir: Optional[str] = None
+        self._pending = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    if self.executor_type == "process":
+                        self._reports_dir = tempfile.mkdtemp(prefix="analysis-workers-")
+                        self._pool = ProcessPoolExecutor(
+                            max_workers=self.max_workers,
+                            initializer=_initialize_worker,
+                            initargs=(self.model_name, self._reports_dir),
+                        )
+                    else:
+                        self._pool = ThreadPoolExecutor(
+                            max_workers=self.max_workers,
+                            thread_name_prefix="analysis",
+                        )
+        return self._pool
+
+    def warm_up(self) -> None:
+        """Load the model where analysis runs so the first requests don't pay for it."""
+        if self.executor_type == "thread":
+            _initialize_worker(self.model_name)
+            return
+        pool = self._get_pool()
+        for future in [pool.submit(_ping) for _ in range(self.max_workers)]:
+            future.result()
+
+    async def run(self, func: Callable, *args: Any) -> Any:
+        """Run ``func(*args)`` in the pool and await its result."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise ExecutorBusyError(
+                    f"Analysis queue is full ({self.max_pending} pending tasks)"
+                )
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            if self.executor_type == "process":
+                return await loop.run_in_executor(self._get_pool(), _run_task, func, *args)
+            return await loop.run_in_executor(self._get_pool(), func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def worker_reports(self) -> List[Dict[str, Any]]:
+        """Return the latest model memory report of each running worker process.
+
+        ``thread`` mode reports this process, through :meth:`run`. In
+        ``process`` mode a report may be up to ``REPORT_INTERVAL_SECONDS``
+        old for a busy worker; an idle one reports the state it went idle in.
+        """
+        if self.executor_type == "thread":
+            from .model_registry import memory_report
+
+            return [await self.run(memory_report)]
+        reports_dir = self._reports_dir
+        if reports_dir is None:
+            return []
+        reports = []
+        for name in sorted(os.listdir(reports_dir)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(reports_dir, name), encoding="utf-8") as f:
+                    report = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if _is_running(report["pid"]):
+                reports.append(report)
+        return reports
+
+    def idle_workers(self) -> int:
+        """Estimate how many workers have no task queued or running, at least one."""
+        return max(1, self.max_workers - self._pending)
+
+    def stats(self) -> Dict[str, Any]:
+        """Report the pool configuration and current queue depth."""
+        return {
+            "type": self.executor_type,
+            "workers": self.max_workers,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "rejected": self._rejected,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut the pool down; it is recreated on the next :meth:`run`."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+            reports_dir, self._reports_dir = self._reports_dir, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+        if reports_dir is not None:
+            shutil.rmtree(reports_dir, ignore_errors=True)
+
+
+@lru_cache()
+def get_executor() -> AnalysisExecutor:
+    settings = get_settings()
+    return AnalysisExecutor(
+        executor_type=settings.executor_type,
+        max_workers=settings.executor_workers,
+        max_pending=settings.executor_max_pending,
+        model_name=settings.nlp_model,
+    )
@@ -0,0 +1,235 @@
+"""Key phrase ranking with a corpus IDF model.
+
+An IDF model is fitted offline from a corpus, one document per line of
+each source file, and stored as a directory like a sentiment lexicon
+(see :mod:`app.processors.lexicon`)::
+
+    idf.json    format version, document and term counts
+    keys.npy    uint64 ``LOWER`` hash of each term, sorted
+    idf.npy     float32 inverse document frequency of each term
+
+    python -m app.key_phrases fit corpus.txt models/idf
+    python -m app.key_phrases info models/idf
+
+At request time the model is only read: the terms of a Doc are looked up
+by the hash spaCy stores in ``Token.lower`` with one vectorized binary
+search. A phrase scores the sum of the TF-IDF weights its terms have in
+its document, and every phrase of a batch of documents is scored with a
+single sparse matrix-vector product.
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+import spacy
+from scipy.sparse import csr_matrix
+from spacy.attrs import IS_PUNCT, IS_SPACE, IS_STOP, LOWER
+from spacy.tokens import Doc
+
+from .exceptions import InvalidIdfModelError
+from .storage import save_array_directory
+
+FORMAT_VERSION = 1
+META_FILE = "idf.json"
+KEYS_FILE = "keys.npy"
+IDF_FILE = "idf.npy"
+
+# Documents tokenized between merges of the document frequency counts
+FIT_CHUNK_DOCS = 10000
+
+
+class IdfModel:
+    """Smoothed inverse document frequencies keyed by ``LOWER`` hash.
+
+    ``idf = ln((1 + documents) / (1 + df)) + 1``, as scikit-learn computes
+    it; terms the corpus never saw get the weight of ``df = 0``, so an
+    empty model weighs every term 1.
+    """
+
+    def __init__(self, keys: np.ndarray, idf: np.ndarray, documents: int):
+        if idf.shape != keys.shape:
+            raise InvalidIdfModelError(f"{len(idf)} IDF weights don't match {len(keys)} terms")
+        self.keys = keys
+        self.idf = idf
+        self.documents = documents
+        self.default_idf = float(np.log(1 + documents) + 1)
+
+    @classmethod
+    def empty(cls) -> "IdfModel":
+        return cls(np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.float32), 0)
+
+    @classmethod
+    def fit(cls, texts: Iterable[str], nlp: Optional[spacy.Language] = None) -> "IdfModel":
+        """Fit document frequencies over ``texts``, tokenized by ``nlp``'s tokenizer."""
+        tokenizer = (nlp or spacy.blank("en")).tokenizer
+        keys = np.zeros(0, dtype=np.uint64)
+        counts = np.zeros(0, dtype=np.int64)
+        documents = 0
+        chunk: List[np.ndarray] = []
+        for doc in tokenizer.pipe(texts):
+            documents += 1
+            chunk.append(np.unique(doc.to_array(LOWER)))
+            if len(chunk) == FIT_CHUNK_DOCS:
+                keys, counts = _merge_counts(keys, counts, chunk)
+                chunk = []
+        keys, counts = _merge_counts(keys, counts, chunk)
+        idf = np.log((1 + documents) / (1 + counts)) + 1
+        return cls(keys, idf.astype(np.float32), documents)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "IdfModel":
+        """Open a model directory written by :meth:`save`, memory-mapped by default."""
+        try:
+            with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != FORMAT_VERSION:
+                raise InvalidIdfModelError(f"{path}: unsupported IDF model format {meta.get('version')}")
+            mode = "r" if mmap else None
+            keys = np.load(os.path.join(path, KEYS_FILE), mmap_mode=mode)
+            idf = np.load(os.path.join(path, IDF_FILE), mmap_mode=mode)
+        except (OSError, ValueError) as e:
+            raise InvalidIdfModelError(f"Can't load IDF model from {path}: {e}")
+        if keys.dtype != np.uint64 or idf.dtype != np.float32:
+            raise InvalidIdfModelError(f"{path}: expected uint64 keys and float32 weights")
+        return cls(keys, idf, meta["documents"])
+
+    def save(self, path: str) -> None:
+        """Write the model to a directory that :meth:`load` can map."""
+        save_array_directory(
+            path,
+            {
+                KEYS_FILE: np.ascontiguousarray(self.keys, dtype=np.uint64),
+                IDF_FILE: np.ascontiguousarray(self.idf, dtype=np.float32),
+            },
+            META_FILE,
+            {"version": FORMAT_VERSION, "documents": self.documents, "terms": len(self.keys)},
+        )
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def weights(self, ids: np.ndarray) -> np.ndarray:
+        """IDF of each term hash in ``ids`` as a float64 array."""
+        result = np.full(len(ids), self.default_idf)
+        if len(self.keys) and len(ids):
+            positions = np.searchsorted(self.keys, ids)
+            positions[positions == len(self.keys)] = 0
+            found = self.keys[positions] == ids
+            result[found] = self.idf[positions[found]]
+        return result
+
+
+def _merge_counts(keys: np.ndarray, counts: np.ndarray, chunk: Sequence[np.ndarray]):
+    if not chunk:
+        return keys, counts
+    merged, inverse = np.unique(np.concatenate([keys, *chunk]), return_inverse=True)
+    weights = np.concatenate([counts, np.ones(sum(len(ids) for ids in chunk), dtype=np.int64)])
+    return merged, np.bincount(inverse, weights=weights, minlength=len(merged)).astype(np.int64)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` highest scores, best first; ties keep their order."""
+    if len(scores) > k:
+        threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+        candidates = np.flatnonzero(scores >= threshold)
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.lexsort((candidates, -scores[candidates]))][:k]
+
+
+def rank_key_phrases(docs: Sequence[Doc], model: IdfModel, num_phrases: int = 5) -> List[List[str]]:
+    """Return the top noun phrases of each Doc, lowercased, best first.
+
+    Terms are the tokens that aren't stop words, punctuation or space. A
+    phrase made only of stop words is skipped, and a phrase repeated in a
+    document is ranked once.
+    """
+    term_keys = []  # (document, term) of every term occurrence, by document
+    phrase_rows = []
+    phrase_terms = []
+    phrases: List[str] = []
+    bounds = [0]  # the phrases of document i are phrases[bounds[i]:bounds[i + 1]]
+    for index, doc in enumerate(docs):
+        attrs = doc.to_array([LOWER, IS_STOP, IS_PUNCT, IS_SPACE])
+        is_term = ~attrs[:, 1:].any(axis=1)
+        ids = attrs[:, 0]
+        term_keys.append((np.full(int(is_term.sum()), index, dtype=np.uint64), ids[is_term]))
+        seen = set()
+        for chunk in doc.noun_chunks:
+            in_phrase = is_term[chunk.start:chunk.end]
+            text = chunk.text.lower()
+            if not in_phrase.any() or text in seen:
+                continue
+            seen.add(text)
+            terms = ids[chunk.start:chunk.end][in_phrase]
+            phrase_rows.append(np.full(len(terms), len(phrases)))
+            phrase_terms.append((np.full(len(terms), index, dtype=np.uint64), terms))
+            phrases.append(text)
+        bounds.append(len(phrases))
+    if not phrases:
+        return [[] for _ in docs]
+
+    # Number the distinct (document, term) pairs; their TF-IDF weights form one vector
+    doc_index = np.concatenate([d for d, _ in term_keys])
+    term_ids = np.concatenate([t for _, t in term_keys])
+    pairs, first, counts = np.unique(
+        np.stack([doc_index, term_ids], axis=1), axis=0, return_index=True, return_counts=True
+    )
+    tfidf = counts * model.weights(term_ids[first])
+
+    # Each phrase row selects the pairs of its terms in its document
+    wanted = np.stack([np.concatenate([d for d, _ in phrase_terms]), np.concatenate([t for _, t in phrase_terms])], axis=1)
+    columns = _pair_positions(pairs, wanted)
+    rows = np.concatenate(phrase_rows)
+    matrix = csr_matrix((np.ones(len(rows)), (rows, columns)), shape=(len(phrases), len(pairs)))
+    scores = matrix @ tfidf
+
+    return [
+        [phrases[start + i] for i in top_k(scores[start:end], num_phrases)]
+        for start, end in zip(bounds, bounds[1:])
+    ]
+
+
+def _pair_positions(pairs: np.ndarray, wanted: np.ndarray) -> np.ndarray:
+    """Row of each ``wanted`` (document, term) pair in the sorted unique ``pairs``."""
+    view = np.dtype([("doc", np.uint64), ("term", np.uint64)])
+    return np.searchsorted(
+        np.ascontiguousarray(pairs).view(view).ravel(),
+        np.ascontiguousarray(wanted).view(view).ravel(),
+    )
+
+
+def read_documents(sources: Sequence[str]) -> Iterable[str]:
+    """Yield every non-empty line of the source files as one document."""
+    for source in sources:
+        with open(source, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield line
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Fit or inspect corpus IDF models for key phrase extraction")
+    commands = parser.add_subparsers(dest="command", required=True)
+    fit = commands.add_parser("fit", help="Fit an IDF model on text files, one document per line")
+    fit.add_argument("sources", nargs="+", help="Corpus text files")
+    fit.add_argument("output", help="Model directory to write")
+    fit.add_argument("--lang", default="en", help="Language of the tokenizer (default: en)")
+    info = commands.add_parser("info", help="Describe a model directory")
+    info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "fit":
+        model = IdfModel.fit(read_documents(args.sources), spacy.blank(args.lang))
+        model.save(args.output)
+    else:
+        model = IdfModel.load(args.path)
+    print(f"{len(model)} terms from {model.documents} documents")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,44 @@
-from fastapi import FastAPI, HTTPException, Request
+from contextlib import asynccontextmanager
+import asyncio
+import json
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pathlib import Path
+from typing import AsyncIterator, List, Optional, Tuple
 from .models import (
-    TextInput, GrammarResponse, SentimentResponse, 
-    TextAnalysisResponse, StyleResponse, StyleIssue
+    TextInput, BatchTextInput, BatchResponse, GrammarResponse, SentimentResponse,
+    TextAnalysisResponse, StyleResponse, StreamTextInput,
+    SessionCreateInput, SessionDelta, SessionEditInput, SessionState
 )
-from .processors.grammar_enhancement import GrammarEnhancer
-from .processors.sentiment_analyzer import SentimentAnalyzer
-from .processors.style_guide import StyleGuideProcessor, StyleViolation
+from . import analysis, sessions, streaming
+from .assets import require_spacy_model
+from .analysis import ANALYZE, GRAMMAR, SENTIMENT, STYLE
+from .cache import get_result_cache
+from .config import get_settings
+from .exceptions import (
+    ExecutorBusyError, InvalidEditError, ProcessingError, SessionConflictError, SessionNotFoundError
+)
+from .executor import get_executor
+from .scheduler import MicroBatcher, split_batch
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Verify assets, start the analysis workers, and stop them on shutdown."""
+    # Only check that the model is installed; nothing is downloaded at runtime
+    require_spacy_model()
+    executor.warm_up()
+    yield
+    executor.shutdown()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Text Semantic Optimizer",
     description="Advanced text analysis and optimization API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -31,127 +54,301 @@ app.add_middleware(
 app.mount("/static", StaticFiles(directory=Path(__file__).parent / "static"), name="static")
 templates = Jinja2Templates(directory=Path(__file__).parent / "templates")
 
-# Initialize processors
-grammar_enhancer = GrammarEnhancer()
-sentiment_analyzer = SentimentAnalyzer()
-style_processor = StyleGuideProcessor()
+result_cache = get_result_cache()
+executor = get_executor()
+session_manager = sessions.get_session_manager()
+
+def task_chars(task: analysis.AnalysisTask) -> int:
+    return len(task[1])
+
+async def run_coalesced_batch(tasks: List[analysis.AnalysisTask]) -> List[Tuple[Optional[str], Optional[str]]]:
+    """Run a batch of coalesced single-text requests in the executor.
+
+    With worker processes the batch is split by text length across the idle
+    workers, so a burst is analyzed in parallel rather than serially in one.
+    """
+    parts = executor.idle_workers() if executor.executor_type == "process" else 1
+    chunks = split_batch(tasks, parts, task_chars)
+    results = await asyncio.gather(*(executor.run(analysis.analyze_batch_json, chunk, None) for chunk in chunks))
+    return [outcome for chunk in results for outcome in chunk]
+
+# Coalesce concurrent single-text requests into nlp.pipe batches
+settings = get_settings()
+scheduler = None
+if settings.microbatch_window_ms > 0:
+    scheduler = MicroBatcher(
+        run_coalesced_batch,
+        window=settings.microbatch_window_ms / 1000,
+        max_batch_size=settings.microbatch_max_size,
+        max_batch_weight=settings.microbatch_max_chars,
+        weight=task_chars
+    )
 
 @app.get("/")
 async def home(request: Request):
     """Serve the main web interface."""
     return templates.TemplateResponse("index.html", {"request": request})
 
-@app.post("/analyze", response_model=TextAnalysisResponse)
-async def analyze_text(input_data: TextInput):
-    """Analyze text for grammar, style, and sentiment."""
-    try:
-        # Grammar analysis
-        enhanced_text, grammar_issues = grammar_enhancer.enhance_text(input_data.text)
-        improvement_score = len(grammar_issues) / len(input_data.text.split())
-        grammar_response = GrammarResponse(
-            original_text=input_data.text,
-            enhanced_text=enhanced_text,
-            issues=grammar_issues,
-            improvement_score=1 - improvement_score
-        )
+def cache_key(kind: str, input_data: TextInput) -> str:
+    """Build the result cache key for one ``kind`` of analysis."""
+    return result_cache.make_key(
+        kind,
+        input_data.text,
+        style_guide=input_data.style_guide,
+        # Results expire with the version of the guide they were checked against
+        style_guide_version=analysis.style_guide_version(input_data.style_guide),
+        optimization_level=input_data.optimization_level
+    )
 
-        # Style analysis (if style guide specified)
-        style_response = None
-        if input_data.style_guide:
-            style_violations = style_processor.check_style(
-                input_data.text, 
-                input_data.style_guide
-            )
-            violation_weight = sum(v.severity for v in style_violations)
-            max_possible_weight = len(style_violations) * 3  # max severity is 3
-            compliance_score = 1 - (violation_weight / max_possible_weight if max_possible_weight > 0 else 0)
-            
-            style_response = StyleResponse(
-                original_text=input_data.text,
-                issues=[StyleIssue(**v.__dict__) for v in style_violations],
-                style_guide_type=input_data.style_guide,
-                compliance_score=compliance_score
-            )
+def cached_result(key: str, input_data: TextInput):
+    """Return the cached result for ``key`` unless the request bypasses the cache."""
+    if not input_data.use_cache:
+        return None
+    return result_cache.get(key)
 
-        # Sentiment analysis
-        sentiment_score = sentiment_analyzer.analyze_sentiment(input_data.text)
-        sentiment_response = SentimentResponse(
-            text=input_data.text,
-            polarity=sentiment_score.polarity,
-            subjectivity=sentiment_score.subjectivity,
-            objectivity=sentiment_score.objectivity,
-            emotional_tone=sentiment_score.emotional_tone,
-            summary=sentiment_analyzer.get_sentiment_summary(sentiment_score)
-        )
+def json_response(body: str) -> Response:
+    """Wrap an already serialized JSON body in a response."""
+    return Response(content=body, media_type="application/json")
 
-        return TextAnalysisResponse(
-            grammar=grammar_response,
-            style=style_response,
-            sentiment=sentiment_response
-        )
+def require_style_guide(style_guide: Optional[str]) -> None:
+    """Reject requests naming a style guide that isn't loaded."""
+    if style_guide and not analysis.style_guide_exists(style_guide):
+        raise HTTPException(status_code=400, detail=f"Unknown style guide: {style_guide}")
+
+async def run_analysis(kind: str, input_data: TextInput) -> Response:
+    """Run one analysis in the executor, serving and filling the result cache."""
+    if kind == STYLE and not input_data.style_guide:
+        raise HTTPException(status_code=400, detail=analysis.MISSING_STYLE_GUIDE)
+    require_style_guide(input_data.style_guide)
+    key = cache_key(kind, input_data)
+    cached = cached_result(key, input_data)
+    if cached is not None:
+        return json_response(cached)
+    try:
+        if scheduler is not None:
+            body, error = await scheduler.submit((kind, input_data.text, input_data.style_guide))
+            if error is not None:
+                raise ProcessingError(error)
+        else:
+            body = await executor.run(analysis.analyze_text_json, kind, input_data.text, input_data.style_guide)
+    except ExecutorBusyError as e:
+        raise HTTPException(status_code=503, detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    result_cache.set(key, body)
+    return json_response(body)
+
+def batch_body(items: List[Tuple[Optional[str], Optional[str]]]) -> str:
+    """Assemble a batch response from per-item JSON results and errors."""
+    parts = [
+        f'{{"index":{index},"result":{result or "null"},"error":{json.dumps(error)}}}'
+        for index, (result, error) in enumerate(items)
+    ]
+    return '{"items":[' + ",".join(parts) + "]}"
+
+async def run_batch(kind: str, batch: BatchTextInput) -> Response:
+    """Run one analysis over every item of a batch, in order."""
+    max_items = settings.max_batch_items
+    if len(batch.items) > max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds maximum of {max_items} items"
+        )
+
+    items: List[Tuple[Optional[str], Optional[str]]] = [(None, None)] * len(batch.items)
+    keys = [cache_key(kind, item) for item in batch.items]
+    pending = []
+    for index, item in enumerate(batch.items):
+        cached = cached_result(keys[index], item)
+        if cached is not None:
+            items[index] = (cached, None)
+        else:
+            pending.append(index)
+
+    if pending:
+        tasks = [(kind, batch.items[index].text, batch.items[index].style_guide) for index in pending]
+        try:
+            outcomes = await executor.run(analysis.analyze_batch_json, tasks, batch.batch_size)
+        except ExecutorBusyError as e:
+            raise HTTPException(status_code=503, detail=e.message)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        for index, (result, error) in zip(pending, outcomes):
+            if result is not None:
+                result_cache.set(keys[index], result)
+            items[index] = (result, error)
+    return json_response(batch_body(items))
+
+@app.post("/analyze", response_model=TextAnalysisResponse)
+async def analyze_text(input_data: TextInput):
+    """Analyze text for grammar, style, and sentiment."""
+    return await run_analysis(ANALYZE, input_data)
 
 @app.post("/enhance/grammar", response_model=GrammarResponse)
 async def enhance_grammar(input_data: TextInput):
     """Enhance text grammar and return detailed analysis."""
-    try:
-        enhanced_text, issues = grammar_enhancer.enhance_text(input_data.text)
-        improvement_score = len(issues) / len(input_data.text.split())
-        return GrammarResponse(
-            original_text=input_data.text,
-            enhanced_text=enhanced_text,
-            issues=issues,
-            improvement_score=1 - improvement_score
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await run_analysis(GRAMMAR, input_data)
 
 @app.post("/analyze/style", response_model=StyleResponse)
 async def analyze_style(input_data: TextInput):
     """Analyze text style against specified style guide."""
-    try:
-        if not input_data.style_guide:
-            raise HTTPException(
-                status_code=400,
-                detail="Style guide type must be specified"
+    return await run_analysis(STYLE, input_data)
+
+@app.post("/analyze/sentiment", response_model=SentimentResponse)
+async def analyze_sentiment(input_data: TextInput):
+    """Analyze text sentiment and emotional tone."""
+    return await run_analysis(SENTIMENT, input_data)
+
+@app.post("/analyze/batch", response_model=BatchResponse[TextAnalysisResponse])
+async def analyze_text_batch(batch: BatchTextInput):
+    """Analyze many texts for grammar, style, and sentiment in one batched pass."""
+    return await run_batch(ANALYZE, batch)
+
+@app.post("/enhance/grammar/batch", response_model=BatchResponse[GrammarResponse])
+async def enhance_grammar_batch(batch: BatchTextInput):
+    """Enhance the grammar of many texts in one batched pass."""
+    return await run_batch(GRAMMAR, batch)
+
+@app.post("/analyze/style/batch", response_model=BatchResponse[StyleResponse])
+async def analyze_style_batch(batch: BatchTextInput):
+    """Check many texts against their style guides in one batched pass."""
+    return await run_batch(STYLE, batch)
+
+@app.post("/analyze/sentiment/batch", response_model=BatchResponse[SentimentResponse])
+async def analyze_sentiment_batch(batch: BatchTextInput):
+    """Analyze the sentiment of many texts in one batched pass."""
+    return await run_batch(SENTIMENT, batch)
+
+async def stream_lines(input_data: StreamTextInput) -> AsyncIterator[str]:
+    """Analyze a long document window by window, yielding one NDJSON line per chunk.
+
+    Only one window is in flight at a time, so memory stays bounded by the
+    window size. A failure mid-stream is reported as a final error line.
+    """
+    text = input_data.text
+    window_chars, overlap_sentences = streaming.stream_settings(
+        input_data.window_chars, input_data.overlap_sentences
+    )
+    aggregator = streaming.StreamAggregator(input_data.style_guide)
+    for window in streaming.iter_windows(text, window_chars, overlap_sentences):
+        try:
+            chunk = await executor.run(
+                streaming.analyze_window, text[window.start:window.end], window, input_data.style_guide
             )
+        except Exception as e:
+            yield json.dumps({"type": "error", "index": window.index, "error": str(e)}) + "\n"
+            return
+        aggregator.add(chunk)
+        yield chunk.model_dump_json() + "\n"
+    yield aggregator.summary().model_dump_json() + "\n"
 
-        violations = style_processor.check_style(
-            input_data.text,
-            input_data.style_guide
-        )
-        
-        violation_weight = sum(v.severity for v in violations)
-        max_possible_weight = len(violations) * 3  # max severity is 3
-        compliance_score = 1 - (violation_weight / max_possible_weight if max_possible_weight > 0 else 0)
-        
-        return StyleResponse(
-            original_text=input_data.text,
-            issues=[StyleIssue(**v.__dict__) for v in violations],
-            style_guide_type=input_data.style_guide,
-            compliance_score=compliance_score
-        )
+@app.post("/analyze/stream")
+async def analyze_stream(input_data: StreamTextInput):
+    """Analyze a document of any length, streaming per-chunk results as NDJSON."""
+    require_style_guide(input_data.style_guide)
+    return StreamingResponse(stream_lines(input_data), media_type="application/x-ndjson")
+
+async def revise_session(session: sessions.DocumentSession, text: str, base_version: int) -> SessionDelta:
+    """Analyze the new paragraphs of ``text`` in the executor and move the session to it."""
+    guide_version = analysis.style_guide_version(session.style_guide)
+    paragraphs = session.pending(text, guide_version)
+    results = []
+    if paragraphs:
+        results = await executor.run(sessions.analyze_paragraphs, paragraphs, session.style_guide)
+    delta = session.revise(text, dict(zip(paragraphs, results)), base_version, guide_version)
+    session_manager.save(session, base_version)
+    return delta
+
+def get_session(session_id: str) -> sessions.DocumentSession:
+    try:
+        return session_manager.get(session_id)
+    except SessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=e.message)
+
+@app.post("/sessions", response_model=SessionDelta)
+async def create_session(input_data: SessionCreateInput):
+    """Open an editing session and analyze the initial text."""
+    require_style_guide(input_data.style_guide)
+    session = session_manager.create(input_data.style_guide)
+    try:
+        return await revise_session(session, input_data.text, session.version)
     except Exception as e:
+        session_manager.delete(session.id)
+        if isinstance(e, ExecutorBusyError):
+            raise HTTPException(status_code=503, detail=e.message)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/analyze/sentiment", response_model=SentimentResponse)
-async def analyze_sentiment(input_data: TextInput):
-    """Analyze text sentiment and emotional tone."""
+@app.post("/sessions/{session_id}/edits", response_model=SessionDelta)
+async def edit_session(session_id: str, input_data: SessionEditInput):
+    """Apply edits and return the changed issues and metrics, re-analyzing only changed paragraphs."""
+    session = get_session(session_id)
+    base_version = session.version if input_data.base_version is None else input_data.base_version
     try:
-        sentiment_score = sentiment_analyzer.analyze_sentiment(input_data.text)
-        return SentimentResponse(
-            text=input_data.text,
-            polarity=sentiment_score.polarity,
-            subjectivity=sentiment_score.subjectivity,
-            objectivity=sentiment_score.objectivity,
-            emotional_tone=sentiment_score.emotional_tone,
-            summary=sentiment_analyzer.get_sentiment_summary(sentiment_score)
-        )
+        if base_version != session.version:
+            raise SessionConflictError(
+                f"Session is at version {session.version}, edit is based on version {base_version}"
+            )
+        text = sessions.resolve_edit(session.text, input_data.edits, input_data.text)
+        return await revise_session(session, text, base_version)
+    except InvalidEditError as e:
+        raise HTTPException(status_code=400, detail=e.message)
+    except SessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=e.message)
+    except SessionConflictError as e:
+        raise HTTPException(status_code=409, detail=e.message)
+    except ExecutorBusyError as e:
+        raise HTTPException(status_code=503, detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/sessions/{session_id}", response_model=SessionState)
+async def session_state(session_id: str):
+    """Return the current version of a session with all of its issues."""
+    return get_session(session_id).state()
+
+@app.delete("/sessions/{session_id}", status_code=204)
+async def close_session(session_id: str):
+    """Close an editing session."""
+    try:
+        session_manager.delete(session_id)
+    except SessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=e.message)
+    return Response(status_code=204)
+
+@app.get("/style-guides")
+async def list_style_guides():
+    """List the loaded style guides with their rule counts and compile times."""
+    return analysis.style_processor.list_guides()
+
 @app.get("/health")
 async def health_check():
     """API health check endpoint."""
-    return {"status": "healthy", "version": "1.0.0"}
\ No newline at end of file
+    return {"status": "healthy", "version": "1.0.0"}
+
+@app.get("/health/models")
+async def model_memory():
+    """Report the spaCy models loaded in each analysis worker and their memory footprint."""
+    try:
+        workers = await executor.worker_reports()
+    except ExecutorBusyError as e:
+        raise HTTPException(status_code=503, detail=e.message)
+    return {
+        "executor": executor.executor_type,
+        "workers": workers,
+        "reporting_workers": len(workers),
+        "expected_workers": executor.max_workers if executor.executor_type == "process" else 1,
+        "total_rss_bytes": sum(worker["process_rss_bytes"] or 0 for worker in workers),
+    }
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Report result cache hit/miss/eviction counters."""
+    return result_cache.stats()
+
+@app.get("/health/executor")
+async def executor_stats():
+    """Report the analysis executor configuration and queue depth."""
+    stats = executor.stats()
+    if scheduler is not None:
+        stats["microbatching"] = scheduler.stats()
+    return stats
\ No newline at end of file
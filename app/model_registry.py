@@ -0,0 +1,136 @@
+import os
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import spacy
+
+from .config import get_settings
+from .exceptions import ModelNotFoundError
+
+
+def _current_rss() -> Optional[int]:
+    """Return the resident set size of this process in bytes, if available."""
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class ModelRegistry:
+    """Process-wide registry of spaCy pipelines with get-or-load semantics.
+
+    Every processor and utility asks the registry for its pipeline instead of
+    calling ``spacy.load`` itself, so each process holds exactly one copy of a
+    given model (and of its vocab and StringStore).
+    """
+
+    def __init__(self, default_model: Optional[str] = None):
+        self.default_model = default_model or get_settings().nlp_model
+        self._models: Dict[str, spacy.Language] = {}
+        self._rss_deltas: Dict[str, Optional[int]] = {}
+        self._serialized_sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_name: Optional[str] = None) -> spacy.Language:
+        """Return the pipeline for ``model_name``, loading it on first use."""
+        model_name = model_name or self.default_model
+        nlp = self._models.get(model_name)
+        if nlp is not None:
+            return nlp
+
+        with self._lock:
+            # Another thread may have finished loading while we waited.
+            nlp = self._models.get(model_name)
+            if nlp is None:
+                rss_before = _current_rss()
+                nlp = self._load(model_name)
+                rss_after = _current_rss()
+                self._rss_deltas[model_name] = (
+                    rss_after - rss_before
+                    if rss_before is not None and rss_after is not None
+                    else None
+                )
+                self._models[model_name] = nlp
+        return nlp
+
+    def _load(self, model_name: str) -> spacy.Language:
+        """Load an installed spaCy pipeline; models are never downloaded at runtime."""
+        try:
+            return spacy.load(model_name)
+        except OSError as e:
+            raise ModelNotFoundError(
+                f"spaCy model '{model_name}' is not installed; "
+                f"run `python -m app.assets bootstrap` to install it ({e})"
+            )
+
+    def register(self, model_name: str, nlp: spacy.Language) -> None:
+        """Register an already constructed pipeline under ``model_name``."""
+        with self._lock:
+            self._models[model_name] = nlp
+            self._rss_deltas.setdefault(model_name, None)
+            self._serialized_sizes.pop(model_name, None)
+
+    def is_loaded(self, model_name: Optional[str] = None) -> bool:
+        """Check whether a model has already been loaded in this process."""
+        return (model_name or self.default_model) in self._models
+
+    def loaded_models(self) -> List[str]:
+        """Return the names of all loaded models."""
+        return list(self._models)
+
+    def memory_footprint(self, model_name: Optional[str] = None) -> Dict[str, Any]:
+        """Report the memory footprint of one loaded model."""
+        model_name = model_name or self.default_model
+        nlp = self._models.get(model_name)
+        if nlp is None:
+            return {"model": model_name, "loaded": False}
+
+        if model_name not in self._serialized_sizes:
+            self._serialized_sizes[model_name] = len(nlp.to_bytes())
+
+        vectors = nlp.vocab.vectors
+        return {
+            "model": model_name,
+            "loaded": True,
+            "version": nlp.meta.get("version"),
+            "pipeline": list(nlp.pipe_names),
+            "rss_delta_bytes": self._rss_deltas.get(model_name),
+            "serialized_bytes": self._serialized_sizes[model_name],
+            "vectors_bytes": int(vectors.data.nbytes) if vectors.shape[0] else 0,
+            "strings": len(nlp.vocab.strings),
+            "lexemes": len(nlp.vocab),
+        }
+
+    def memory_report(self) -> Dict[str, Any]:
+        """Report the footprint of every loaded model and the process total."""
+        models = [self.memory_footprint(name) for name in self.loaded_models()]
+        return {
+            "pid": os.getpid(),
+            "models": models,
+            "process_rss_bytes": _current_rss(),
+        }
+
+    def clear(self) -> None:
+        """Drop all loaded models."""
+        with self._lock:
+            self._models.clear()
+            self._rss_deltas.clear()
+            self._serialized_sizes.clear()
+
+
+@lru_cache()
+def get_model_registry() -> ModelRegistry:
+    return ModelRegistry()
+
+
+def memory_report() -> Dict[str, Any]:
+    """Report the models loaded in this process; picklable for pool workers."""
+    return get_model_registry().memory_report()
+
+
+def get_nlp(model_name: Optional[str] = None) -> spacy.Language:
+    """Return the shared spaCy pipeline for ``model_name``."""
+    return get_model_registry().get(model_name)
@@ -1,10 +1,12 @@
-from typing import Dict, List, Optional
+from typing import Dict, Generic, List, Optional, TypeVar
 from pydantic import BaseModel, Field
 
 class TextInput(BaseModel):
     text: str = Field(..., description="Input text to analyze or enhance")
     preserve_phrases: Optional[List[str]] = Field(default=None, description="Phrases to preserve during enhancement")
     optimization_level: str = Field(default="medium", description="Optimization level: light, medium, or aggressive")
+    style_guide: Optional[str] = Field(default=None, description="Name of a built-in or loaded style guide to check the text against")
+    use_cache: bool = Field(default=True, description="Serve a cached result if one exists; the fresh result is cached either way")
 
 class GrammarIssue(BaseModel):
     type: str
@@ -16,11 +18,21 @@ class GrammarIssue(BaseModel):
     article: Optional[str] = None
     noun: Optional[str] = None
 
+class GrammarEdit(BaseModel):
+    """One applied fix; together the edits map original offsets onto the enhanced text."""
+    rule: str
+    start: int
+    end: int
+    enhanced_start: int
+    enhanced_end: int
+    replacement: str
+
 class GrammarResponse(BaseModel):
     original_text: str
     enhanced_text: str
     issues: List[GrammarIssue]
     improvement_score: float
+    edits: List[GrammarEdit] = []
 
 class SentimentResponse(BaseModel):
     text: str
@@ -30,6 +42,133 @@ class SentimentResponse(BaseModel):
     emotional_tone: Dict[str, float]
     summary: str
 
+class StyleIssue(BaseModel):
+    rule_name: str
+    description: str
+    text: str
+    suggestion: str
+    start: int
+    end: int
+    severity: int
+
+class StyleResponse(BaseModel):
+    original_text: str
+    issues: List[StyleIssue]
+    style_guide_type: str
+    compliance_score: float
+
 class TextAnalysisResponse(BaseModel):
     grammar: GrammarResponse
-    sentiment: SentimentResponse
\ No newline at end of file
+    style: Optional[StyleResponse] = None
+    sentiment: SentimentResponse
+
+class BatchTextInput(BaseModel):
+    items: List[TextInput] = Field(..., description="Texts to analyze, each with its own options")
+    batch_size: Optional[int] = Field(default=None, gt=0, description="Texts per nlp.pipe batch; defaults to Settings.batch_size")
+
+ResultT = TypeVar("ResultT")
+
+class BatchItemResult(BaseModel, Generic[ResultT]):
+    index: int
+    result: Optional[ResultT] = None
+    error: Optional[str] = None
+
+class BatchResponse(BaseModel, Generic[ResultT]):
+    items: List[BatchItemResult[ResultT]]
+
+class StreamTextInput(BaseModel):
+    text: str = Field(..., description="Document to analyze; may exceed the single-request length limit")
+    style_guide: Optional[str] = Field(default=None, description="Name of a built-in or loaded style guide to check the text against")
+    window_chars: Optional[int] = Field(default=None, gt=0, description="Target characters per window; defaults to Settings.stream_window_chars")
+    overlap_sentences: Optional[int] = Field(default=None, ge=0, description="Sentences of context repeated from the previous window; defaults to Settings.stream_overlap_sentences")
+
+class ChunkSentiment(BaseModel):
+    polarity: float
+    subjectivity: float
+    objectivity: float
+    emotional_tone: Dict[str, float]
+
+class ChunkStats(BaseModel):
+    words: int
+    tokens: int
+    sentences: int
+    syllables: int
+
+class StreamChunk(BaseModel):
+    type: str = "chunk"
+    index: int
+    start: int
+    end: int
+    grammar_issues: List[GrammarIssue]
+    style_issues: List[StyleIssue] = []
+    sentiment: ChunkSentiment
+    stats: ChunkStats
+
+class ReadabilitySummary(BaseModel):
+    flesch_reading_ease: float
+    flesch_kincaid_grade: float
+    avg_sentence_length: float
+    words: int
+    sentences: int
+
+class StreamSummary(BaseModel):
+    type: str = "summary"
+    chunks: int
+    length: int
+    grammar_issue_count: int
+    improvement_score: float
+    style_guide_type: Optional[str] = None
+    style_issue_count: int = 0
+    compliance_score: Optional[float] = None
+    sentiment: ChunkSentiment
+    sentiment_summary: str
+    readability: ReadabilitySummary
+
+class SessionCreateInput(BaseModel):
+    text: str = Field(..., description="Initial document text")
+    style_guide: Optional[str] = Field(default=None, description="Name of a built-in or loaded style guide to check the document against")
+
+class TextEdit(BaseModel):
+    start: int = Field(..., ge=0, description="Start offset of the replaced range in the current version")
+    end: int = Field(..., ge=0, description="End offset (exclusive) of the replaced range in the current version")
+    text: str = Field(default="", description="Replacement text")
+
+class SessionEditInput(BaseModel):
+    edits: Optional[List[TextEdit]] = Field(default=None, description="Range edits against the current version")
+    text: Optional[str] = Field(default=None, description="Complete new version, instead of range edits")
+    base_version: Optional[int] = Field(default=None, description="Version the edits are based on; rejected with 409 if outdated")
+
+class SessionIssue(BaseModel):
+    id: str
+    category: str
+    type: str
+    text: str
+    start: int
+    end: int
+    suggestion: Optional[str] = None
+    severity: Optional[int] = None
+
+class IssueMove(BaseModel):
+    id: str
+    start: int
+    end: int
+
+class SessionDelta(BaseModel):
+    session_id: str
+    version: int
+    length: int
+    reanalyzed_paragraphs: int
+    reused_paragraphs: int
+    added: List[SessionIssue]
+    removed: List[str]
+    moved: List[IssueMove]
+    metrics: StreamSummary
+    metrics_delta: Dict[str, float]
+
+class SessionState(BaseModel):
+    session_id: str
+    version: int
+    text: str
+    style_guide: Optional[str] = None
+    issues: List[SessionIssue]
+    metrics: StreamSummary
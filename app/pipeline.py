@@ -0,0 +1,217 @@
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple, Union
+
+import spacy
+from spacy.tokens import Doc
+
+from .config import get_settings
+from .doc_store import DocStore, get_doc_store
+from .model_registry import get_nlp
+
+# Linguistic capabilities an analyzer can ask for. The tokenizer always runs.
+TOKENIZER = "tokenizer"
+TAGGER = "tagger"
+PARSER = "parser"
+NER = "ner"
+SENTS = "sents"
+
+ALL_COMPONENTS: FrozenSet[str] = frozenset({TOKENIZER, TAGGER, PARSER, NER, SENTS})
+
+# Pipeline components that provide each capability. For sentence boundaries
+# the first available provider wins, so a cheap senter/sentencizer is only used
+# when the pipeline has no parser.
+_PROVIDERS: Dict[str, Tuple[str, ...]] = {
+    TOKENIZER: (),
+    TAGGER: ("tagger", "morphologizer", "attribute_ruler", "lemmatizer"),
+    PARSER: ("parser",),
+    NER: ("ner", "entity_ruler"),
+}
+_SENTENCE_PROVIDERS: Tuple[str, ...] = ("parser", "senter", "sentencizer")
+
+# Token attributes that need more than the tokenizer, by capability
+_TOKEN_ATTR_COMPONENTS = {
+    "POS": TAGGER, "TAG": TAGGER, "MORPH": TAGGER, "LEMMA": TAGGER,
+    "DEP": PARSER, "SENT_START": SENTS, "IS_SENT_START": SENTS,
+    "ENT_TYPE": NER, "ENT_IOB": NER, "ENT_ID": NER, "ENT_KB_ID": NER,
+}
+
+_disabled_cache: Dict[Tuple[int, Tuple[str, ...], FrozenSet[str]], List[str]] = {}
+_disabled_cache_lock = threading.Lock()
+
+
+def requires(*components: str) -> Callable:
+    """Declare the pipeline capabilities a function needs from its Doc."""
+    unknown = set(components) - ALL_COMPONENTS
+    if unknown:
+        raise ValueError(f"Unknown pipeline components: {sorted(unknown)}")
+
+    def decorator(func: Callable) -> Callable:
+        func.required_components = frozenset(components)
+        return func
+
+    return decorator
+
+
+def required_components(*funcs: Callable) -> FrozenSet[str]:
+    """Return the union of the capabilities declared by ``funcs``."""
+    components: FrozenSet[str] = frozenset()
+    for func in funcs:
+        components |= getattr(func, "required_components", ALL_COMPONENTS)
+    return components
+
+
+def token_pattern_components(pattern: Sequence[Dict[str, Any]]) -> FrozenSet[str]:
+    """Pipeline capabilities a spaCy Matcher token pattern depends on."""
+    components = {TOKENIZER}
+    for token in pattern:
+        for attr in token:
+            component = _TOKEN_ATTR_COMPONENTS.get(attr.upper())
+            if component:
+                components.add(component)
+    return frozenset(components)
+
+
+def _active_pipes(nlp: spacy.Language, capability: str) -> List[str]:
+    """Return the active pipeline components providing ``capability``."""
+    if capability == SENTS:
+        for name in _SENTENCE_PROVIDERS:
+            if name in nlp.pipe_names:
+                return [name]
+        return []
+    return [name for name in _PROVIDERS[capability] if name in nlp.pipe_names]
+
+
+def disabled_components(nlp: spacy.Language, components: Iterable[str]) -> List[str]:
+    """Return the pipeline components not needed for ``components``."""
+    required = frozenset(components)
+    key = (id(nlp), tuple(nlp.pipe_names), required)
+    disabled = _disabled_cache.get(key)
+    if disabled is not None:
+        return disabled
+
+    keep = set()
+    for capability in required:
+        keep.update(_active_pipes(nlp, capability))
+
+    # Shared embedding layers (tok2vec/transformer) must run whenever one of
+    # the components listening to them runs.
+    for name, pipe in nlp.pipeline:
+        listeners = getattr(pipe, "listening_components", None)
+        if listeners and keep.intersection(listeners):
+            keep.add(name)
+
+    disabled = [name for name in nlp.pipe_names if name not in keep]
+    with _disabled_cache_lock:
+        _disabled_cache[key] = disabled
+    return disabled
+
+
+def _store_for(text: str) -> Optional[DocStore]:
+    """Return the parse store if ``text`` is long enough to be worth storing."""
+    store = get_doc_store()
+    if store is None or len(text) < get_settings().doc_store_min_chars:
+        return None
+    return store
+
+
+def _store_get(store: DocStore, text: str, nlp: spacy.Language,
+               components: Optional[Iterable[str]]) -> Optional[Doc]:
+    """Look ``text`` up in the parse store; a store error counts as a miss."""
+    try:
+        return store.get(text, nlp, components)
+    except sqlite3.Error as e:
+        store.record_error("read", e)
+        return None
+
+
+def _store_put(store: DocStore, text: str, doc: Doc, nlp: spacy.Language,
+               components: Optional[Iterable[str]]) -> None:
+    """Save a parse to the store; a store error only skips saving it."""
+    try:
+        store.put(text, doc, nlp, components)
+    except sqlite3.Error as e:
+        store.record_error("write", e)
+
+
+def parse(text: str,
+          components: Optional[Iterable[str]] = None,
+          nlp: Optional[spacy.Language] = None) -> Doc:
+    """Parse ``text`` running only the components needed for ``components``.
+
+    The unneeded components are disabled for this call only (rather than with
+    ``nlp.select_pipes``), so concurrent requests can share one pipeline.
+    Parses of texts long enough to be worth it are reused from, and saved to,
+    the on-disk parse store when one is configured; the store is only a
+    cache, so when it fails the text is simply parsed.
+    """
+    if nlp is None:
+        nlp = get_nlp()
+
+    store = _store_for(text)
+    if store is not None:
+        doc = _store_get(store, text, nlp, components)
+        if doc is not None:
+            return doc
+
+    if components is None:
+        doc = nlp(text)
+    else:
+        doc = nlp(text, disable=disabled_components(nlp, components))
+
+    if store is not None:
+        _store_put(store, text, doc, nlp, components)
+    return doc
+
+
+def parse_many(texts: Sequence[str],
+               components: Optional[Iterable[str]] = None,
+               nlp: Optional[spacy.Language] = None,
+               batch_size: Optional[int] = None) -> List[Union[Doc, Exception]]:
+    """Parse many texts in order with one batched ``nlp.pipe`` pass.
+
+    Texts already in the parse store are not parsed again. If the batched
+    pass fails, the texts are parsed one at a time so that a bad text only
+    yields its own exception in place of a Doc.
+    """
+    if nlp is None:
+        nlp = get_nlp()
+    if batch_size is None:
+        batch_size = get_settings().batch_size
+    disable = disabled_components(nlp, components) if components is not None else []
+
+    results: List[Union[Doc, Exception, None]] = [None] * len(texts)
+    pending = []
+    for index, text in enumerate(texts):
+        store = _store_for(text)
+        doc = _store_get(store, text, nlp, components) if store is not None else None
+        if doc is not None:
+            results[index] = doc
+        else:
+            pending.append(index)
+
+    try:
+        docs = list(nlp.pipe((texts[index] for index in pending), batch_size=batch_size, disable=disable))
+    except Exception:
+        docs = []
+        for index in pending:
+            try:
+                docs.append(nlp(texts[index], disable=disable))
+            except Exception as e:
+                docs.append(e)
+
+    for index, doc in zip(pending, docs):
+        results[index] = doc
+        store = _store_for(texts[index])
+        if store is not None and isinstance(doc, Doc):
+            _store_put(store, texts[index], doc, nlp, components)
+    return results
+
+
+def ensure_doc(text: Union[str, Doc],
+               nlp: Optional[spacy.Language] = None,
+               components: Optional[Iterable[str]] = None) -> Doc:
+    """Return ``text`` as a parsed Doc, parsing it only if it is a string."""
+    if isinstance(text, Doc):
+        return text
+    return parse(text, components, nlp)
@@ -1,70 +1,170 @@
-from typing import List, Dict, Tuple
+from typing import FrozenSet, List, Dict, Optional, Tuple, Union
+from dataclasses import dataclass
 import spacy
 from spacy.tokens import Doc, Token
+from ..model_registry import get_nlp
+from ..pipeline import PARSER, SENTS, TAGGER, ensure_doc, requires
+from .grammar_rules import GrammarRule, GrammarRuleSet, IssueFields
+from .text_edits import EditOp, OffsetMap, apply_edits, resolve_conflicts
+
+# Verb forms that don't follow the regular -s inflection
+THIRD_PERSON_FORMS = {'be': 'is', 'are': 'is', 'have': 'has', 'do': 'does', 'go': 'goes'}
+BASE_FORMS = {'is': 'are', 'has': 'have', 'does': 'do', 'goes': 'go'}
+
+# Words spelled with a vowel that start with a consonant sound ("a user",
+# "a one-time fee"), and words whose h is silent ("an hour"), by prefix
+CONSONANT_SOUND_PREFIXES = (
+    'eu', 'ewe', 'ubiq', 'ufo', 'uku', 'unan', 'unic', 'unif', 'union', 'uniq', 'unis', 'unit', 'univ',
+    'ura', 'ure', 'uri', 'uro', 'usa', 'use', 'usu', 'uten', 'uter', 'uti', 'uto',
+)
+CONSONANT_SOUND_WORDS = frozenset({'one', 'once', 'oneself', 'u', 'uni'})
+SILENT_H_PREFIXES = ('heir', 'honest', 'honor', 'honour', 'hour')
+
+@dataclass
+class Enhancement:
+    text: str
+    enhanced_text: str
+    issues: List[Dict]
+    edits: List[EditOp]  # applied fixes, in text order
+    offset_map: OffsetMap  # original offsets -> offsets in enhanced_text
+
+def match_case(word: str, like: str) -> str:
+    """Give ``word`` the capitalization of ``like``."""
+    if len(like) > 1 and like.isupper():
+        return word.upper()
+    if like[:1].isupper():
+        return word[:1].upper() + word[1:]
+    return word
+
+def third_person_form(base: str) -> str:
+    """Inflect a base verb form for a singular third-person subject."""
+    if base in THIRD_PERSON_FORMS:
+        return THIRD_PERSON_FORMS[base]
+    if base.endswith(('s', 'sh', 'ch', 'x', 'z', 'o')):
+        return base + 'es'
+    if len(base) > 1 and base.endswith('y') and base[-2] not in 'aeiou':
+        return base[:-1] + 'ies'
+    return base + 's'
+
+def base_form(verb: str) -> str:
+    """Undo the third-person -s inflection of a verb."""
+    if verb in BASE_FORMS:
+        return BASE_FORMS[verb]
+    if verb.endswith('ies') and len(verb) > 4:
+        return verb[:-3] + 'y'
+    if verb.endswith(('sses', 'shes', 'ches', 'xes', 'zes', 'oes')):
+        return verb[:-2]
+    if verb.endswith('s') and not verb.endswith('ss'):
+        return verb[:-1]
+    return verb
+
+def indefinite_article(word: str) -> Optional[str]:
+    """The indefinite article ``word`` takes, by its first sound; None when unsure.
+
+    Abbreviations are left alone: whether "NATO" or "FBI" is read as a word
+    or letter by letter can't be told from the spelling.
+    """
+    if len(word) > 1 and word.isupper():
+        return None
+    lower = word.lower()
+    if lower in CONSONANT_SOUND_WORDS or lower.startswith(CONSONANT_SOUND_PREFIXES):
+        return 'a'
+    if lower.startswith(SILENT_H_PREFIXES):
+        return 'an'
+    return 'an' if lower[:1] in ('a', 'e', 'i', 'o', 'u') else 'a'
 
 class GrammarEnhancer:
-    def __init__(self):
-        self.nlp = spacy.load('en_core_web_sm')
+    def __init__(self, nlp: Optional[spacy.Language] = None):
+        self._nlp = nlp
         self.initialize_rules()
     
+    @property
+    def nlp(self) -> spacy.Language:
+        """The shared spaCy pipeline, loaded on first use."""
+        if self._nlp is None:
+            self._nlp = get_nlp()
+        return self._nlp
+
+    @nlp.setter
+    def nlp(self, nlp: spacy.Language) -> None:
+        self._nlp = nlp
+    
     def initialize_rules(self):
         """Initialize grammar rules and patterns."""
-        self.subject_verb_patterns = [
-            {'POS': 'NOUN', 'DEP': 'nsubj'},
-            {'POS': 'VERB', 'DEP': 'ROOT'}
-        ]
-        self.article_patterns = [
-            {'POS': 'DET', 'DEP': 'det'},
-            {'POS': 'NOUN'}
-        ]
+        self.rules = GrammarRuleSet([
+            GrammarRule(
+                name='subject_verb_agreement',
+                # A noun subject of a present-tense root verb
+                pattern=[
+                    {'RIGHT_ID': 'verb', 'RIGHT_ATTRS': {'DEP': 'ROOT', 'POS': 'VERB', 'TAG': {'IN': ['VBZ', 'VBP']}}},
+                    {'LEFT_ID': 'verb', 'REL_OP': '>', 'RIGHT_ID': 'subject',
+                     'RIGHT_ATTRS': {'DEP': 'nsubj', 'POS': {'IN': ['NOUN', 'PROPN']}}}
+                ],
+                check=self._subject_verb_issue,
+                dependency=True,
+                fix=self._subject_verb_fix
+            ),
+            GrammarRule(
+                name='article_usage',
+                # An indefinite article and the word right after it
+                pattern=[
+                    {'LOWER': {'IN': ['a', 'an']}, 'POS': 'DET', 'DEP': 'det'},
+                    {'IS_ALPHA': True}
+                ],
+                check=self._article_issue,
+                fix=self._article_fix,
+                priority=1
+            )
+        ])
+
+    def add_rule(self, rule: GrammarRule) -> None:
+        """Register an additional grammar rule, replacing any rule of the same name."""
+        self.rules.add(rule)
+
+    def _subject_verb_issue(self, verb: Token, subject: Token) -> Optional[IssueFields]:
+        if self._check_agreement(subject, verb):
+            return None
+        return {'subject': subject.text, 'verb': verb.text}
+
+    def _subject_verb_fix(self, verb: Token, subject: Token) -> List[EditOp]:
+        word = verb.text.lower()
+        if self._get_subject_number(subject) == 'singular':
+            form = third_person_form(word)
+        else:
+            form = base_form(word)
+        return [EditOp(verb.idx, verb.idx + len(verb.text), match_case(form, verb.text))]
+
+    def _article_fix(self, article: Token, next_word: Token) -> List[EditOp]:
+        form = indefinite_article(next_word.text)
+        if form is None:
+            return []
+        return [EditOp(article.idx, article.idx + len(article.text), match_case(form, article.text))]
+
+    def _article_issue(self, article: Token, next_word: Token) -> Optional[IssueFields]:
+        if self._is_correct_article(article, next_word):
+            return None
+        return {'article': article.text, 'noun': article.head.text}
     
+    @requires(TAGGER, PARSER, SENTS)
     def check_subject_verb_agreement(self, doc: Doc) -> List[Dict]:
         """Check for subject-verb agreement issues."""
-        issues = []
-        for sent in doc.sents:
-            subject = None
-            verb = None
-            
-            for token in sent:
-                if token.dep_ == 'nsubj':
-                    subject = token
-                elif token.dep_ == 'ROOT' and token.pos_ == 'VERB':
-                    verb = token
-                
-                if subject and verb:
-                    if not self._check_agreement(subject, verb):
-                        issues.append({
-                            'type': 'subject_verb_agreement',
-                            'text': sent.text,
-                            'subject': subject.text,
-                            'verb': verb.text,
-                            'start': sent.start_char,
-                            'end': sent.end_char
-                        })
-        return issues
+        return self.rules.check(doc, ['subject_verb_agreement'])
     
+    @requires(TAGGER, PARSER, SENTS)
     def check_article_usage(self, doc: Doc) -> List[Dict]:
         """Check for incorrect article usage."""
-        issues = []
-        for token in doc:
-            if token.pos_ == 'DET' and token.dep_ == 'det':
-                if not self._is_correct_article(token):
-                    issues.append({
-                        'type': 'article_usage',
-                        'text': token.sent.text,
-                        'article': token.text,
-                        'noun': token.head.text,
-                        'start': token.sent.start_char,
-                        'end': token.sent.end_char
-                    })
-        return issues
+        return self.rules.check(doc, ['article_usage'])
     
     def _check_agreement(self, subject: Token, verb: Token) -> bool:
         """Check if subject and verb agree in number."""
-        subject_number = 'singular' if subject.tag_ in ['NN', 'NNP'] else 'plural'
+        subject_number = self._get_subject_number(subject)
         verb_number = self._get_verb_number(verb)
         return subject_number == verb_number
     
+    def _get_subject_number(self, subject: Token) -> str:
+        """Determine if subject is singular or plural."""
+        return 'singular' if subject.tag_ in ['NN', 'NNP'] else 'plural'
+
     def _get_verb_number(self, verb: Token) -> str:
         """Determine if verb is singular or plural."""
         if verb.tag_ in ['VBZ']:
@@ -73,32 +173,34 @@ class GrammarEnhancer:
             return 'plural'
         return 'unknown'
     
-    def _is_correct_article(self, article: Token) -> bool:
+    def _is_correct_article(self, article: Token, next_word: Token) -> bool:
         """Check if article usage is correct."""
-        if article.text.lower() in ['a', 'an']:
-            next_word = article.head
-            if next_word.text[0].lower() in 'aeiou':
-                return article.text.lower() == 'an'
-            return article.text.lower() == 'a'
-        return True
+        expected = indefinite_article(next_word.text)
+        return expected is None or article.text.lower() == expected
     
-    def enhance_text(self, text: str) -> Tuple[str, List[Dict]]:
-        """Enhance text by fixing grammar issues."""
-        doc = self.nlp(text)
-        issues = []
+    @property
+    def required_components(self) -> FrozenSet[str]:
+        """Pipeline capabilities needed by the grammar checks."""
+        return self.rules.required_components
+
+    def enhance(self, text: Union[str, Doc]) -> Enhancement:
+        """Find grammar issues and apply their fixes in one pass over the text.
+
+        Fixes that overlap are resolved in favor of the higher-priority
+        rule; the losing fixes are dropped but their issues still reported.
+        """
+        doc = ensure_doc(text, self.nlp, self.required_components)
+        text = doc.text
         
-        # Collect all issues
-        issues.extend(self.check_subject_verb_agreement(doc))
-        issues.extend(self.check_article_usage(doc))
+        # Collect all issues and fixes in one pass over the Doc
+        issues, proposed = self.rules.run(doc)
         
         # Apply fixes
-        enhanced_text = text
-        for issue in sorted(issues, key=lambda x: x['start'], reverse=True):
-            if issue['type'] == 'subject_verb_agreement':
-                # Apply fix based on subject number
-                pass
-            elif issue['type'] == 'article_usage':
-                # Apply article fix
-                pass
-        
-        return enhanced_text, issues
\ No newline at end of file
+        edits, _ = resolve_conflicts(proposed)
+        enhanced_text, offset_map = apply_edits(text, edits)
+        return Enhancement(text, enhanced_text, issues, edits, offset_map)
+
+    def enhance_text(self, text: Union[str, Doc]) -> Tuple[str, List[Dict]]:
+        """Enhance text (a string or an already parsed Doc) by fixing grammar issues."""
+        enhancement = self.enhance(text)
+        return enhancement.enhanced_text, enhancement.issues
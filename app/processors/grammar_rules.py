@@ -0,0 +1,146 @@
+"""Declarative grammar rules matched in one pass per Doc.
+
+A rule is a spaCy pattern plus a check that decides whether one match is
+an error. All token-sequence patterns are compiled into a single
+``Matcher`` and all dependency-tree patterns into a single
+``DependencyMatcher``, so a Doc is scanned once however many rules there
+are, and each match produces at most one issue::
+
+    GrammarRule(
+        name="article_usage",
+        pattern=[{"LOWER": {"IN": ["a", "an"]}, "DEP": "det"}, {"IS_ALPHA": True}],
+        check=check_article,  # (article, next_word) -> issue fields, or None if fine
+    )
+
+A check receives the matched tokens in the order of the pattern's nodes.
+A rule may also have a ``fix`` that receives the same tokens and returns
+the edits correcting the error; see :mod:`.text_edits`.
+Rules whose patterns use annotations the Doc doesn't have (for example
+dependency labels from a pipeline without a parser) are skipped.
+"""
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from spacy.matcher import DependencyMatcher, Matcher
+from spacy.tokens import Doc, Token
+
+from ..pipeline import PARSER, SENTS, token_pattern_components
+from .text_edits import EditOp
+
+# Issue fields a check adds to a match, such as the subject and verb
+IssueFields = Dict[str, str]
+
+# Token attributes the Matcher refuses to use on a Doc without them
+_ANNOTATED_ATTRS = ("TAG", "POS", "MORPH", "LEMMA", "DEP")
+
+
+@dataclass(frozen=True)
+class GrammarRule:
+    name: str  # issue type
+    pattern: List[Dict[str, Any]]  # Matcher pattern, or DependencyMatcher pattern if ``dependency``
+    check: Callable[..., Optional[IssueFields]]  # matched tokens -> issue fields, or None if correct
+    dependency: bool = False
+    fix: Optional[Callable[..., List[EditOp]]] = None  # matched tokens -> edits correcting the error
+    priority: int = 0  # which fix wins when fixes of different rules overlap
+
+    @property
+    def token_patterns(self) -> List[Dict[str, Any]]:
+        """The per-token attribute constraints of the pattern."""
+        if self.dependency:
+            return [node.get("RIGHT_ATTRS", {}) for node in self.pattern]
+        return self.pattern
+
+    @property
+    def required_components(self) -> FrozenSet[str]:
+        """Pipeline capabilities the rule needs; issues always report their sentence."""
+        components = token_pattern_components(self.token_patterns) | {SENTS}
+        if self.dependency:
+            components |= {PARSER}
+        return components
+
+    @property
+    def annotations(self) -> FrozenSet[str]:
+        """Doc annotations that must be present for the pattern to match."""
+        attrs = {attr.upper() for token in self.token_patterns for attr in token}
+        if self.dependency:
+            attrs.add("DEP")
+        return frozenset(attrs & set(_ANNOTATED_ATTRS))
+
+
+class GrammarRuleSet:
+    """Grammar rules compiled into one Matcher and one DependencyMatcher."""
+
+    def __init__(self, rules: Sequence[GrammarRule] = ()):
+        self.rules: List[GrammarRule] = []
+        self._matchers: Dict[Tuple[int, FrozenSet[int]], Tuple[Matcher, DependencyMatcher]] = {}
+        for rule in rules:
+            self.add(rule)
+
+    def add(self, rule: GrammarRule) -> None:
+        """Register a rule; a rule with the same name is replaced."""
+        self.rules = [existing for existing in self.rules if existing.name != rule.name] + [rule]
+        self._matchers = {}
+
+    @property
+    def required_components(self) -> FrozenSet[str]:
+        components: FrozenSet[str] = frozenset()
+        for rule in self.rules:
+            components |= rule.required_components
+        return components
+
+    def _get_matchers(self, doc: Doc) -> Tuple[List[int], Matcher, DependencyMatcher]:
+        active = frozenset(
+            index for index, rule in enumerate(self.rules)
+            if all(doc.has_annotation(attr) for attr in rule.annotations)
+        )
+        key = (id(doc.vocab), active)
+        matchers = self._matchers.get(key)
+        if matchers is None:
+            matcher, dependency_matcher = Matcher(doc.vocab), DependencyMatcher(doc.vocab)
+            for index in sorted(active):
+                rule = self.rules[index]
+                target = dependency_matcher if rule.dependency else matcher
+                target.add(str(index), [rule.pattern])
+            matchers = self._matchers[key] = (matcher, dependency_matcher)
+        return sorted(active), matchers[0], matchers[1]
+
+    def _matches(self, doc: Doc) -> List[Tuple[int, List[Token]]]:
+        active, matcher, dependency_matcher = self._get_matchers(doc)
+        if not active:
+            return []
+        strings = doc.vocab.strings
+        matches = []
+        if len(matcher):
+            for match_id, start, end in matcher(doc):
+                matches.append((int(strings[match_id]), list(doc[start:end])))
+        if len(dependency_matcher):
+            for match_id, token_ids in dependency_matcher(doc):
+                matches.append((int(strings[match_id]), [doc[i] for i in token_ids]))
+        return matches
+
+    def run(self, doc: Doc, names: Optional[Sequence[str]] = None) -> Tuple[List[Dict], List[EditOp]]:
+        """Return one issue per failing match, ordered by rule and then position, and the proposed fixes."""
+        issues = []
+        edits: List[EditOp] = []
+        for rule_index, tokens in self._matches(doc):
+            rule = self.rules[rule_index]
+            if names is not None and rule.name not in names:
+                continue
+            fields = rule.check(*tokens)
+            if fields is None:
+                continue
+            sent = tokens[0].sent
+            issues.append((rule_index, tokens[0].i, {
+                'type': rule.name,
+                'text': sent.text,
+                **fields,
+                'start': sent.start_char,
+                'end': sent.end_char
+            }))
+            if rule.fix is not None:
+                edits.extend(replace(edit, priority=rule.priority, source=rule.name) for edit in rule.fix(*tokens))
+        return [issue for _, _, issue in sorted(issues, key=lambda item: item[:2])], edits
+
+    def check(self, doc: Doc, names: Optional[Sequence[str]] = None) -> List[Dict]:
+        """Return one issue per failing match, ordered by rule and then position."""
+        return self.run(doc, names)[0]
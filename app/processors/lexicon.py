@@ -0,0 +1,237 @@
+"""Compact, memory-mapped sentiment lexicons.
+
+A lexicon is a directory holding a sorted array of term hashes and a
+matching float32 score matrix, one column per score::
+
+    lexicon.json   format version, column names and term count
+    keys.npy       uint64 ``LOWER`` hash of each term, sorted
+    scores.npy     float32 array of shape (terms, columns)
+
+Terms are keyed by the same hash spaCy stores in ``Token.lower``, so a
+Doc's ``to_array([LOWER])`` is looked up directly with one vectorized
+binary search. The arrays are memory-mapped read-only: loading costs no
+copy, and every worker process, forked or not, shares the same pages
+through the OS page cache however large the lexicon is.
+
+Lexicons are built from source files by a reader registered for their
+suffix (``.tsv`` and ``.csv`` out of the box)::
+
+    term	polarity	subjectivity	intensifier	negator	joy
+    good	0.7	0.6
+    very			1.5
+    not				-1.0
+
+    python -m app.processors.lexicon build terms.tsv lexicons/en
+    python -m app.processors.lexicon info lexicons/en
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from spacy.strings import hash_string
+
+from ..exceptions import InvalidLexiconError
+from ..storage import save_array_directory
+
+FORMAT_VERSION = 1
+META_FILE = "lexicon.json"
+KEYS_FILE = "keys.npy"
+SCORES_FILE = "scores.npy"
+
+POLARITY = "polarity"
+SUBJECTIVITY = "subjectivity"
+INTENSIFIER = "intensifier"  # multiplier applied to the next word's polarity
+NEGATOR = "negator"  # multiplier applied to polarity in the words that follow
+CORE_COLUMNS = (POLARITY, SUBJECTIVITY, INTENSIFIER, NEGATOR)
+
+# One lexicon entry: a term and its nonzero scores by column
+LexiconEntry = Tuple[str, Mapping[str, float]]
+LexiconReader = Callable[[str], Iterator[LexiconEntry]]
+
+
+def term_id(term: str) -> int:
+    """Hash ID of a term, equal to ``Token.lower`` of a token with that text."""
+    return hash_string(term.lower())
+
+
+class CompactLexicon:
+    """Scored terms as a sorted hash array with a float32 score matrix.
+
+    The arrays may be in memory or memory-mapped; lookups never copy more
+    than the rows they return.
+    """
+
+    def __init__(self, keys: np.ndarray, scores: np.ndarray, columns: Sequence[str]):
+        if scores.shape != (len(keys), len(columns)):
+            raise InvalidLexiconError(
+                f"Score matrix of shape {scores.shape} doesn't match {len(keys)} terms and {len(columns)} columns"
+            )
+        self.keys = keys
+        self.scores = scores
+        self.columns = tuple(columns)
+        self._column_index = {name: index for index, name in enumerate(self.columns)}
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[LexiconEntry], columns: Optional[Sequence[str]] = None) -> "CompactLexicon":
+        """Build an in-memory lexicon; a repeated term keeps its last scores."""
+        rows: Dict[int, Mapping[str, float]] = {}
+        for term, scores in entries:
+            rows[term_id(term)] = scores
+        if columns is None:
+            extra = sorted({name for scores in rows.values() for name in scores} - set(CORE_COLUMNS))
+            columns = CORE_COLUMNS + tuple(extra)
+        index = {name: position for position, name in enumerate(columns)}
+        keys = np.array(sorted(rows), dtype=np.uint64)
+        matrix = np.zeros((len(keys), len(columns)), dtype=np.float32)
+        for row, key in enumerate(keys.tolist()):
+            for name, value in rows[key].items():
+                if name not in index:
+                    raise InvalidLexiconError(f"Unknown lexicon column: {name}")
+                matrix[row, index[name]] = value
+        return cls(keys, matrix, columns)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "CompactLexicon":
+        """Open a lexicon directory written by :meth:`save`, memory-mapped by default."""
+        try:
+            with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != FORMAT_VERSION:
+                raise InvalidLexiconError(f"{path}: unsupported lexicon format {meta.get('version')}")
+            mode = "r" if mmap else None
+            keys = np.load(os.path.join(path, KEYS_FILE), mmap_mode=mode)
+            scores = np.load(os.path.join(path, SCORES_FILE), mmap_mode=mode)
+        except (OSError, ValueError) as e:
+            raise InvalidLexiconError(f"Can't load lexicon from {path}: {e}")
+        if keys.dtype != np.uint64 or scores.dtype != np.float32:
+            raise InvalidLexiconError(f"{path}: expected uint64 keys and float32 scores")
+        return cls(keys, scores, meta["columns"])
+
+    def save(self, path: str) -> None:
+        """Write the lexicon to a directory that :meth:`load` can map."""
+        save_array_directory(
+            path,
+            {
+                KEYS_FILE: np.ascontiguousarray(self.keys, dtype=np.uint64),
+                SCORES_FILE: np.ascontiguousarray(self.scores, dtype=np.float32),
+            },
+            META_FILE,
+            {"version": FORMAT_VERSION, "columns": list(self.columns), "terms": len(self.keys)},
+        )
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, term: str) -> bool:
+        return bool(self.lookup(np.array([term_id(term)], dtype=np.uint64))[0][0])
+
+    def has_column(self, name: str) -> bool:
+        return name in self._column_index
+
+    @property
+    def extra_columns(self) -> Tuple[str, ...]:
+        """Score columns beyond the core ones, such as emotions."""
+        return tuple(name for name in self.columns if name not in CORE_COLUMNS)
+
+    def lookup(self, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return a mask of the ``ids`` in the lexicon and the row of each one found."""
+        if not len(self.keys):
+            return np.zeros(len(ids), dtype=bool), np.zeros(0, dtype=np.intp)
+        positions = np.searchsorted(self.keys, ids)
+        positions[positions == len(self.keys)] = 0
+        found = self.keys[positions] == ids
+        return found, positions[found]
+
+    def column_scores(self, ids: np.ndarray, columns: Sequence[str]) -> np.ndarray:
+        """Scores of ``ids`` (zero for unknown terms) as a float64 array of shape (ids, columns)."""
+        result = np.zeros((len(ids), len(columns)), dtype=np.float64)
+        wanted = [(position, self._column_index[name]) for position, name in enumerate(columns)
+                  if name in self._column_index]
+        if not wanted or not len(ids):
+            return result
+        found, rows = self.lookup(ids)
+        if len(rows):
+            targets, sources = zip(*wanted)
+            result[np.ix_(found, list(targets))] = self.scores[np.ix_(rows, list(sources))]
+        return result
+
+    def get(self, term: str) -> Optional[Dict[str, float]]:
+        """Nonzero scores of one term, or None if it isn't in the lexicon."""
+        found, rows = self.lookup(np.array([term_id(term)], dtype=np.uint64))
+        if not found[0]:
+            return None
+        return {name: float(value) for name, value in zip(self.columns, self.scores[rows[0]]) if value}
+
+
+def read_delimited(path: str, delimiter: str) -> Iterator[LexiconEntry]:
+    """Read a lexicon source with a header row: ``term`` and then one column per score."""
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, None)
+        if not header or header[0] != "term":
+            raise InvalidLexiconError(f"{path}: the first column must be 'term'")
+        for line, row in enumerate(reader, start=2):
+            if not row or not row[0].strip() or row[0].startswith("#"):
+                continue
+            try:
+                scores = {name: float(value) for name, value in zip(header[1:], row[1:]) if value.strip()}
+            except ValueError as e:
+                raise InvalidLexiconError(f"{path}:{line}: {e}")
+            yield row[0].strip(), scores
+
+
+LEXICON_READERS: Dict[str, LexiconReader] = {
+    ".tsv": lambda path: read_delimited(path, "\t"),
+    ".csv": lambda path: read_delimited(path, ","),
+}
+
+
+def register_lexicon_reader(suffix: str, reader: LexiconReader) -> None:
+    """Add a reader for lexicon sources with the given file suffix."""
+    LEXICON_READERS[suffix.lower()] = reader
+
+
+def read_entries(path: str) -> Iterator[LexiconEntry]:
+    """Read a lexicon source with the reader registered for its suffix."""
+    suffix = os.path.splitext(path)[1].lower()
+    reader = LEXICON_READERS.get(suffix)
+    if reader is None:
+        raise InvalidLexiconError(f"No lexicon reader for '{suffix}' files")
+    return reader(path)
+
+
+def build_lexicon(sources: Sequence[str], path: str) -> CompactLexicon:
+    """Build a lexicon directory from source files; later sources override earlier ones."""
+    entries: List[LexiconEntry] = []
+    for source in sources:
+        entries.extend(read_entries(source))
+    lexicon = CompactLexicon.from_entries(entries)
+    lexicon.save(path)
+    return lexicon
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build or inspect compact sentiment lexicons")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Build a lexicon directory from source files")
+    build.add_argument("sources", nargs="+", help="Source files (.tsv, .csv)")
+    build.add_argument("output", help="Lexicon directory to write")
+    info = commands.add_parser("info", help="Describe a lexicon directory")
+    info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        lexicon = build_lexicon(args.sources, args.output)
+    else:
+        lexicon = CompactLexicon.load(args.path)
+    size = lexicon.keys.nbytes + lexicon.scores.nbytes
+    print(f"{len(lexicon)} terms, columns: {', '.join(lexicon.columns)} ({size / 1024:.1f} KiB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,12 @@
-from typing import Dict, List, Union
+from typing import Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
-import spacy
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
+import spacy
+from spacy.attrs import IS_PUNCT, LOWER
+from ..config import get_settings
+from ..model_registry import get_nlp
+from ..pipeline import TOKENIZER, ensure_doc, requires
+from .lexicon import CORE_COLUMNS, INTENSIFIER, NEGATOR, POLARITY, SUBJECTIVITY, CompactLexicon
 
 @dataclass
 class SentimentScore:
@@ -13,13 +16,30 @@ class SentimentScore:
     objectivity: float  # 0 to 1
 
 class SentimentAnalyzer:
-    def __init__(self):
-        self.nlp = spacy.load('en_core_web_sm')
-        self.initialize_lexicons()
-        self.vectorizer = TfidfVectorizer()
+    # A negator flips the polarity of up to this many following words in its clause
+    NEGATION_WINDOW = 3
+
+    def __init__(self, nlp: Optional[spacy.Language] = None, lexicon: Optional[CompactLexicon] = None):
+        self._nlp = nlp
+        self.initialize_lexicons(lexicon)
     
-    def initialize_lexicons(self):
-        """Initialize sentiment lexicons and emotion dictionaries."""
+    @property
+    def nlp(self) -> spacy.Language:
+        """The shared spaCy pipeline, loaded on first use."""
+        if self._nlp is None:
+            self._nlp = get_nlp()
+        return self._nlp
+
+    @nlp.setter
+    def nlp(self, nlp: spacy.Language) -> None:
+        self._nlp = nlp
+    
+    def initialize_lexicons(self, lexicon: Optional[CompactLexicon] = None):
+        """Initialize sentiment lexicons and emotion dictionaries.
+
+        A compact lexicon, passed in or configured with
+        ``sentiment_lexicon_path``, replaces the built-in word lists.
+        """
         # Example emotion categories
         self.emotion_categories = {
             'joy': ['happy', 'delighted', 'pleased'],
@@ -32,19 +52,43 @@ class SentimentAnalyzer:
         # Initialize polarity words
         self.positive_words = set(['good', 'great', 'excellent'])
         self.negative_words = set(['bad', 'poor', 'terrible'])
+
+        if lexicon is None:
+            path = get_settings().sentiment_lexicon_path
+            # Memory-mapped, so every worker shares one copy of the lexicon
+            lexicon = CompactLexicon.load(path) if path else None
+        if lexicon is None:
+            self.index_lexicons()
+        else:
+            self.use_lexicon(lexicon)
+
+    def index_lexicons(self) -> None:
+        """Build the lexicon from the built-in word lists; rerun after changing them."""
+        entries: Dict[str, Dict[str, float]] = {}
+        for word in self.positive_words | self.negative_words:
+            entries[word.lower()] = {
+                POLARITY: float((word in self.positive_words) - (word in self.negative_words)),
+                SUBJECTIVITY: 1.0,
+            }
+        for emotion, words in self.emotion_categories.items():
+            for word in words:
+                entries.setdefault(word.lower(), {})[emotion] = 1.0
+        self.use_lexicon(CompactLexicon.from_entries(entries.items(), CORE_COLUMNS + tuple(self.emotion_categories)))
+
+    def use_lexicon(self, lexicon: CompactLexicon) -> None:
+        """Score with ``lexicon``; its non-core columns are the emotions reported."""
+        self.lexicon = lexicon
+        self.emotions: Tuple[str, ...] = lexicon.extra_columns
     
-    def analyze_sentiment(self, text: str) -> SentimentScore:
-        """Analyze the sentiment of the given text."""
-        doc = self.nlp(text)
-        
-        # Calculate polarity
-        polarity = self._calculate_polarity(doc)
-        
-        # Calculate subjectivity
-        subjectivity = self._calculate_subjectivity(doc)
+    # Lexicon scoring only looks at token text and punctuation flags
+    required_components = frozenset({TOKENIZER})
+
+    @requires(TOKENIZER)
+    def analyze_sentiment(self, text: Union[str, spacy.tokens.Doc]) -> SentimentScore:
+        """Analyze the sentiment of the given text or already parsed Doc."""
+        doc = ensure_doc(text, self.nlp, self.required_components)
         
-        # Analyze emotional tone
-        emotional_tone = self._analyze_emotional_tone(doc)
+        polarity, subjectivity, emotional_tone = self._score(doc)
         
         # Calculate objectivity
         objectivity = 1 - subjectivity
@@ -56,44 +100,56 @@ class SentimentAnalyzer:
             objectivity=objectivity
         )
     
-    def _calculate_polarity(self, doc: spacy.tokens.Doc) -> float:
-        """Calculate the polarity score of the text."""
-        positive_count = sum(1 for token in doc if token.text.lower() in self.positive_words)
-        negative_count = sum(1 for token in doc if token.text.lower() in self.negative_words)
-        
-        total_words = len([token for token in doc if not token.is_punct])
-        if total_words == 0:
-            return 0.0
-        
-        return (positive_count - negative_count) / total_words
-    
-    def _calculate_subjectivity(self, doc: spacy.tokens.Doc) -> float:
-        """Calculate the subjectivity score of the text."""
-        subjective_words = self.positive_words.union(self.negative_words)
-        subjective_count = sum(1 for token in doc if token.text.lower() in subjective_words)
-        
-        total_words = len([token for token in doc if not token.is_punct])
-        if total_words == 0:
-            return 0.0
+    def _polarity_modifiers(self, intensifiers: np.ndarray, negators: np.ndarray, punct: np.ndarray) -> np.ndarray:
+        """Per-token polarity multipliers from preceding intensifiers and negators.
+
+        Neither reaches past punctuation, so a negation stays in its clause.
+        """
+        modifiers = np.ones(len(punct), dtype=np.float64)
+        if not (intensifiers.any() or negators.any()):
+            return modifiers
+        clause = np.cumsum(punct)
+        for offset in range(1, min(self.NEGATION_WINDOW, len(punct) - 1) + 1):
+            same_clause = clause[offset:] == clause[:-offset]
+            negated = (negators[:-offset] != 0) & same_clause
+            modifiers[offset:][negated] *= negators[:-offset][negated]
+            if offset == 1:
+                intensified = (intensifiers[:-1] != 0) & same_clause
+                modifiers[1:][intensified] *= intensifiers[:-1][intensified]
+        return modifiers
+
+    def _score(self, doc: spacy.tokens.Doc) -> Tuple[float, float, Dict[str, float]]:
+        """Score polarity, subjectivity and emotional tone in one pass over the Doc.
+
+        Tokens are looked up in the lexicon by their ``LOWER`` hash ID, so no
+        token text is materialized and the whole Doc is scored with one
+        vectorized binary search per distinct set of terms.
+        """
+        attrs = doc.to_array([LOWER, IS_PUNCT]).reshape(-1, 2)
+        lower = attrs[:, 0]
+        punct = attrs[:, 1] != 0
+        total_words = len(lower) - int(np.count_nonzero(punct))
         
-        return subjective_count / total_words
-    
-    def _analyze_emotional_tone(self, doc: spacy.tokens.Doc) -> Dict[str, float]:
-        """Analyze the emotional tone of the text."""
-        text_words = set(token.text.lower() for token in doc)
-        emotion_scores = {}
+        polarity = subjectivity = 0.0
+        if total_words:
+            scores = self.lexicon.column_scores(lower, (POLARITY, SUBJECTIVITY, INTENSIFIER, NEGATOR))
+            modifiers = self._polarity_modifiers(scores[:, 2], scores[:, 3], punct)
+            polarity = float(np.dot(scores[:, 0], modifiers)) / total_words
+            subjectivity = float(scores[:, 1].sum()) / total_words
         
-        for emotion, words in self.emotion_categories.items():
-            emotion_words = set(words)
-            intersection = text_words.intersection(emotion_words)
-            score = len(intersection) / len(text_words) if text_words else 0.0
-            emotion_scores[emotion] = score
+        # Emotional tone is the emotion weight per distinct word
+        distinct = np.unique(lower)
+        emotion_scores = self.lexicon.column_scores(distinct, self.emotions)
+        emotional_tone = {
+            emotion: float(emotion_scores[:, n].sum()) / len(distinct) if len(distinct) else 0.0
+            for n, emotion in enumerate(self.emotions)
+        }
         
-        return emotion_scores
+        return polarity, subjectivity, emotional_tone
     
     def get_sentiment_summary(self, score: SentimentScore) -> str:
         """Generate a human-readable summary of the sentiment analysis."""
         polarity_desc = 'positive' if score.polarity > 0 else 'negative' if score.polarity < 0 else 'neutral'
-        dominant_emotion = max(score.emotional_tone.items(), key=lambda x: x[1])[0]
+        dominant_emotion = max(score.emotional_tone.items(), key=lambda x: x[1], default=('none', 0.0))[0]
         
         return f"The text has a {polarity_desc} tone (polarity: {score.polarity:.2f}) with {score.subjectivity:.1%} subjectivity. The dominant emotion is {dominant_emotion}."
\ No newline at end of file
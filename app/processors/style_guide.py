@@ -1,9 +1,13 @@
-from typing import Dict, List, Optional, Tuple
-import re
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple, Union
 from enum import Enum
 from dataclasses import dataclass
 import spacy
 from spacy.tokens import Doc, Span, Token
+from ..model_registry import get_nlp
+from ..pipeline import SENTS, TAGGER, TOKENIZER, ensure_doc, required_components, requires
+from ..config import get_settings
+from .style_library import DOCUMENT_WIDE_CHECKS, LoadedStyleGuide, StyleGuideLibrary, StyleGuideSpec
+from .style_matcher import CompiledStyleGuide, StyleRule, StyleViolation
 
 class StyleGuideType(Enum):
     ACADEMIC = "academic"
@@ -11,29 +15,32 @@ class StyleGuideType(Enum):
     TECHNICAL = "technical"
     CREATIVE = "creative"
 
-@dataclass
-class StyleRule:
-    name: str
-    description: str
-    pattern: str
-    suggestion: str
-    severity: int  # 1 (suggestion) to 3 (critical)
-
-@dataclass
-class StyleViolation:
-    rule_name: str
-    description: str
-    text: str
-    suggestion: str
-    start: int
-    end: int
-    severity: int
+# A built-in guide or the name of any loaded guide
+StyleGuideName = Union[StyleGuideType, str]
+
+# A noun seen by the terminology check: (text, start offset)
+Term = Tuple[str, int]
+
+def guide_name(style_type: StyleGuideName) -> str:
+    """Return the name a guide is registered under."""
+    return style_type.value if isinstance(style_type, StyleGuideType) else style_type
 
 class StyleGuideProcessor:
-    def __init__(self):
-        self.nlp = spacy.load('en_core_web_sm')
+    def __init__(self, nlp: Optional[spacy.Language] = None):
+        self._nlp = nlp
         self.initialize_style_guides()
     
+    @property
+    def nlp(self) -> spacy.Language:
+        """The shared spaCy pipeline, loaded on first use."""
+        if self._nlp is None:
+            self._nlp = get_nlp()
+        return self._nlp
+
+    @nlp.setter
+    def nlp(self, nlp: spacy.Language) -> None:
+        self._nlp = nlp
+    
     def initialize_style_guides(self):
         """Initialize style guides for different writing types."""
         self.style_guides: Dict[StyleGuideType, List[StyleRule]] = {
@@ -64,9 +71,13 @@ class StyleGuideProcessor:
                 StyleRule(
                     name="passive_voice",
                     description="Prefer active voice in business writing",
-                    pattern=r"\b(am|is|are|was|were|being|been|be)\s+\w+ed\b",
+                    pattern=None,
                     suggestion="Use active voice for clarity",
-                    severity=1
+                    severity=1,
+                    token_pattern=[
+                        {"LOWER": {"IN": ["am", "is", "are", "was", "were", "being", "been", "be"]}},
+                        {"TAG": "VBN"}
+                    ]
                 ),
                 StyleRule(
                     name="jargon",
@@ -91,38 +102,140 @@ class StyleGuideProcessor:
                     suggestion="Use present tense for clarity",
                     severity=1
                 )
+            ],
+            StyleGuideType.CREATIVE: [
+                StyleRule(
+                    name="cliches",
+                    description="Avoid cliches in creative writing",
+                    pattern=r"\b(at the end of the day|only time will tell|time will tell|in the nick of time|"
+                            r"few and far between|avoid it like the plague|calm before the storm|"
+                            r"all walks of life|the last straw|dead as a doornail)\b",
+                    suggestion="Replace the cliche with a fresh, specific image",
+                    severity=2
+                ),
+                StyleRule(
+                    name="filler_words",
+                    description="Filler words weaken prose",
+                    pattern=r"\b(very|really|just|quite|rather|somewhat|actually|basically)\b",
+                    suggestion="Cut the word or choose a stronger one",
+                    severity=1
+                ),
+                StyleRule(
+                    name="adverb_dialogue_tags",
+                    description="Adverbs on dialogue tags tell instead of show",
+                    pattern=r"\b(said|asked|replied|whispered|shouted)\s+\w+ly\b",
+                    suggestion="Let the dialogue or action carry the emotion",
+                    severity=1
+                ),
+                StyleRule(
+                    name="repeated_words",
+                    description="Accidentally repeated word",
+                    pattern=r"\b(\w+)\s+\1\b",
+                    suggestion="Remove the repeated word",
+                    severity=2
+                )
             ]
         }
-    
-    def check_style(self, text: str, style_type: StyleGuideType) -> List[StyleViolation]:
-        """Check text against specified style guide rules."""
-        doc = self.nlp(text)
-        violations = []
-        rules = self.style_guides.get(style_type, [])
-        
-        for rule in rules:
-            matches = list(re.finditer(rule.pattern, text, re.IGNORECASE))
-            for match in matches:
-                violations.append(
-                    StyleViolation(
-                        rule_name=rule.name,
-                        description=rule.description,
-                        text=match.group(),
-                        suggestion=rule.suggestion,
-                        start=match.start(),
-                        end=match.end(),
-                        severity=rule.severity
-                    )
+        # Document-level checks by built-in guide, referenced by name from guide files
+        self.builtin_checks: Dict[StyleGuideType, Tuple[str, ...]] = {
+            StyleGuideType.ACADEMIC: ("sentence_complexity",),
+            StyleGuideType.TECHNICAL: ("terminology_consistency",),
+        }
+        settings = get_settings()
+        # Guides are compiled once here and recompiled only when a guide file changes
+        self.library = StyleGuideLibrary(
+            [
+                StyleGuideSpec(
+                    name=style_type.value,
+                    rules=tuple(rules),
+                    checks=self.builtin_checks.get(style_type, ())
                 )
+                for style_type, rules in self.style_guides.items()
+            ],
+            directory=settings.style_guides_dir,
+            poll_interval=settings.style_guides_poll_interval
+        )
+    
+    def guide(self, style_type: StyleGuideName) -> LoadedStyleGuide:
+        """Return the current compiled version of a guide."""
+        return self.library.get(guide_name(style_type))
+
+    def has_guide(self, style_type: StyleGuideName) -> bool:
+        """Whether a guide with this name is loaded."""
+        return guide_name(style_type) in self.library
+
+    def guide_version(self, style_type: StyleGuideName) -> str:
+        """Content hash of a guide, which changes whenever the guide is edited."""
+        return self.guide(style_type).content_hash
+
+    def document_checks(self, guide: LoadedStyleGuide,
+                        document_wide: bool = True) -> List[Callable[[Doc], List[StyleViolation]]]:
+        """Checks of ``guide`` that look at the whole parsed document.
+
+        With ``document_wide=False`` the checks that compare different parts
+        of the document (see ``DOCUMENT_WIDE_CHECKS``) are left out.
+        """
+        checks = {
+            "sentence_complexity": self._check_sentence_complexity,
+            "terminology_consistency": self._check_terminology_consistency,
+        }
+        return [
+            checks[name] for name in guide.spec.checks
+            if document_wide or name not in DOCUMENT_WIDE_CHECKS
+        ]
+
+    def checks_terminology(self, style_type: StyleGuideName) -> bool:
+        """Whether ``style_type`` runs the document-wide terminology check."""
+        return "terminology_consistency" in self.guide(style_type).spec.checks
+
+    def _needs_doc(self, guide: LoadedStyleGuide) -> bool:
+        return bool(guide.spec.checks) or guide.compiled.needs_doc
+
+    def _required_components(self, guide: LoadedStyleGuide) -> FrozenSet[str]:
+        components = required_components(*self.document_checks(guide)) | guide.compiled.required_components
+        return components or frozenset({TOKENIZER})
+
+    def needs_doc(self, style_type: StyleGuideName) -> bool:
+        """Whether checking ``style_type`` needs a parsed Doc at all."""
+        return self._needs_doc(self.guide(style_type))
+
+    def required_components(self, style_type: StyleGuideName) -> FrozenSet[str]:
+        """Pipeline capabilities needed to check text against ``style_type``."""
+        return self._required_components(self.guide(style_type))
+
+    def check_style(self, text: Union[str, Doc], style_type: StyleGuideName,
+                    document_wide: bool = True) -> List[StyleViolation]:
+        """Check text (or an already parsed Doc) against specified style guide rules.
+
+        Regex and word-list rules run on the raw text. A string is only
+        parsed, with just the components the guide needs, if the guide has
+        token-pattern rules or document-level checks. Pass
+        ``document_wide=False`` when ``text`` is one part of a larger
+        document whose document-wide checks are run separately.
+        """
+        # One snapshot of the guide for the whole check, even if it is reloaded meanwhile
+        guide = self.guide(style_type)
+        doc = text if isinstance(text, Doc) else None
+        raw = doc.text if doc is not None else text
+        if doc is None and self._needs_doc(guide):
+            doc = ensure_doc(raw, self.nlp, self._required_components(guide))
+
+        matches = guide.compiled.match_text(raw)
+        if doc is not None:
+            matches.extend(guide.compiled.match_doc(doc))
+        violations = guide.compiled.violations(raw, matches)
         
-        # Add specific checks based on style type
-        if style_type == StyleGuideType.ACADEMIC:
-            violations.extend(self._check_sentence_complexity(doc))
-        elif style_type == StyleGuideType.TECHNICAL:
-            violations.extend(self._check_terminology_consistency(doc))
+        # Add document-level checks named by the guide
+        for check in self.document_checks(guide, document_wide):
+            violations.extend(check(doc))
         
         return violations
+
+    def list_guides(self) -> Dict[str, Any]:
+        """Describe every loaded guide with its rule count and compile time."""
+        return self.library.listing()
     
+    @requires(SENTS)
     def _check_sentence_complexity(self, doc: Doc) -> List[StyleViolation]:
         """Check for overly complex sentences in academic writing."""
         violations = []
@@ -144,28 +257,41 @@ class StyleGuideProcessor:
         
         return violations
     
-    def _check_terminology_consistency(self, doc: Doc) -> List[StyleViolation]:
-        """Check for consistent terminology use in technical writing."""
+    @requires(TAGGER)
+    def terminology_terms(self, doc: Doc) -> List[Term]:
+        """The nouns the terminology check compares, in document order."""
+        return [(token.text, token.idx) for token in doc if token.pos_ in ['NOUN', 'PROPN']]
+
+    def check_terminology(self, terms: Sequence[Term]) -> List[StyleViolation]:
+        """Flag nouns spelled differently from their first use among ``terms``.
+
+        Taking the terms rather than a Doc lets a document analyzed in parts
+        be checked as a whole from the terms of each part.
+        """
         violations = []
         term_variants = {}
         
-        for token in doc:
-            if token.pos_ in ['NOUN', 'PROPN']:
-                lowercase = token.text.lower()
-                if lowercase in term_variants:
-                    if token.text != term_variants[lowercase]:
-                        violations.append(
-                            StyleViolation(
-                                rule_name="inconsistent_terminology",
-                                description="Inconsistent term usage",
-                                text=token.text,
-                                suggestion=f"Use '{term_variants[lowercase]}' consistently",
-                                start=token.idx,
-                                end=token.idx + len(token.text),
-                                severity=2
-                            )
+        for text, start in terms:
+            lowercase = text.lower()
+            if lowercase in term_variants:
+                if text != term_variants[lowercase]:
+                    violations.append(
+                        StyleViolation(
+                            rule_name="inconsistent_terminology",
+                            description="Inconsistent term usage",
+                            text=text,
+                            suggestion=f"Use '{term_variants[lowercase]}' consistently",
+                            start=start,
+                            end=start + len(text),
+                            severity=2
                         )
-                else:
-                    term_variants[lowercase] = token.text
+                    )
+            else:
+                term_variants[lowercase] = text
         
-        return violations
\ No newline at end of file
+        return violations
+
+    @requires(TAGGER)
+    def _check_terminology_consistency(self, doc: Doc) -> List[StyleViolation]:
+        """Check for consistent terminology use in technical writing."""
+        return self.check_terminology(self.terminology_terms(doc))
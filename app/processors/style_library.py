@@ -0,0 +1,325 @@
+"""Style guides defined in files, compiled once and reloaded when they change.
+
+Every ``*.yaml``, ``*.yml`` or ``*.json`` file in the configured directory
+defines one guide::
+
+    name: acme               # defaults to the file name
+    description: House style for Acme
+    checks: [sentence_complexity]   # optional document-level checks
+    rules:
+      - name: jargon
+        description: Minimize business jargon
+        suggestion: Use simpler, clearer terms
+        severity: 2
+        keywords: [synergy, paradigm, leverage]
+      - name: future_tense
+        description: Use present tense
+        suggestion: Use present tense for clarity
+        severity: 1
+        pattern: '\\b(will|shall)\\s+\\w+\\b'
+      - name: passive_voice
+        description: Prefer active voice
+        suggestion: Use active voice for clarity
+        severity: 1
+        token_pattern: [{LOWER: {IN: [is, was, were]}}, {TAG: VBN}]
+
+File guides are added to the built-in ones and replace a built-in guide of
+the same name. Compiled guides are cached by a hash of their content, so a
+reload only compiles guides that actually changed. A reload runs in a
+background thread, builds a new set of guides off to the side and swaps it
+in with one assignment: requests only read the current set and never wait
+for a directory scan or a compile. Replace files atomically (write, then
+rename) to avoid reading a half-written file; a file that fails to load,
+including one with an invalid token pattern, keeps its previous version.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..exceptions import InvalidStyleGuideError, UnknownStyleGuideError
+from .style_matcher import CompiledStyleGuide, StyleRule
+
+BUILTIN_SOURCE = "builtin"
+GUIDE_SUFFIXES = (".yaml", ".yml", ".json")
+DOCUMENT_CHECKS = ("sentence_complexity", "terminology_consistency")
+# Document checks whose result for one sentence depends on the rest of the document
+DOCUMENT_WIDE_CHECKS = ("terminology_consistency",)
+
+_GUIDE_NAME = re.compile(r"[\w-]+")
+_SIMPLE_KEYWORD = re.compile(r"\w+(?: \w+)*")
+
+
+@dataclass(frozen=True)
+class StyleGuideSpec:
+    """The definition of one guide, before compilation."""
+    name: str
+    rules: Tuple[StyleRule, ...]
+    checks: Tuple[str, ...] = ()
+    description: str = ""
+    source: str = BUILTIN_SOURCE
+
+    @property
+    def content_hash(self) -> str:
+        """Hash of everything that affects matching."""
+        payload = json.dumps(
+            {"rules": [asdict(rule) for rule in self.rules], "checks": list(self.checks)},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class LoadedStyleGuide:
+    """A compiled guide ready for matching."""
+    spec: StyleGuideSpec
+    compiled: CompiledStyleGuide
+    content_hash: str
+    compile_seconds: float
+
+
+def keywords_pattern(keywords: Sequence[str]) -> str:
+    """Build a whole-word, case-insensitive pattern matching any of ``keywords``."""
+    if all(_SIMPLE_KEYWORD.fullmatch(keyword) for keyword in keywords):
+        # Plain words stay in the form the keyword trie recognizes
+        return r"\b(" + "|".join(keywords) + r")\b"
+    return r"\b(" + "|".join(re.escape(keyword) for keyword in keywords) + r")\b"
+
+
+def rule_from_dict(data: Dict[str, Any]) -> StyleRule:
+    """Build a rule from its file form; exactly one of pattern, keywords or token_pattern is set."""
+    forms = [key for key in ("pattern", "keywords", "token_pattern") if data.get(key)]
+    if len(forms) != 1:
+        raise InvalidStyleGuideError(
+            f"Rule '{data.get('name')}' needs exactly one of pattern, keywords or token_pattern"
+        )
+    try:
+        pattern = data.get("pattern")
+        if data.get("keywords"):
+            pattern = keywords_pattern([str(keyword) for keyword in data["keywords"]])
+        if pattern is not None:
+            re.compile(pattern)
+        severity = int(data.get("severity", 1))
+        if not 1 <= severity <= 3:
+            raise ValueError("severity must be between 1 and 3")
+        return StyleRule(
+            name=str(data["name"]),
+            description=str(data.get("description", "")),
+            pattern=pattern,
+            suggestion=str(data.get("suggestion", "")),
+            severity=severity,
+            token_pattern=data.get("token_pattern"),
+        )
+    except (KeyError, TypeError, ValueError, re.error) as e:
+        raise InvalidStyleGuideError(f"Invalid rule '{data.get('name')}': {e}")
+
+
+def spec_from_dict(data: Dict[str, Any], default_name: str, source: str) -> StyleGuideSpec:
+    """Build a guide spec from the parsed contents of a guide file."""
+    if not isinstance(data, dict) or not isinstance(data.get("rules", []), list):
+        raise InvalidStyleGuideError(f"{source}: expected a mapping with a list of rules")
+    name = str(data.get("name") or default_name)
+    if not _GUIDE_NAME.fullmatch(name):
+        raise InvalidStyleGuideError(f"{source}: invalid guide name '{name}'")
+    checks = tuple(data.get("checks") or ())
+    unknown = [check for check in checks if check not in DOCUMENT_CHECKS]
+    if unknown:
+        raise InvalidStyleGuideError(f"{source}: unknown checks {unknown}")
+    return StyleGuideSpec(
+        name=name,
+        rules=tuple(rule_from_dict(rule) for rule in data.get("rules", [])),
+        checks=checks,
+        description=str(data.get("description", "")),
+        source=source,
+    )
+
+
+def read_guide_file(path: str) -> StyleGuideSpec:
+    """Load one guide from a YAML or JSON file."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            if path.endswith(".json"):
+                data = json.load(f)
+            else:
+                import yaml
+
+                data = yaml.safe_load(f)
+    except Exception as e:  # OSError, JSON and YAML errors
+        raise InvalidStyleGuideError(f"{path}: {e}")
+    return spec_from_dict(data, os.path.splitext(os.path.basename(path))[0], path)
+
+
+class StyleGuideLibrary:
+    """The current set of compiled guides: built-ins plus a directory of files.
+
+    :meth:`get` checks the directory for changes at most once every
+    ``poll_interval`` seconds (a listing and a stat per file), in a
+    background thread that reloads it when anything changed. Every process
+    polls on its own, so pool workers and forked servers pick up changes
+    without a restart.
+    """
+
+    def __init__(self,
+                 builtins: Sequence[StyleGuideSpec],
+                 directory: Optional[str] = None,
+                 poll_interval: float = 2.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.builtins = list(builtins)
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self._clock = clock
+        self._guides: Dict[str, LoadedStyleGuide] = {}
+        self._compiled: Dict[str, Tuple[CompiledStyleGuide, float]] = {}
+        self._signature: Optional[Tuple] = None
+        self._next_check = 0.0
+        self._reload_lock = threading.Lock()
+        self._poll_lock = threading.Lock()
+        self._reloader: Optional[threading.Thread] = None
+        self.errors: Dict[str, str] = {}
+        self.reloads = 0
+        self.reload()
+
+    def _directory_signature(self) -> Tuple:
+        """Names, sizes and modification times of the guide files."""
+        if not self.directory or not os.path.isdir(self.directory):
+            return ()
+        signature = []
+        for entry in sorted(os.scandir(self.directory), key=lambda e: e.name):
+            if entry.name.endswith(GUIDE_SUFFIXES) and entry.is_file():
+                stat = entry.stat()
+                signature.append((entry.name, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def _compile(self, spec: StyleGuideSpec) -> LoadedStyleGuide:
+        content_hash = spec.content_hash
+        cached = self._compiled.get(content_hash)
+        if cached is None:
+            start = time.perf_counter()
+            try:
+                compiled = CompiledStyleGuide(spec.rules)
+            except (ValueError, re.error) as e:  # spaCy's MatchPatternError is a ValueError
+                raise InvalidStyleGuideError(f"{spec.source}: {e}")
+            cached = (compiled, time.perf_counter() - start)
+        return LoadedStyleGuide(spec, cached[0], content_hash, cached[1])
+
+    def _load(self, signature: Tuple) -> None:
+        previous = {guide.spec.source: guide for guide in self._guides.values()}
+        guides: Dict[str, LoadedStyleGuide] = {}
+        errors: Dict[str, str] = {}
+        for spec in self.builtins:
+            guides[spec.name] = self._compile(spec)
+        for name, _, _ in signature:
+            path = os.path.join(self.directory, name)
+            try:
+                guide = self._compile(read_guide_file(path))
+            except Exception as e:
+                errors[path] = str(e)
+                guide = previous.get(path)
+                if guide is None:
+                    continue
+            if guide.spec.name in guides and guides[guide.spec.name].spec.source != BUILTIN_SOURCE:
+                errors[path] = f"Duplicate guide name '{guide.spec.name}'"
+            guides[guide.spec.name] = guide
+        # Swap in the new set in one step; readers hold on to the old dict
+        self._compiled = {guide.content_hash: (guide.compiled, guide.compile_seconds) for guide in guides.values()}
+        self._guides = guides
+        self._signature = signature
+        self.errors = errors
+
+    def reload(self) -> None:
+        """Reload the directory unconditionally."""
+        with self._reload_lock:
+            self._load(self._directory_signature())
+            self._next_check = self._clock() + self.poll_interval
+
+    def _due(self) -> bool:
+        return bool(self.directory) and self._clock() >= self._next_check
+
+    def _reload_if_changed(self) -> bool:
+        # If another thread is already reloading, keep using the current set
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        try:
+            signature = self._directory_signature()
+            if signature == self._signature:
+                return False
+            self._load(signature)
+            self.reloads += 1
+            return True
+        finally:
+            self._reload_lock.release()
+
+    def refresh(self) -> bool:
+        """Reload on the calling thread if a check is due and the directory changed.
+
+        Returns whether a reload happened.
+        """
+        if not self._due():
+            return False
+        self._next_check = self._clock() + self.poll_interval
+        return self._reload_if_changed()
+
+    def poll(self) -> None:
+        """Check the directory in a background thread if a check is due.
+
+        Request paths call this and carry on with the current set at once;
+        a changed guide is swapped in when its thread has compiled it.
+        """
+        if not self._due():
+            return
+        with self._poll_lock:
+            if not self._due() or (self._reloader is not None and self._reloader.is_alive()):
+                return
+            self._next_check = self._clock() + self.poll_interval
+            self._reloader = threading.Thread(
+                target=self._reload_if_changed, name="style-guide-reload", daemon=True
+            )
+            self._reloader.start()
+
+    def wait_for_reload(self, timeout: Optional[float] = None) -> None:
+        """Wait for a background reload started by :meth:`poll` to finish."""
+        reloader = self._reloader
+        if reloader is not None:
+            reloader.join(timeout)
+
+    def get(self, name: str) -> LoadedStyleGuide:
+        """Return the current version of a guide."""
+        self.poll()
+        guide = self._guides.get(name)
+        if guide is None:
+            raise UnknownStyleGuideError(f"Unknown style guide: {name}")
+        return guide
+
+    def __contains__(self, name: str) -> bool:
+        self.poll()
+        return name in self._guides
+
+    def names(self) -> List[str]:
+        self.poll()
+        return sorted(self._guides)
+
+    def listing(self) -> Dict[str, Any]:
+        """Describe every guide with its rule count and compile time."""
+        self.poll()
+        guides = self._guides
+        return {
+            "directory": self.directory,
+            "reloads": self.reloads,
+            "errors": dict(self.errors),
+            "guides": [
+                {
+                    "name": name,
+                    "description": guide.spec.description,
+                    "source": guide.spec.source,
+                    "content_hash": guide.content_hash,
+                    "rule_count": len(guide.spec.rules),
+                    "checks": list(guide.spec.checks),
+                    "compile_ms": round(guide.compile_seconds * 1000, 3),
+                }
+                for name, guide in sorted(guides.items())
+            ],
+        }
@@ -0,0 +1,285 @@
+"""Single-pass matching of a whole style guide.
+
+A guide's rules are compiled once, when the guide is loaded, into three
+matchers that each scan the text or Doc a single time:
+
+* word-list rules (``\\b(word|other word|...)\\b``) go into a keyword trie
+  walked once over the words of the text;
+* other regex rules are combined into one alternation of named groups;
+* token-pattern rules go into one spaCy ``Matcher``.
+
+Regex and word-list rules report exactly the matches ``re.finditer`` would
+report for each rule on its own, so guides can grow to hundreds of rules
+without adding a scan per rule.
+"""
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from spacy.matcher import Matcher
+from spacy.tokens import Doc
+from spacy.vocab import Vocab
+
+from ..pipeline import token_pattern_components
+
+# A match of one rule: (rule index, start char, end char)
+RuleMatch = Tuple[int, int, int]
+
+_WORD = re.compile(r"\w+")
+_WORD_LIST = re.compile(r"\\b\((?:\?:)?([\w |]+)\)\\b")
+# Patterns with their own groups or backreferences can't be combined safely
+_UNCOMBINABLE = re.compile(r"\(\?P|\\[1-9]|\(\?[aiLmsux]")
+
+
+def keyword_alternatives(pattern: str) -> Optional[List[str]]:
+    """Return the words of a ``\\b(a|b c|...)\\b`` pattern, or None for other patterns."""
+    match = _WORD_LIST.fullmatch(pattern)
+    if match is None:
+        return None
+    alternatives = match.group(1).split("|")
+    if any(not alt or alt != " ".join(alt.split()) for alt in alternatives):
+        return None
+    return alternatives
+
+
+class KeywordMatcher:
+    """Trie of lowercased words and phrases, matched in one pass over the text."""
+
+    _END = ""
+
+    def __init__(self):
+        self._trie: Dict[str, Any] = {}
+
+    def add(self, rule_index: int, alternatives: Sequence[str]) -> None:
+        for priority, phrase in enumerate(alternatives):
+            node = self._trie
+            for word in phrase.lower().split():
+                node = node.setdefault(word, {})
+            node.setdefault(self._END, []).append((rule_index, priority, phrase.lower()))
+
+    def __bool__(self) -> bool:
+        return bool(self._trie)
+
+    def scan(self, text: str) -> List[RuleMatch]:
+        """Return every rule match, with ``re.finditer`` semantics per rule."""
+        words = [(m.start(), m.end(), m.group().lower()) for m in _WORD.finditer(text)]
+        last_end: Dict[int, int] = {}
+        matches = []
+        for i, (start, _, word) in enumerate(words):
+            node = self._trie.get(word)
+            if node is None:
+                continue
+            # Per rule, the first alternative (in pattern order) that matches here wins
+            best: Dict[int, Tuple[int, int]] = {}
+            j = i
+            while node is not None:
+                end = words[j][1]
+                for rule_index, priority, phrase in node.get(self._END, ()):
+                    # Separators between the words must match the phrase exactly
+                    if text[start:end].lower() == phrase:
+                        if rule_index not in best or priority < best[rule_index][0]:
+                            best[rule_index] = (priority, end)
+                j += 1
+                node = node.get(words[j][2]) if j < len(words) else None
+            for rule_index, (_, end) in best.items():
+                if start >= last_end.get(rule_index, 0):
+                    matches.append((rule_index, start, end))
+                    last_end[rule_index] = end
+        return matches
+
+
+class RegexMatcher:
+    """Regex rules combined into one alternation scanned once over the text."""
+
+    def __init__(self, flags: int = re.IGNORECASE):
+        self.flags = flags
+        self._rules: List[Tuple[int, "re.Pattern"]] = []
+        self._separate: List[Tuple[int, "re.Pattern"]] = []
+        self._combined: Optional["re.Pattern"] = None
+
+    def add(self, rule_index: int, pattern: str) -> None:
+        compiled = re.compile(pattern, self.flags)
+        if _UNCOMBINABLE.search(pattern):
+            self._separate.append((rule_index, compiled))
+        else:
+            self._rules.append((rule_index, compiled))
+        self._combined = None
+
+    def __bool__(self) -> bool:
+        return bool(self._rules or self._separate)
+
+    def compile(self) -> None:
+        """Build the combined alternation; called once after all rules are added."""
+        if not self._rules:
+            return
+        # A lookahead finds every position where any rule matches without
+        # consuming text, so matches of different rules may overlap
+        alternation = "|".join(f"(?P<r{n}>{compiled.pattern})" for n, (_, compiled) in enumerate(self._rules))
+        self._combined = re.compile(f"(?=(?:{alternation}))", self.flags)
+
+    def scan(self, text: str) -> List[RuleMatch]:
+        """Return every rule match, with ``re.finditer`` semantics per rule."""
+        matches = []
+        if self._rules:
+            if self._combined is None:
+                self.compile()
+            last_end = [0] * len(self._rules)
+            for candidate in self._combined.finditer(text):
+                position = candidate.start()
+                # Rules before the matched group don't match here; check the rest
+                first = int(candidate.lastgroup[1:])
+                for n in range(first, len(self._rules)):
+                    if position < last_end[n]:
+                        continue
+                    rule_index, compiled = self._rules[n]
+                    if n == first:
+                        end = candidate.end(candidate.lastgroup)
+                    else:
+                        match = compiled.match(text, position)
+                        if match is None:
+                            continue
+                        end = match.end()
+                    if end > position:
+                        matches.append((rule_index, position, end))
+                        last_end[n] = end
+        for rule_index, compiled in self._separate:
+            matches.extend((rule_index, m.start(), m.end()) for m in compiled.finditer(text) if m.end() > m.start())
+        return matches
+
+
+class TokenMatcher:
+    """Token-attribute rules matched with one spaCy ``Matcher`` per vocab."""
+
+    def __init__(self):
+        self._patterns: List[Tuple[int, List[Dict[str, Any]]]] = []
+        self._matcher: Optional[Matcher] = None
+        self.required_components: FrozenSet[str] = frozenset()
+
+    def add(self, rule_index: int, pattern: List[Dict[str, Any]]) -> None:
+        self._patterns.append((rule_index, pattern))
+        self.required_components |= token_pattern_components(pattern)
+        self._matcher = None
+
+    def __bool__(self) -> bool:
+        return bool(self._patterns)
+
+    def _build(self, vocab: Vocab, validate: bool = False) -> Matcher:
+        matcher = Matcher(vocab, validate=validate)
+        for rule_index, pattern in self._patterns:
+            matcher.add(str(rule_index), [pattern])
+        return matcher
+
+    def compile(self) -> None:
+        """Build and validate the Matcher; called once after all rules are added.
+
+        Raises ``ValueError`` (spaCy's ``MatchPatternError``) for an invalid
+        pattern, so a bad guide is rejected when it is loaded rather than on
+        the first request that uses it. The Matcher is rebuilt on the first
+        Doc if that Doc has another vocab.
+        """
+        if self._patterns:
+            self._matcher = self._build(Vocab(), validate=True)
+
+    def _get_matcher(self, doc: Doc) -> Matcher:
+        if self._matcher is None or self._matcher.vocab is not doc.vocab:
+            self._matcher = self._build(doc.vocab)
+        return self._matcher
+
+    def scan(self, doc: Doc) -> List[RuleMatch]:
+        """Return every rule match in ``doc``."""
+        strings = doc.vocab.strings
+        return [
+            (int(strings[match_id]), doc[start].idx, doc[end - 1].idx + len(doc[end - 1].text))
+            for match_id, start, end in self._get_matcher(doc)(doc)
+        ]
+
+
+@dataclass
+class StyleRule:
+    name: str
+    description: str
+    pattern: Optional[str]  # regex, matched case-insensitively
+    suggestion: str
+    severity: int  # 1 (suggestion) to 3 (critical)
+    token_pattern: Optional[List[Dict[str, Any]]] = None  # spaCy Matcher pattern, used instead of ``pattern``
+
+
+@dataclass
+class StyleViolation:
+    rule_name: str
+    description: str
+    text: str
+    suggestion: str
+    start: int
+    end: int
+    severity: int
+
+
+class CompiledStyleGuide:
+    """A style guide's rules compiled into matchers that each scan once.
+
+    Word-list regexes go into a keyword trie, other regexes into one
+    combined alternation and token patterns into one spaCy Matcher.
+    """
+
+    def __init__(self, rules: Sequence[StyleRule]):
+        self.rules = list(rules)
+        self.keywords = KeywordMatcher()
+        self.regexes = RegexMatcher()
+        self.tokens = TokenMatcher()
+        for index, rule in enumerate(self.rules):
+            if rule.token_pattern:
+                self.tokens.add(index, rule.token_pattern)
+                continue
+            alternatives = keyword_alternatives(rule.pattern)
+            if alternatives is not None:
+                self.keywords.add(index, alternatives)
+            else:
+                self.regexes.add(index, rule.pattern)
+        self.regexes.compile()
+        self.tokens.compile()
+
+    @property
+    def needs_doc(self) -> bool:
+        """Whether any rule matches on token attributes and so needs a Doc."""
+        return bool(self.tokens)
+
+    @property
+    def required_components(self) -> FrozenSet[str]:
+        """Pipeline capabilities needed by the token-pattern rules."""
+        return self.tokens.required_components
+
+    def match_text(self, text: str) -> List[RuleMatch]:
+        """Lexical stage: match the regex and word-list rules on raw text."""
+        matches: List[RuleMatch] = []
+        if self.keywords:
+            matches.extend(self.keywords.scan(text))
+        if self.regexes:
+            matches.extend(self.regexes.scan(text))
+        return matches
+
+    def match_doc(self, doc: Doc) -> List[RuleMatch]:
+        """Linguistic stage: match the token-pattern rules on a parsed Doc."""
+        return self.tokens.scan(doc) if self.tokens else []
+
+    def violations(self, text: str, matches: List[RuleMatch]) -> List[StyleViolation]:
+        """Turn rule matches into violations, ordered by rule and then position."""
+        violations = []
+        for rule_index, start, end in sorted(matches):
+            rule = self.rules[rule_index]
+            violations.append(
+                StyleViolation(
+                    rule_name=rule.name,
+                    description=rule.description,
+                    text=text[start:end],
+                    suggestion=rule.suggestion,
+                    start=start,
+                    end=end,
+                    severity=rule.severity
+                )
+            )
+        return violations
+
+    def match(self, doc: Doc) -> List[StyleViolation]:
+        """Return every rule violation in ``doc``."""
+        return self.violations(doc.text, self.match_text(doc.text) + self.match_doc(doc))
@@ -0,0 +1,95 @@
+"""Applying many text edits at once, with a map from old to new offsets.
+
+Fixes proposed by different rules may overlap. :func:`resolve_conflicts`
+keeps a non-overlapping subset, preferring higher priority and then
+narrower edits, and :func:`apply_edits` applies it in a single pass: the
+untouched stretches and replacements are collected in order and joined
+once, so the cost is linear in the text length however many edits there
+are. The returned :class:`OffsetMap` moves any span of the original text
+onto the edited text without re-parsing it.
+"""
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Iterable, List, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class EditOp:
+    """Replace ``text[start:end]`` with ``replacement``; ``start == end`` inserts."""
+    start: int
+    end: int
+    replacement: str
+    priority: int = 0  # higher wins when edits conflict
+    source: str = ""  # the rule that proposed the edit
+
+
+def _conflicts(a: EditOp, b: EditOp) -> bool:
+    if a.start == a.end or b.start == b.end:
+        point, other = (a, b) if a.start == a.end else (b, a)
+        if other.start == other.end:
+            return point.start == other.start  # two insertions at one point have no defined order
+        return other.start < point.start < other.end
+    return a.start < b.end and b.start < a.end
+
+
+def resolve_conflicts(edits: Iterable[EditOp]) -> Tuple[List[EditOp], List[EditOp]]:
+    """Split edits into a non-overlapping set to apply, in text order, and the rejected rest."""
+    accepted: List[EditOp] = []
+    keys: List[Tuple[int, int]] = []  # (start, end) of ``accepted``, sorted
+    rejected = []
+    for edit in sorted(edits, key=lambda e: (-e.priority, e.end - e.start, e.start, e.end)):
+        index = bisect_right(keys, (edit.start, edit.end))
+        # Accepted edits don't overlap, so only the neighbours in text order can overlap a new one
+        neighbours = accepted[max(index - 1, 0):index + 1]
+        if any(_conflicts(edit, other) for other in neighbours):
+            rejected.append(edit)
+            continue
+        accepted.insert(index, edit)
+        keys.insert(index, (edit.start, edit.end))
+    return accepted, rejected
+
+
+class OffsetMap:
+    """Maps offsets in the original text to offsets in the edited text."""
+
+    def __init__(self, edits: Sequence[EditOp]):
+        # ``edits`` are non-overlapping and in text order
+        self._starts = [edit.start for edit in edits]
+        self._ends = [edit.end for edit in edits]
+        self._new_starts = []
+        self._new_ends = []
+        shift = 0
+        for edit in edits:
+            self._new_starts.append(edit.start + shift)
+            shift += len(edit.replacement) - (edit.end - edit.start)
+            self._new_ends.append(edit.end + shift)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def map(self, offset: int, right: bool = False) -> int:
+        """Map one offset; one inside a replaced range moves to its start, or its end if ``right``."""
+        # Last edit that starts at or before ``offset`` (strictly before for a left edge)
+        index = (bisect_right(self._starts, offset) if right else bisect_left(self._starts, offset)) - 1
+        if index < 0:
+            return offset
+        if offset < self._ends[index] or (right and offset == self._ends[index]):
+            return self._new_ends[index] if right else self._new_starts[index]
+        return offset + self._new_ends[index] - self._ends[index]
+
+    def map_span(self, start: int, end: int) -> Tuple[int, int]:
+        """Map a ``[start, end)`` span so it covers any replacement inside it."""
+        return self.map(start), max(self.map(start), self.map(end, right=True))
+
+
+def apply_edits(text: str, edits: Sequence[EditOp]) -> Tuple[str, OffsetMap]:
+    """Apply non-overlapping edits in one pass."""
+    edits = sorted(edits, key=lambda edit: (edit.start, edit.end))
+    pieces = []
+    position = 0
+    for edit in edits:
+        pieces.append(text[position:edit.start])
+        pieces.append(edit.replacement)
+        position = edit.end
+    pieces.append(text[position:])
+    return "".join(pieces), OffsetMap(edits)
@@ -0,0 +1,103 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Runs a batch of tasks and returns one outcome per task, in order
+BatchRunner = Callable[[Sequence[Any]], Awaitable[Sequence[Any]]]
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-item requests into batches.
+
+    Tasks submitted within ``window`` seconds of the first task of a batch
+    are collected and handed to ``run_batch`` together; a batch is sent
+    early as soon as it reaches ``max_batch_size`` tasks or, when
+    ``max_batch_weight`` is set, tasks whose ``weight`` adds up to it. Each
+    submitter awaits only its own outcome, so callers see a single-item API
+    with at most ``window`` extra latency.
+    """
+
+    def __init__(self, run_batch: BatchRunner, window: float = 0.005, max_batch_size: int = 32,
+                 max_batch_weight: Optional[float] = None, weight: Callable[[Any], float] = lambda task: 1):
+        self.run_batch = run_batch
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.max_batch_weight = max_batch_weight
+        self.weight = weight
+        self._queue: List[Tuple[Any, asyncio.Future]] = []
+        self._queue_weight = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: set = set()
+        self.batches = 0
+        self.tasks = 0
+
+    async def submit(self, task: Any) -> Any:
+        """Queue ``task`` for the next batch and wait for its outcome."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((task, future))
+        self._queue_weight += self.weight(task)
+        if len(self._queue) >= self.max_batch_size or (
+            self.max_batch_weight is not None and self._queue_weight >= self.max_batch_weight
+        ):
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """Send everything queued so far as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._queue:
+            return
+        batch, self._queue = self._queue, []
+        self._queue_weight = 0.0
+        self.batches += 1
+        self.tasks += len(batch)
+        runner = asyncio.ensure_future(self._run(batch))
+        # Keep a reference so the batch is not garbage collected mid-flight
+        self._inflight.add(runner)
+        runner.add_done_callback(self._inflight.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        try:
+            outcomes = await self.run_batch([task for task, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), outcome in zip(batch, outcomes):
+            if not future.done():
+                future.set_result(outcome)
+
+    def stats(self) -> Dict[str, Any]:
+        """Report how many tasks were coalesced into how many batches."""
+        return {
+            "window_ms": self.window * 1000,
+            "max_batch_size": self.max_batch_size,
+            "max_batch_weight": self.max_batch_weight,
+            "batches": self.batches,
+            "tasks": self.tasks,
+            "avg_batch_size": self.tasks / self.batches if self.batches else 0.0,
+            "queued": len(self._queue),
+        }
+
+
+def split_batch(tasks: Sequence[Any], parts: int, weight: Callable[[Any], float]) -> List[List[Any]]:
+    """Split ``tasks`` into at most ``parts`` contiguous chunks of about equal total ``weight``."""
+    if not tasks:
+        return []
+    parts = max(1, min(parts, len(tasks)))
+    total = sum(weight(task) for task in tasks)
+    chunks: List[List[Any]] = [[]]
+    done = 0.0
+    for task in tasks:
+        task_weight = weight(task)
+        # Start the next chunk once this task lies mostly past the current chunk's share
+        if chunks[-1] and len(chunks) < parts and done + task_weight / 2 > total * len(chunks) / parts:
+            chunks.append([])
+        chunks[-1].append(task)
+        done += task_weight
+    return chunks
@@ -0,0 +1,149 @@
+import argparse
+import gc
+import logging
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def preload() -> None:
+    """Load the app, shared models, lexicons and style guides in this process.
+
+    Called in the master before forking so every worker inherits the loaded
+    objects through copy-on-write instead of building its own copy.
+    """
+    from .main import app  # noqa: F401  (builds the processors)
+    from .model_registry import get_nlp
+
+    get_nlp()
+    # Move everything loaded so far into the permanent generation. Without
+    # this, the collector's reference-count updates on these objects would
+    # touch (and so copy) the shared pages in every worker.
+    gc.collect()
+    gc.freeze()
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """Create the listening socket shared by all workers."""
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(sock: socket.socket, log_level: str) -> None:
+    """Serve the preloaded app on ``sock`` until the worker is told to stop."""
+    import uvicorn
+    from .main import app
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    config = uvicorn.Config(app, log_level=log_level)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class PreforkServer:
+    """Master process that preloads the app and supervises forked workers."""
+
+    def __init__(self, host: str, port: int, workers: int, log_level: str = "info"):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.log_level = log_level
+        self.children: Dict[int, int] = {}  # pid -> worker slot
+        self._stopping = False
+        self._sock: Optional[socket.socket] = None
+
+    def spawn(self, slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                run_worker(self._sock, self.log_level)
+            except BaseException:
+                logger.exception(f"Worker {slot} crashed")
+                status = 1
+            finally:
+                os._exit(status)
+        self.children[pid] = slot
+        logger.info(f"Started worker {slot} (pid {pid})")
+
+    def stop(self, signum: int, frame) -> None:
+        self._stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> None:
+        self._sock = bind_socket(self.host, self.port)
+        preload()
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        logger.info(f"Serving on {self.host}:{self.port} with {self.workers} workers")
+
+        for slot in range(self.workers):
+            self.spawn(slot)
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            slot = self.children.pop(pid, None)
+            if slot is not None and not self._stopping:
+                logger.warning(f"Worker {slot} (pid {pid}) exited with status {status}; restarting")
+                time.sleep(1)
+                self.spawn(slot)
+        self._sock.close()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the Text Semantic Optimizer API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        help="Number of forked worker processes (default: WEB_CONCURRENCY or the CPU count)"
+    )
+    parser.add_argument("--log-level", default="info")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper())
+    session_dir = None
+    if args.workers > 1:
+        # Each forked worker is already one process per core, so analysis runs
+        # on a single in-process thread by default instead of a nested pool.
+        os.environ.setdefault("EXECUTOR_TYPE", "thread")
+        os.environ.setdefault("EXECUTOR_WORKERS", "1")
+    # Requests of one editing session can land on any worker, so sessions
+    # must be shared; unless configured, keep them in a file for this run.
+    if args.workers > 1 and not os.environ.get("SESSION_STORE_PATH"):
+        session_dir = tempfile.mkdtemp(prefix="text-optimizer-sessions-")
+        os.environ["SESSION_STORE_PATH"] = os.path.join(session_dir, "sessions.sqlite")
+    try:
+        PreforkServer(args.host, args.port, args.workers, args.log_level).run()
+    finally:
+        if session_dir is not None:
+            shutil.rmtree(session_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,479 @@
+"""Incremental re-analysis of documents that are edited over time.
+
+A session holds the latest version of a document together with the
+analysis of each of its paragraphs, keyed by a hash of the paragraph text.
+When an edit arrives only paragraphs whose text is new are parsed and
+analyzed; every other paragraph reuses its earlier result with offsets
+shifted to its new position. Sentences never cross a paragraph break, so
+the sentence-local checks of a paragraph depend on that paragraph alone and
+a one-word edit costs one paragraph's analysis. Document-wide checks
+(terminology consistency) are the exception: each paragraph keeps the
+terms they compare, and they are re-run over the terms of the whole
+document on every revision.
+
+By default sessions live in the memory of the process that created them.
+With ``Settings.session_store_path`` they are kept in an SQLite database
+instead, so the requests of one session can reach any worker: every
+request loads the session, and a revision is saved only if no other
+worker saved one first. The multi-worker server sets this up on its own.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from .config import get_settings
+from .exceptions import InvalidEditError, SessionConflictError, SessionNotFoundError
+from .analysis import style_processor
+from .models import (
+    IssueMove, SessionDelta, SessionIssue, SessionState, StreamChunk, StreamSummary, StyleIssue, TextEdit
+)
+from .pipeline import parse_many
+from .storage import SqliteConnections
+from .processors.style_guide import StyleGuideName, Term, guide_name
+from .streaming import StreamAggregator, Window, analyze_window_doc, split_sentences, window_components
+
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n\s*")
+
+
+def split_paragraphs(text: str) -> List[Tuple[int, int]]:
+    """Return ``(start, end)`` offsets of the non-blank paragraphs of ``text``."""
+    spans = []
+    start = 0
+    for match in _PARAGRAPH_BREAK.finditer(text):
+        if text[start:match.start()].strip():
+            spans.append((start, match.start()))
+        start = match.end()
+    if text[start:].strip():
+        spans.append((start, len(text)))
+    return spans
+
+
+def paragraph_key(paragraph: str) -> str:
+    """Content hash identifying a paragraph's analysis."""
+    return hashlib.sha256(paragraph.encode("utf-8")).hexdigest()[:16]
+
+
+def apply_edits(text: str, edits: Sequence[TextEdit]) -> str:
+    """Apply range edits, all relative to ``text``, in a single pass."""
+    pieces = []
+    position = 0
+    for edit in sorted(edits, key=lambda e: (e.start, e.end)):
+        if edit.start > edit.end or edit.end > len(text):
+            raise InvalidEditError(f"Edit range {edit.start}-{edit.end} is outside the document")
+        if edit.start < position:
+            raise InvalidEditError(f"Edit range {edit.start}-{edit.end} overlaps another edit")
+        pieces.append(text[position:edit.start])
+        pieces.append(edit.text)
+        position = edit.end
+    pieces.append(text[position:])
+    return "".join(pieces)
+
+
+def resolve_edit(text: str, edits: Optional[Sequence[TextEdit]], new_text: Optional[str]) -> str:
+    """Return the next version from either range edits or a complete new text."""
+    if (edits is None) == (new_text is None):
+        raise InvalidEditError("Provide either edits or text")
+    return new_text if new_text is not None else apply_edits(text, edits)
+
+
+@dataclass(frozen=True)
+class ParagraphAnalysis:
+    """A paragraph's own results and the terms the document-wide checks need from it."""
+    chunk: StreamChunk
+    terms: Tuple[Term, ...] = ()
+
+
+def analyze_paragraphs(paragraphs: Sequence[str],
+                       style_guide: Optional[StyleGuideName] = None) -> List[ParagraphAnalysis]:
+    """Analyze paragraphs with one batched parse; offsets are paragraph-relative."""
+    terminology = bool(style_guide) and style_processor.checks_terminology(style_guide)
+    results = []
+    for paragraph, doc in zip(paragraphs, parse_many(paragraphs, window_components(style_guide))):
+        if isinstance(doc, Exception):
+            raise doc
+        sentences = sum(1 for _ in split_sentences(paragraph, len(paragraph)))
+        window = Window(index=0, start=0, own_start=0, end=len(paragraph), sentences=sentences)
+        results.append(ParagraphAnalysis(
+            chunk=analyze_window_doc(doc, window, style_guide, document_wide=False),
+            terms=tuple(style_processor.terminology_terms(doc)) if terminology else (),
+        ))
+    return results
+
+
+def paragraph_issues(chunk: StreamChunk, prefix: str, offset: int) -> List[SessionIssue]:
+    """Turn a paragraph's issues into session issues at document offsets."""
+    issues = []
+    for n, issue in enumerate(chunk.grammar_issues):
+        issues.append(SessionIssue(
+            id=f"{prefix}/g{n}",
+            category="grammar",
+            type=issue.type,
+            text=issue.text,
+            start=issue.start + offset,
+            end=issue.end + offset,
+        ))
+    for n, issue in enumerate(chunk.style_issues):
+        issues.append(style_session_issue(f"{prefix}/s{n}", issue, offset))
+    return issues
+
+
+def style_session_issue(issue_id: str, issue: StyleIssue, offset: int) -> SessionIssue:
+    """Turn a style issue into a session issue shifted by ``offset``."""
+    return SessionIssue(
+        id=issue_id,
+        category="style",
+        type=issue.rule_name,
+        text=issue.text,
+        start=issue.start + offset,
+        end=issue.end + offset,
+        suggestion=issue.suggestion,
+        severity=issue.severity,
+    )
+
+
+def scalar_metrics(summary: StreamSummary) -> Dict[str, float]:
+    """The document scores reported as deltas after each edit."""
+    metrics = {
+        "grammar_issue_count": summary.grammar_issue_count,
+        "improvement_score": summary.improvement_score,
+        "style_issue_count": summary.style_issue_count,
+        "polarity": summary.sentiment.polarity,
+        "subjectivity": summary.sentiment.subjectivity,
+        "flesch_reading_ease": summary.readability.flesch_reading_ease,
+        "flesch_kincaid_grade": summary.readability.flesch_kincaid_grade,
+    }
+    if summary.compliance_score is not None:
+        metrics["compliance_score"] = summary.compliance_score
+    return metrics
+
+
+class DocumentSession:
+    """One document under edit, with per-paragraph analysis results."""
+
+    def __init__(self, session_id: str, style_guide: Optional[StyleGuideName] = None):
+        self.id = session_id
+        self.style_guide = style_guide
+        self.text = ""
+        self.version = 0
+        self.metrics: Optional[StreamSummary] = None
+        self.guide_version: Optional[str] = None
+        self._results: Dict[str, ParagraphAnalysis] = {}
+        self._issues: Dict[str, SessionIssue] = {}
+
+    def _reusable(self, guide_version: Optional[str]) -> Dict[str, ParagraphAnalysis]:
+        # Results checked against an earlier version of the style guide are stale
+        return self._results if guide_version == self.guide_version else {}
+
+    def pending(self, text: str, guide_version: Optional[str] = None) -> List[str]:
+        """Return the paragraphs of ``text`` that have no analysis yet.
+
+        ``guide_version`` is the current content hash of the session's style
+        guide; if the guide changed since the last revision, every
+        paragraph is analyzed again.
+        """
+        reusable = self._reusable(guide_version)
+        seen = set()
+        paragraphs = []
+        for start, end in split_paragraphs(text):
+            paragraph = text[start:end]
+            key = paragraph_key(paragraph)
+            if key not in reusable and key not in seen:
+                seen.add(key)
+                paragraphs.append(paragraph)
+        return paragraphs
+
+    def revise(self, text: str, analyzed: Dict[str, ParagraphAnalysis], base_version: int,
+               guide_version: Optional[str] = None) -> SessionDelta:
+        """Move to ``text`` using fresh results for the ``analyzed`` paragraphs.
+
+        ``analyzed`` maps each paragraph returned by :meth:`pending` to its
+        analysis. Raises SessionConflictError if another revision landed
+        after ``base_version``.
+        """
+        if base_version != self.version:
+            raise SessionConflictError(
+                f"Session is at version {self.version}, edit is based on version {base_version}"
+            )
+        fresh = {paragraph_key(paragraph): result for paragraph, result in analyzed.items()}
+        reusable = self._reusable(guide_version)
+        results: Dict[str, ParagraphAnalysis] = {}
+        issues: Dict[str, SessionIssue] = {}
+        occurrences: Counter = Counter()
+        aggregator = StreamAggregator(self.style_guide)
+        # Terms of the whole document, at document offsets, with the id of their issue
+        terms: List[Term] = []
+        term_ids: Dict[int, str] = {}
+        reused = 0
+        for start, end in split_paragraphs(text):
+            key = paragraph_key(text[start:end])
+            result = fresh.get(key)
+            if result is None:
+                result = reusable[key]
+                reused += 1
+            results[key] = result
+            # Identical paragraphs share a key; number them to keep issue ids unique
+            prefix = f"{key}.{occurrences[key]}"
+            occurrences[key] += 1
+            for issue in paragraph_issues(result.chunk, prefix, start):
+                issues[issue.id] = issue
+            for n, (term, term_start) in enumerate(result.terms):
+                terms.append((term, term_start + start))
+                term_ids[term_start + start] = f"{prefix}/t{n}"
+            aggregator.add(result.chunk.model_copy(update={"start": start, "end": end}))
+
+        document_issues = [StyleIssue(**v.__dict__) for v in style_processor.check_terminology(terms)]
+        for issue in document_issues:
+            session_issue = style_session_issue(term_ids[issue.start], issue, 0)
+            issues[session_issue.id] = session_issue
+        aggregator.add_style_issues(document_issues)
+
+        metrics = aggregator.summary().model_copy(update={"length": len(text)})
+        previous = scalar_metrics(self.metrics) if self.metrics is not None else {}
+        current = scalar_metrics(metrics)
+        delta = SessionDelta(
+            session_id=self.id,
+            version=self.version + 1,
+            length=len(text),
+            reanalyzed_paragraphs=len(fresh),
+            reused_paragraphs=reused,
+            added=[issue for issue_id, issue in issues.items() if issue_id not in self._issues],
+            removed=[issue_id for issue_id in self._issues if issue_id not in issues],
+            moved=[
+                IssueMove(id=issue_id, start=issue.start, end=issue.end)
+                for issue_id, issue in issues.items()
+                if issue_id in self._issues
+                and (self._issues[issue_id].start, self._issues[issue_id].end) != (issue.start, issue.end)
+            ],
+            metrics=metrics,
+            metrics_delta={name: value - previous.get(name, 0.0) for name, value in current.items()},
+        )
+        # Results for paragraphs that no longer exist are dropped
+        self.text = text
+        self.version += 1
+        self.metrics = metrics
+        self.guide_version = guide_version
+        self._results = results
+        self._issues = issues
+        return delta
+
+    def to_json(self) -> str:
+        """Serialize the session, with its paragraph results, for a shared store."""
+        return json.dumps({
+            "id": self.id,
+            "style_guide": guide_name(self.style_guide) if self.style_guide else None,
+            "text": self.text,
+            "version": self.version,
+            "metrics": self.metrics.model_dump() if self.metrics is not None else None,
+            "guide_version": self.guide_version,
+            "results": {
+                key: {"chunk": result.chunk.model_dump(), "terms": result.terms}
+                for key, result in self._results.items()
+            },
+            "issues": [issue.model_dump() for issue in self._issues.values()],
+        })
+
+    @classmethod
+    def from_json(cls, data: str) -> "DocumentSession":
+        """Restore a session serialized with :meth:`to_json`."""
+        fields = json.loads(data)
+        session = cls(fields["id"], fields["style_guide"])
+        session.text = fields["text"]
+        session.version = fields["version"]
+        if fields["metrics"] is not None:
+            session.metrics = StreamSummary.model_validate(fields["metrics"])
+        session.guide_version = fields["guide_version"]
+        session._results = {
+            key: ParagraphAnalysis(
+                StreamChunk.model_validate(result["chunk"]),
+                tuple((term, start) for term, start in result["terms"]),
+            )
+            for key, result in fields["results"].items()
+        }
+        issues = [SessionIssue.model_validate(issue) for issue in fields["issues"]]
+        session._issues = {issue.id: issue for issue in issues}
+        return session
+
+    def state(self) -> SessionState:
+        """The current version with all of its issues."""
+        return SessionState(
+            session_id=self.id,
+            version=self.version,
+            text=self.text,
+            style_guide=guide_name(self.style_guide) if self.style_guide else None,
+            issues=sorted(self._issues.values(), key=lambda issue: (issue.start, issue.id)),
+            metrics=self.metrics,
+        )
+
+
+class SessionManager:
+    """Thread-safe registry of editing sessions.
+
+    Sessions expire ``ttl`` seconds after their last use and the least
+    recently used session is dropped once ``max_sessions`` are open.
+    """
+
+    def __init__(self, max_sessions: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._clock = clock
+        self._sessions: "OrderedDict[str, Tuple[float, DocumentSession]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def create(self, style_guide: Optional[StyleGuideName] = None) -> DocumentSession:
+        """Open an empty session; its first revision sets the text."""
+        session = DocumentSession(uuid.uuid4().hex, style_guide)
+        with self._lock:
+            self._sessions[session.id] = (self._clock() + self.ttl, session)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+        return session
+
+    def get(self, session_id: str) -> DocumentSession:
+        """Return a live session and extend its lifetime."""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None and entry[0] <= self._clock():
+                del self._sessions[session_id]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                raise SessionNotFoundError(f"Session '{session_id}' not found")
+            session = entry[1]
+            self._sessions[session_id] = (self._clock() + self.ttl, session)
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def save(self, session: DocumentSession, base_version: int) -> None:
+        """Record a revision; sessions in memory are revised in place, so there is nothing to do."""
+
+    def delete(self, session_id: str) -> None:
+        """Close a session."""
+        with self._lock:
+            if self._sessions.pop(session_id, None) is None:
+                raise SessionNotFoundError(f"Session '{session_id}' not found")
+
+    def stats(self) -> Dict[str, int]:
+        """Report open sessions and eviction/expiration counters."""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    expires REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires);
+"""
+
+
+class SharedSessionManager:
+    """Editing sessions in an SQLite database shared by all worker processes.
+
+    Same interface as :class:`SessionManager`, except that :meth:`get`
+    returns a copy: a revision made to it is only kept once :meth:`save`
+    succeeds, which it doesn't if another worker saved a revision of the
+    same session first. Eviction counters are per process.
+    """
+
+    def __init__(self, path: str, max_sessions: int, ttl: float, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._clock = clock
+        self._connections = SqliteConnections(path)
+        self._connections.get().executescript(_SCHEMA)
+        self.evictions = 0
+        self.expirations = 0
+
+    def create(self, style_guide: Optional[StyleGuideName] = None) -> DocumentSession:
+        """Open an empty session; its first revision sets the text."""
+        session = DocumentSession(uuid.uuid4().hex, style_guide)
+        conn = self._connections.get()
+        now = self._clock()
+        conn.execute(
+            "INSERT INTO sessions (id, version, expires, data) VALUES (?, ?, ?, ?)",
+            (session.id, session.version, now + self.ttl, session.to_json()),
+        )
+        self.expirations += conn.execute("DELETE FROM sessions WHERE expires <= ?", (now,)).rowcount
+        # Sessions expiring soonest are the least recently used
+        self.evictions += conn.execute(
+            "DELETE FROM sessions WHERE id IN (SELECT id FROM sessions ORDER BY expires DESC LIMIT -1 OFFSET ?)",
+            (self.max_sessions,),
+        ).rowcount
+        return session
+
+    def get(self, session_id: str) -> DocumentSession:
+        """Return a copy of a live session and extend its lifetime."""
+        conn = self._connections.get()
+        now = self._clock()
+        row = conn.execute("SELECT data, expires FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        if row is not None and row[1] <= now:
+            if conn.execute("DELETE FROM sessions WHERE id = ? AND expires <= ?", (session_id, now)).rowcount:
+                self.expirations += 1
+            row = None
+        if row is None:
+            raise SessionNotFoundError(f"Session '{session_id}' not found")
+        conn.execute("UPDATE sessions SET expires = ? WHERE id = ?", (now + self.ttl, session_id))
+        return DocumentSession.from_json(row[0])
+
+    def save(self, session: DocumentSession, base_version: int) -> None:
+        """Store a revision of a session loaded at ``base_version``.
+
+        Raises SessionConflictError if another revision was saved since.
+        """
+        conn = self._connections.get()
+        saved = conn.execute(
+            "UPDATE sessions SET version = ?, expires = ?, data = ? WHERE id = ? AND version = ?",
+            (session.version, self._clock() + self.ttl, session.to_json(), session.id, base_version),
+        ).rowcount
+        if saved:
+            return
+        row = conn.execute("SELECT version FROM sessions WHERE id = ?", (session.id,)).fetchone()
+        if row is None:
+            raise SessionNotFoundError(f"Session '{session.id}' not found")
+        raise SessionConflictError(
+            f"Session is at version {row[0]}, edit is based on version {base_version}"
+        )
+
+    def delete(self, session_id: str) -> None:
+        """Close a session."""
+        if not self._connections.get().execute("DELETE FROM sessions WHERE id = ?", (session_id,)).rowcount:
+            raise SessionNotFoundError(f"Session '{session_id}' not found")
+
+    def stats(self) -> Dict[str, int]:
+        """Report open sessions and this process's eviction/expiration counters."""
+        count = self._connections.get().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        return {
+            "sessions": count,
+            "max_sessions": self.max_sessions,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+@lru_cache()
+def get_session_manager() -> Union[SessionManager, SharedSessionManager]:
+    settings = get_settings()
+    if settings.session_store_path:
+        return SharedSessionManager(
+            settings.session_store_path, max_sessions=settings.session_max_count, ttl=settings.session_ttl
+        )
+    return SessionManager(max_sessions=settings.session_max_count, ttl=settings.session_ttl)
@@ -0,0 +1,112 @@
+"""Sentence embeddings and batched sentence similarity.
+
+The sentences of a Doc are embedded once into a matrix, one row per
+sentence, and every similarity is computed from that matrix with NumPy:
+adjacent-sentence coherence is one row-wise cosine, and the full
+sentence-sentence matrix is one matrix product.
+
+Embeddings come from the first available source, in the order of
+``SOURCES`` unless one is chosen with ``sentence_embedding``:
+
+* ``vectors``: the mean static word vector of the sentence's tokens;
+* ``tensor``: the mean of the tokens' rows of ``doc.tensor``, as
+  ``Span.similarity`` uses for pipelines without static vectors;
+* ``hashed``: a signed hashed bag of the sentence's content words, which
+  needs no model at all.
+"""
+from typing import List, Optional
+
+import numpy as np
+from spacy.attrs import IS_PUNCT, IS_SPACE, IS_STOP, LOWER
+from spacy.tokens import Doc
+
+VECTORS = "vectors"
+TENSOR = "tensor"
+HASHED = "hashed"
+SOURCES = (VECTORS, TENSOR, HASHED)
+
+
+def embedding_source(doc: Doc, preferred: Optional[str] = None) -> str:
+    """The source used for ``doc``: ``preferred`` if the Doc has it, else the first it has."""
+    if preferred not in (None, "auto") + SOURCES:
+        raise ValueError(f"Unknown sentence embedding source: {preferred}")
+    available = {
+        VECTORS: doc.vocab.vectors.shape[0] > 0,
+        TENSOR: doc.tensor is not None and doc.tensor.size > 0 and len(doc.tensor) == len(doc),
+        HASHED: True,
+    }
+    if preferred in SOURCES and available[preferred]:
+        return preferred
+    return next(source for source in SOURCES if available[source])
+
+
+def _sentence_index(doc: Doc) -> np.ndarray:
+    """Sentence number of every token."""
+    index = np.zeros(len(doc), dtype=np.intp)
+    for number, sent in enumerate(doc.sents):
+        index[sent.start:sent.end] = number
+    return index
+
+
+def _mean_rows(rows: np.ndarray, groups: np.ndarray, count: int) -> np.ndarray:
+    sums = np.zeros((count, rows.shape[1]), dtype=np.float32)
+    np.add.at(sums, groups, rows)
+    sizes = np.bincount(groups, minlength=count).astype(np.float32)
+    return sums / np.maximum(sizes, 1)[:, None]
+
+
+def sentence_embeddings(doc: Doc, source: Optional[str] = None, hash_dim: int = 2048) -> np.ndarray:
+    """Embed each sentence of ``doc`` as one row of a float32 matrix."""
+    groups = _sentence_index(doc)
+    count = int(groups[-1]) + 1 if len(doc) else 0
+    source = embedding_source(doc, source)
+    if source == VECTORS:
+        vectors = doc.vocab.vectors
+        rows = vectors.find(keys=[token.orth for token in doc])
+        token_vectors = np.zeros((len(doc), vectors.shape[1]), dtype=np.float32)
+        token_vectors[rows >= 0] = vectors.data[rows[rows >= 0]]
+        return _mean_rows(token_vectors, groups, count)
+    if source == TENSOR:
+        return _mean_rows(np.asarray(doc.tensor, dtype=np.float32), groups, count)
+
+    attrs = doc.to_array([LOWER, IS_STOP, IS_PUNCT, IS_SPACE])
+    content = ~attrs[:, 1:].any(axis=1)
+    ids = attrs[content, 0]
+    # The lowest bits pick the column and the top bit the sign, so collisions tend to cancel out
+    columns = (ids % np.uint64(hash_dim)).astype(np.intp)
+    signs = np.where(ids >> np.uint64(63), -1.0, 1.0).astype(np.float32)
+    embeddings = np.zeros((count, hash_dim), dtype=np.float32)
+    np.add.at(embeddings, (groups[content], columns), signs)
+    return embeddings
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length; all-zero rows stay zero."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def similarity_matrix(embeddings: np.ndarray) -> np.ndarray:
+    """Cosine similarity of every pair of rows."""
+    unit = normalize_rows(embeddings)
+    return unit @ unit.T
+
+
+def coherence(embeddings: np.ndarray) -> float:
+    """Mean cosine similarity of adjacent rows; 1.0 for fewer than two."""
+    if len(embeddings) < 2:
+        return 1.0
+    unit = normalize_rows(embeddings)
+    return float(np.einsum("ij,ij->i", unit[:-1], unit[1:]).mean())
+
+
+def off_topic(matrix: np.ndarray, ratio: float) -> List[int]:
+    """Rows whose mean similarity to the others is below ``ratio`` times the median row's.
+
+    Comparing with the median keeps the rule independent of the scale of
+    the embedding source.
+    """
+    if len(matrix) < 3:
+        return []
+    others = (matrix.sum(axis=1) - np.diag(matrix)) / (len(matrix) - 1)
+    return np.flatnonzero(others < ratio * np.median(others)).tolist()
@@ -0,0 +1,69 @@
+"""Helpers for files and databases shared by several worker processes."""
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+from typing import Any, Dict
+
+import numpy as np
+
+
+class SqliteConnections:
+    """One SQLite connection per thread and process for a database shared between workers.
+
+    Connections use WAL mode, so any number of processes can read while one
+    writes, and are reopened in a forked child instead of sharing the
+    parent's.
+    """
+
+    def __init__(self, path: str, timeout: float = 30):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def get(self) -> sqlite3.Connection:
+        """Return this thread's connection, reopening it after a fork."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+
+def save_array_directory(path: str, arrays: Dict[str, np.ndarray], meta_file: str, meta: Dict[str, Any]) -> None:
+    """Write ``.npy`` arrays and a JSON metadata file as a directory, replacing ``path`` atomically.
+
+    Everything is written to a temporary directory beside ``path`` and then
+    renamed into place, so a loader never sees a mix of old and new files or
+    a half-written one; at worst, between the two renames that replace an
+    existing directory, it finds none and fails to load. Files are never
+    rewritten in place: processes that memory-mapped the old arrays keep
+    reading them until they reload.
+    """
+    path = os.path.abspath(path)
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=f".{os.path.basename(path)}.", dir=parent)
+    try:
+        os.chmod(staging, 0o755)  # mkdtemp creates it private
+        for name, array in arrays.items():
+            np.save(os.path.join(staging, name), array)
+        with open(os.path.join(staging, meta_file), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        if not os.path.exists(path):
+            os.replace(staging, path)
+            return
+        # A directory can only be renamed over an empty one, so move the old one aside first
+        retired = tempfile.mkdtemp(prefix=f".{os.path.basename(path)}.old.", dir=parent)
+        os.replace(path, os.path.join(retired, "data"))
+        os.replace(staging, path)
+        shutil.rmtree(retired, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
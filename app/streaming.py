@@ -0,0 +1,278 @@
+"""Streaming analysis of documents too long for a single request.
+
+The document is split into sentence-aligned windows without parsing it as a
+whole. Each window is parsed and analyzed on its own, so peak memory depends
+on the window size rather than the document length. A window repeats the
+last few sentences of the previous one as parser context but only *owns* the
+sentences after them: results are reported for the owned region only, with
+offsets shifted back onto the original document, so overlapping context
+never produces duplicate issues.
+
+    python -m app.streaming long.txt --style-guide academic > results.ndjson
+"""
+import argparse
+import re
+import sys
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, FrozenSet, Iterator, Optional, Sequence, Tuple, Union
+
+from spacy.tokens import Doc
+
+from .analysis import analysis_components, grammar_enhancer, sentiment_analyzer, style_processor, ANALYZE
+from .config import get_settings
+from .models import (
+    ChunkSentiment, ChunkStats, GrammarIssue, ReadabilitySummary, StreamChunk, StreamSummary, StyleIssue
+)
+from .pipeline import SENTS, parse
+from .readability import count_syllables, flesch_kincaid_grade, flesch_reading_ease
+from .processors.sentiment_analyzer import SentimentScore
+from .processors.style_guide import StyleGuideName, guide_name
+
+# Sentence ends (with trailing quotes/brackets and whitespace) and paragraph breaks
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+|\n\s*\n\s*")
+
+
+@dataclass(frozen=True)
+class Window:
+    """A slice ``[start, end)`` of the document that owns ``[own_start, end)``."""
+    index: int
+    start: int
+    own_start: int
+    end: int
+    sentences: int
+
+
+def _bounded(text: str, start: int, end: int, max_chars: int) -> Iterator[Tuple[int, int]]:
+    """Split ``text[start:end]`` at whitespace into pieces of at most ``max_chars``."""
+    while end - start > max_chars:
+        cut = text.rfind(" ", start + 1, start + max_chars)
+        if cut <= start:
+            cut = start + max_chars
+        yield start, cut
+        start = cut
+    yield start, end
+
+
+def split_sentences(text: str, max_chars: int) -> Iterator[Tuple[int, int]]:
+    """Yield ``(start, end)`` offsets of the sentences of ``text``.
+
+    Sentences longer than ``max_chars`` are split further so no window has
+    to hold more than ``max_chars`` of a single sentence.
+    """
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        if text[start:match.end()].strip():
+            yield from _bounded(text, start, match.end(), max_chars)
+        start = match.end()
+    if text[start:].strip():
+        yield from _bounded(text, start, len(text), max_chars)
+
+
+def iter_windows(text: str, window_chars: int, overlap_sentences: int) -> Iterator[Window]:
+    """Group sentences into windows of about ``window_chars`` owned characters."""
+    context: Deque[Tuple[int, int]] = deque(maxlen=overlap_sentences)
+    owned = []
+    index = 0
+    for sentence in split_sentences(text, window_chars):
+        if owned and sentence[1] - owned[0][0] > window_chars:
+            yield _make_window(index, context, owned)
+            index += 1
+            context.extend(owned)
+            owned = []
+        owned.append(sentence)
+    if owned:
+        yield _make_window(index, context, owned)
+
+
+def _make_window(index: int, context: Deque[Tuple[int, int]], owned: list) -> Window:
+    own_start = owned[0][0]
+    return Window(
+        index=index,
+        start=context[0][0] if context else own_start,
+        own_start=own_start,
+        end=owned[-1][1],
+        sentences=len(owned),
+    )
+
+
+def window_components(style_guide: Optional[StyleGuideName] = None) -> FrozenSet[str]:
+    """Pipeline capabilities needed to analyze one window."""
+    return analysis_components(ANALYZE, style_guide) | {SENTS}
+
+
+def analyze_window(text: str, window: Window, style_guide: Optional[StyleGuideName] = None) -> StreamChunk:
+    """Analyze one window and report the issues in its owned region.
+
+    ``text`` is the window's slice of the document; only it (not the whole
+    document) is sent to pool workers. Issues are owned by the window their
+    sentence starts in.
+    """
+    return analyze_window_doc(parse(text, window_components(style_guide)), window, style_guide)
+
+
+def analyze_window_doc(doc: Doc, window: Window, style_guide: Optional[StyleGuideName] = None,
+                       document_wide: bool = True) -> StreamChunk:
+    """Analyze one already parsed window; see :func:`analyze_window`.
+
+    ``document_wide=False`` leaves out the style checks that compare parts
+    of the document, for callers that run them over the whole document.
+    """
+    text = doc.text
+    own = window.own_start - window.start
+
+    _, issues = grammar_enhancer.enhance_text(doc)
+    grammar_issues = [
+        GrammarIssue(**dict(issue, start=issue['start'] + window.start, end=issue['end'] + window.start))
+        for issue in issues if issue['start'] >= own
+    ]
+    style_issues = []
+    if style_guide:
+        style_issues = [
+            StyleIssue(**dict(v.__dict__, start=v.start + window.start, end=v.end + window.start))
+            for v in style_processor.check_style(doc, style_guide, document_wide) if v.start >= own
+        ]
+
+    first = next((token.i for token in doc if token.idx >= own), len(doc))
+    owned = doc[first:]
+    score = sentiment_analyzer.analyze_sentiment(owned.as_doc())
+    owned_text = text[own:]
+    return StreamChunk(
+        index=window.index,
+        start=window.own_start,
+        end=window.end,
+        grammar_issues=grammar_issues,
+        style_issues=style_issues,
+        sentiment=ChunkSentiment(**score.__dict__),
+        stats=ChunkStats(
+            words=len(owned_text.split()),
+            tokens=sum(1 for token in owned if not token.is_punct),
+            sentences=window.sentences,
+            syllables=count_syllables(owned_text),
+        ),
+    )
+
+
+class StreamAggregator:
+    """Merge per-window results into document-level scores.
+
+    Polarity and subjectivity are per-token ratios, so weighting each window
+    by its token count reproduces the whole-document value exactly; the
+    emotional tone is approximated the same way.
+    """
+
+    def __init__(self, style_guide: Optional[StyleGuideName] = None):
+        self.style_guide = style_guide
+        self.chunks = 0
+        self.length = 0
+        self.grammar_issues = 0
+        self.style_issues = 0
+        self.style_weight = 0
+        self.words = 0
+        self.tokens = 0
+        self.sentences = 0
+        self.syllables = 0
+        self.polarity = 0.0
+        self.subjectivity = 0.0
+        self.emotional_tone = {emotion: 0.0 for emotion in sentiment_analyzer.emotions}
+
+    def add(self, chunk: StreamChunk) -> None:
+        stats = chunk.stats
+        self.chunks += 1
+        self.length = chunk.end
+        self.grammar_issues += len(chunk.grammar_issues)
+        self.add_style_issues(chunk.style_issues)
+        self.words += stats.words
+        self.tokens += stats.tokens
+        self.sentences += stats.sentences
+        self.syllables += stats.syllables
+        self.polarity += chunk.sentiment.polarity * stats.tokens
+        self.subjectivity += chunk.sentiment.subjectivity * stats.tokens
+        for emotion, score in chunk.sentiment.emotional_tone.items():
+            self.emotional_tone[emotion] = self.emotional_tone.get(emotion, 0.0) + score * stats.tokens
+
+    def add_style_issues(self, issues: Sequence[StyleIssue]) -> None:
+        """Count style issues, including ones found across chunks rather than in one."""
+        self.style_issues += len(issues)
+        self.style_weight += sum(issue.severity for issue in issues)
+
+    def summary(self) -> StreamSummary:
+        tokens = self.tokens or 1
+        subjectivity = self.subjectivity / tokens
+        score = SentimentScore(
+            polarity=self.polarity / tokens,
+            subjectivity=subjectivity,
+            objectivity=1 - subjectivity,
+            emotional_tone={emotion: total / tokens for emotion, total in self.emotional_tone.items()},
+        )
+        compliance_score = None
+        if self.style_guide:
+            max_possible_weight = self.style_issues * 3  # max severity is 3
+            compliance_score = 1 - (self.style_weight / max_possible_weight if max_possible_weight > 0 else 0)
+        return StreamSummary(
+            chunks=self.chunks,
+            length=self.length,
+            grammar_issue_count=self.grammar_issues,
+            improvement_score=1 - (self.grammar_issues / self.words if self.words else 0.0),
+            style_guide_type=guide_name(self.style_guide) if self.style_guide else None,
+            style_issue_count=self.style_issues,
+            compliance_score=compliance_score,
+            sentiment=ChunkSentiment(**score.__dict__),
+            sentiment_summary=sentiment_analyzer.get_sentiment_summary(score),
+            readability=self.readability(),
+        )
+
+    def readability(self) -> ReadabilitySummary:
+        """Flesch scores computed from the word, sentence and syllable totals."""
+        return ReadabilitySummary(
+            flesch_reading_ease=round(flesch_reading_ease(self.words, self.sentences, self.syllables), 2),
+            flesch_kincaid_grade=round(flesch_kincaid_grade(self.words, self.sentences, self.syllables), 2),
+            avg_sentence_length=self.words / self.sentences if self.sentences else 0.0,
+            words=self.words,
+            sentences=self.sentences,
+        )
+
+
+def stream_settings(window_chars: Optional[int] = None, overlap_sentences: Optional[int] = None) -> Tuple[int, int]:
+    """Resolve the window size and overlap, falling back to the settings."""
+    settings = get_settings()
+    return (
+        window_chars or settings.stream_window_chars,
+        settings.stream_overlap_sentences if overlap_sentences is None else overlap_sentences,
+    )
+
+
+def stream_analysis(text: str,
+                    style_guide: Optional[StyleGuideName] = None,
+                    window_chars: Optional[int] = None,
+                    overlap_sentences: Optional[int] = None) -> Iterator[Union[StreamChunk, StreamSummary]]:
+    """Analyze ``text`` window by window, yielding each chunk and then the summary."""
+    window_chars, overlap_sentences = stream_settings(window_chars, overlap_sentences)
+    aggregator = StreamAggregator(style_guide)
+    for window in iter_windows(text, window_chars, overlap_sentences):
+        chunk = analyze_window(text[window.start:window.end], window, style_guide)
+        aggregator.add(chunk)
+        yield chunk
+    yield aggregator.summary()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Analyze a long document and print NDJSON results")
+    parser.add_argument("path", help="Text file to analyze, or - for stdin")
+    parser.add_argument("--style-guide", help="Name of a built-in or loaded style guide")
+    parser.add_argument("--window-chars", type=int)
+    parser.add_argument("--overlap-sentences", type=int)
+    args = parser.parse_args(argv)
+
+    if args.path == "-":
+        text = sys.stdin.read()
+    else:
+        with open(args.path, encoding="utf-8") as f:
+            text = f.read()
+    for result in stream_analysis(text, args.style_guide, args.window_chars, args.overlap_sentences):
+        print(result.model_dump_json(), flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
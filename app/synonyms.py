@@ -0,0 +1,199 @@
+"""A compact synonym index keyed by lemma and part of speech.
+
+The index is built offline from WordNet, with the candidates of every
+(lemma, POS) pair already ranked, and stored as a directory of arrays that
+is memory-mapped read-only, like a sentiment lexicon
+(see :mod:`app.processors.lexicon`)::
+
+    synonyms.json      format version, entry and word counts
+    keys.npy           uint64 hash of "<lemma>\\t<pos>" for each entry, sorted
+    offsets.npy        int64; entry i's candidates are candidates[offsets[i]:offsets[i + 1]]
+    candidates.npy     uint32 word numbers, best candidate first
+    words.npy          uint8 UTF-8 text of all candidate words, back to back
+    word_offsets.npy   int64; word j is words[word_offsets[j]:word_offsets[j + 1]]
+
+    python -m app.synonyms build models/synonyms
+    python -m app.synonyms info models/synonyms
+
+POS are WordNet's: ``n``, ``v``, ``a`` (satellite adjectives included) and
+``r``. A candidate scores the sum, over the senses of the lemma it shares,
+of its WordNet usage count plus one divided by the sense's rank, so
+synonyms from the common senses come first.
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from spacy.strings import hash_string
+
+from .exceptions import InvalidSynonymIndexError
+from .storage import save_array_directory
+
+FORMAT_VERSION = 1
+META_FILE = "synonyms.json"
+KEYS_FILE = "keys.npy"
+OFFSETS_FILE = "offsets.npy"
+CANDIDATES_FILE = "candidates.npy"
+WORDS_FILE = "words.npy"
+WORD_OFFSETS_FILE = "word_offsets.npy"
+
+WORDNET_POS = ("n", "v", "a", "r")
+# Candidates kept per entry
+MAX_CANDIDATES = 10
+
+# One index entry: (lemma, POS) and its candidates, best first
+SynonymEntry = Tuple[Tuple[str, str], Sequence[str]]
+
+
+def entry_key(lemma: str, pos: str) -> int:
+    return hash_string(f"{lemma.lower()}\t{pos}")
+
+
+class SynonymIndex:
+    """Ranked synonym candidates per (lemma, POS) in flat arrays.
+
+    The arrays may be in memory or memory-mapped; a lookup is one binary
+    search and decodes only the candidates it returns.
+    """
+
+    def __init__(self, keys: np.ndarray, offsets: np.ndarray, candidates: np.ndarray,
+                 words: np.ndarray, word_offsets: np.ndarray):
+        if len(offsets) != len(keys) + 1 or len(word_offsets) == 0:
+            raise InvalidSynonymIndexError(f"Offsets don't match {len(keys)} entries")
+        self.keys = keys
+        self.offsets = offsets
+        self.candidates = candidates
+        self.words = words
+        self.word_offsets = word_offsets
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[SynonymEntry]) -> "SynonymIndex":
+        """Build an in-memory index; a repeated (lemma, POS) keeps its last candidates."""
+        rows: Dict[int, Sequence[str]] = {}
+        for (lemma, pos), candidates in entries:
+            rows[entry_key(lemma, pos)] = candidates
+        numbers: Dict[str, int] = {}
+        keys = np.array(sorted(rows), dtype=np.uint64)
+        offsets = [0]
+        candidates: List[int] = []
+        for key in keys.tolist():
+            candidates.extend(numbers.setdefault(word, len(numbers)) for word in rows[key])
+            offsets.append(len(candidates))
+        encoded = [word.encode("utf-8") for word in numbers]
+        word_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(word) for word in encoded], out=word_offsets[1:])
+        return cls(
+            keys,
+            np.array(offsets, dtype=np.int64),
+            np.array(candidates, dtype=np.uint32),
+            np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            word_offsets,
+        )
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "SynonymIndex":
+        """Open an index directory written by :meth:`save`, memory-mapped by default."""
+        try:
+            with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != FORMAT_VERSION:
+                raise InvalidSynonymIndexError(f"{path}: unsupported synonym index format {meta.get('version')}")
+            mode = "r" if mmap else None
+            arrays = [
+                np.load(os.path.join(path, name), mmap_mode=mode)
+                for name in (KEYS_FILE, OFFSETS_FILE, CANDIDATES_FILE, WORDS_FILE, WORD_OFFSETS_FILE)
+            ]
+        except (OSError, ValueError) as e:
+            raise InvalidSynonymIndexError(f"Can't load synonym index from {path}: {e}")
+        if arrays[0].dtype != np.uint64:
+            raise InvalidSynonymIndexError(f"{path}: expected uint64 keys")
+        return cls(*arrays)
+
+    def save(self, path: str) -> None:
+        """Write the index to a directory that :meth:`load` can map."""
+        save_array_directory(
+            path,
+            {
+                KEYS_FILE: np.ascontiguousarray(self.keys, dtype=np.uint64),
+                OFFSETS_FILE: np.ascontiguousarray(self.offsets, dtype=np.int64),
+                CANDIDATES_FILE: np.ascontiguousarray(self.candidates, dtype=np.uint32),
+                WORDS_FILE: np.ascontiguousarray(self.words, dtype=np.uint8),
+                WORD_OFFSETS_FILE: np.ascontiguousarray(self.word_offsets, dtype=np.int64),
+            },
+            META_FILE,
+            {"version": FORMAT_VERSION, "entries": len(self.keys), "words": len(self.word_offsets) - 1},
+        )
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _word(self, number: int) -> str:
+        start, end = self.word_offsets[number], self.word_offsets[number + 1]
+        return self.words[start:end].tobytes().decode("utf-8")
+
+    def lookup(self, lemma: str, pos: str) -> Tuple[str, ...]:
+        """Candidates for a lemma and WordNet POS, best first; empty if there are none."""
+        if not len(self.keys):
+            return ()
+        key = np.uint64(entry_key(lemma, pos))
+        position = int(np.searchsorted(self.keys, key))
+        if position == len(self.keys) or self.keys[position] != key:
+            return ()
+        start, end = self.offsets[position], self.offsets[position + 1]
+        return tuple(self._word(number) for number in self.candidates[start:end].tolist())
+
+
+def rank_synonyms(wordnet, lemma: str, pos: str, limit: int = MAX_CANDIDATES) -> Tuple[str, ...]:
+    """Rank the single-word synonyms of a lemma in one WordNet POS."""
+    lemma = lemma.lower()
+    scores: Dict[str, float] = {}
+    for rank, synset in enumerate(wordnet.synsets(lemma, pos=pos)):
+        for candidate in synset.lemmas():
+            name = candidate.name().lower()
+            if name == lemma or "_" in name:
+                continue
+            scores[name] = scores.get(name, 0.0) + (candidate.count() + 1) / (rank + 1)
+    return tuple(sorted(scores, key=lambda name: (-scores[name], name))[:limit])
+
+
+def wordnet_entries(wordnet, limit: int = MAX_CANDIDATES) -> Iterator[SynonymEntry]:
+    """Every single-word WordNet lemma that has synonyms, with its ranked candidates."""
+    for pos in WORDNET_POS:
+        for lemma in wordnet.all_lemma_names(pos=pos):
+            if "_" in lemma:
+                continue
+            candidates = rank_synonyms(wordnet, lemma, pos, limit)
+            if candidates:
+                yield (lemma, pos), candidates
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build or inspect WordNet synonym indexes")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Build a synonym index directory from WordNet")
+    build.add_argument("output", help="Index directory to write")
+    build.add_argument("--max-candidates", type=int, default=MAX_CANDIDATES)
+    info = commands.add_parser("info", help="Describe an index directory")
+    info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        from .assets import require_nltk_resources
+
+        require_nltk_resources()
+        from nltk.corpus import wordnet
+
+        index = SynonymIndex.from_entries(wordnet_entries(wordnet, args.max_candidates))
+        index.save(args.output)
+    else:
+        index = SynonymIndex.load(args.path)
+    size = sum(array.nbytes for array in (index.keys, index.offsets, index.candidates, index.words, index.word_offsets))
+    print(f"{len(index)} entries, {len(index.word_offsets) - 1} words ({size / 1024:.1f} KiB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
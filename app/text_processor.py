@@ -1,53 +1,154 @@
+import numpy as np
 import spacy
-import nltk
-import textstat
-from typing import List, Dict, Any, Tuple, Optional
+from functools import lru_cache
+from typing import Callable, List, Dict, Any, FrozenSet, Sequence, Tuple, Optional, Union
 from collections import defaultdict
+from .assets import require_nltk_resources
+from .config import get_settings
 from .exceptions import *
+from .key_phrases import IdfModel, rank_key_phrases
+from .pipeline import NER, PARSER, SENTS, TAGGER, ensure_doc, parse, parse_many, required_components, requires
+from .processors.grammar_enhancement import match_case
+from .readability import readability_metrics
+from .similarity import coherence, off_topic, sentence_embeddings, similarity_matrix
+from .synonyms import WORDNET_POS, SynonymIndex, rank_synonyms
 from .utils import initialize_nlp, calculate_text_metrics, get_sentence_complexity
-from nltk.corpus import wordnet, stopwords
-from nltk.tokenize import sent_tokenize
-from sklearn.feature_extraction.text import TfidfVectorizer
+from spacy.tokens import Doc, Span
 
 class TextOptimizer:
-    def __init__(self):
-        self.nlp = initialize_nlp()
-        # Download required NLTK data
-        for resource in ['wordnet', 'averaged_perceptron_tagger', 'stopwords', 'punkt']:
-            try:
-                nltk.download(resource, quiet=True)
-            except Exception as e:
-                print(f"Warning: Could not download {resource}: {str(e)}")
-        self.stopwords = set(stopwords.words('english'))
-
-    def get_synonyms(self, word: str, context: Optional[str] = None) -> List[str]:
-        """Get contextually appropriate synonyms for a word using WordNet."""
-        synonyms = []
-        # Get word POS tag from context if available
-        pos_tag = None
-        if context:
-            doc = self.nlp(context)
-            for token in doc:
-                if token.text.lower() == word.lower():
-                    pos_tag = self._convert_spacy_pos_to_wordnet(token.pos_)
-                    break
-
-        for synset in wordnet.synsets(word):
-            # Filter by POS tag if available
-            if pos_tag and synset.pos() != pos_tag:
+    def __init__(self,
+                 nlp: Optional[spacy.Language] = None,
+                 idf_model: Optional[IdfModel] = None,
+                 synonym_index: Optional[SynonymIndex] = None):
+        # The model, NLTK corpora, the readability word list, the IDF model and the
+        # synonym index are all loaded on first use; NLTK data must be installed
+        # with `python -m app.assets bootstrap`
+        self._nlp = nlp
+        self._stopwords = None
+        self._idf_model = idf_model
+        self._synonym_index = synonym_index
+        self._synonyms = None
+
+    @property
+    def nlp(self) -> spacy.Language:
+        """The shared spaCy pipeline, loaded on first use."""
+        if self._nlp is None:
+            self._nlp = initialize_nlp()
+        return self._nlp
+
+    @nlp.setter
+    def nlp(self, nlp: spacy.Language) -> None:
+        self._nlp = nlp
+
+    @property
+    def stopwords(self) -> set:
+        """English stopwords from the installed NLTK corpus."""
+        if self._stopwords is None:
+            require_nltk_resources()
+            from nltk.corpus import stopwords
+            self._stopwords = set(stopwords.words('english'))
+        return self._stopwords
+
+    @property
+    def idf_model(self) -> IdfModel:
+        """The corpus IDF model configured with ``idf_model_path``, memory-mapped."""
+        if self._idf_model is None:
+            path = get_settings().idf_model_path
+            self._idf_model = IdfModel.load(path) if path else IdfModel.empty()
+        return self._idf_model
+
+    @property
+    def synonyms(self) -> Callable[[str, str], Tuple[str, ...]]:
+        """Ranked synonyms of a (lemma, WordNet POS), behind a bounded LRU cache.
+
+        They come from the index configured with ``synonym_index_path``, or
+        are ranked from WordNet on each cache miss if there is none.
+        """
+        if self._synonyms is None:
+            settings = get_settings()
+            if self._synonym_index is None and settings.synonym_index_path:
+                self._synonym_index = SynonymIndex.load(settings.synonym_index_path)
+            if self._synonym_index is not None:
+                lookup = self._synonym_index.lookup
+            else:
+                require_nltk_resources()
+                from nltk.corpus import wordnet
+
+                def lookup(lemma: str, pos: str) -> Tuple[str, ...]:
+                    return rank_synonyms(wordnet, lemma, pos)
+            self._synonyms = lru_cache(maxsize=settings.synonym_cache_size)(lookup)
+        return self._synonyms
+
+    @requires(TAGGER)
+    def get_synonyms(self,
+                     word: str,
+                     context: Optional[Union[str, Doc, Span]] = None,
+                     pos: Optional[str] = None,
+                     limit: int = 3) -> List[str]:
+        """Get the best synonyms of a word.
+
+        The part of speech is ``pos`` (a spaCy or WordNet tag), or else that
+        of the word's first occurrence in ``context``; a parsed context is
+        not parsed again. Without either, the synonyms of every part of
+        speech are merged.
+        """
+        lemma = word.lower()
+        if pos is None and context is not None:
+            if isinstance(context, str):
+                context = ensure_doc(context, self.nlp, self.get_synonyms.required_components)
+            token = next((token for token in context if token.lower_ == lemma), None)
+            if token is not None:
+                pos = token.pos_
+                lemma = token.lemma_.lower() or lemma
+        if pos is not None:
+            pos = pos if pos in WORDNET_POS else self._convert_spacy_pos_to_wordnet(pos)
+            if pos is None:
+                return []
+        synonyms: List[str] = []
+        for candidate_pos in ([pos] if pos else WORDNET_POS):
+            for candidate in self.synonyms(lemma, candidate_pos):
+                if candidate != word.lower() and candidate not in synonyms:
+                    synonyms.append(candidate)
+        return synonyms[:limit]
+
+    @requires(TAGGER, NER)
+    def synonym_replacements(self, text: Union[Doc, Span]) -> Dict[int, str]:
+        """Map each replaceable content token of a parsed text to its best synonym.
+
+        Content words that are not stop words, named entities or inflected
+        forms are looked up once each, by lemma and part of speech.
+        """
+        replacements = {}
+        for token in text:
+            pos = self._convert_spacy_pos_to_wordnet(token.pos_)
+            if pos is None or token.is_stop or not token.is_alpha or token.ent_type:
                 continue
-            for lemma in synset.lemmas():
-                if lemma.name() != word and '_' not in lemma.name():
-                    # Score synonym based on similarity and frequency
-                    score = synset.wup_similarity(synset) if synset else 0
-                    synonyms.append((lemma.name(), score or 0))
-
-        # Sort by score and return top synonyms
-        return [syn for syn, _ in sorted(set(synonyms), key=lambda x: x[1], reverse=True)[:3]]
-
-    def identify_entities(self, text: str) -> Dict[str, List[Dict[str, Any]]]:
+            if token.lemma_ and token.lemma_.lower() != token.lower_:
+                continue
+            candidates = self.synonyms(token.lower_, pos)
+            if candidates:
+                replacements[token.i] = match_case(candidates[0], token.text)
+        return replacements
+
+    @requires(TAGGER, NER)
+    def replace_with_synonyms(self, text: Union[str, Doc, Span]) -> str:
+        """Replace content words with their best synonyms; a parsed text is used as is."""
+        if not isinstance(text, Span):
+            text = ensure_doc(text, self.nlp, self.replace_with_synonyms.required_components)
+        return self._render(text, self.synonym_replacements(text))
+
+    @staticmethod
+    def _render(tokens: Union[Doc, Span], replacements: Dict[int, str]) -> str:
+        """The text of ``tokens`` with some tokens replaced."""
+        if not replacements:
+            return tokens.text
+        text = ''.join(replacements.get(token.i, token.text) + token.whitespace_ for token in tokens)
+        return text[:len(text) - len(tokens[-1].whitespace_)]
+
+    @requires(NER)
+    def identify_entities(self, text: Union[str, Doc]) -> Dict[str, List[Dict[str, Any]]]:
         """Identify named entities in the text."""
-        doc = self.nlp(text)
+        doc = ensure_doc(text, self.nlp, self.identify_entities.required_components)
         entities = defaultdict(list)
         for ent in doc.ents:
             entities[ent.label_].append({
@@ -58,47 +159,28 @@ class TextOptimizer:
             })
         return dict(entities)
 
-    def extract_key_phrases(self, text: str, num_phrases: int = 5) -> List[str]:
-        """Extract key phrases using TF-IDF and noun phrases."""
-        doc = self.nlp(text)
-
-        # Extract noun phrases
-        noun_phrases = [chunk.text.lower() for chunk in doc.noun_chunks
-                       if not all(token.is_stop for token in chunk)]
-
-        if not noun_phrases:
-            return []
-
-        # Calculate TF-IDF scores
-        vectorizer = TfidfVectorizer(stop_words='english')
-        try:
-            tfidf_matrix = vectorizer.fit_transform(noun_phrases)
-            feature_names = vectorizer.get_feature_names_out()
-
-            # Calculate phrase importance scores
-            phrase_scores = []
-            for i, phrase in enumerate(noun_phrases):
-                score = sum(tfidf_matrix[i, vectorizer.vocabulary_[word]]
-                           for word in phrase.split()
-                           if word in vectorizer.vocabulary_)
-                phrase_scores.append((phrase, score))
-
-            # Return top phrases
-            return [phrase for phrase, _ in sorted(phrase_scores,
-                                                 key=lambda x: x[1],
-                                                 reverse=True)[:num_phrases]]
-        except Exception:
-            # Fallback to basic frequency-based extraction
-            phrase_freq = defaultdict(int)
-            for phrase in noun_phrases:
-                phrase_freq[phrase] += 1
-            return [phrase for phrase, _ in sorted(phrase_freq.items(),
-                                                 key=lambda x: x[1],
-                                                 reverse=True)[:num_phrases]]
-
-    def analyze_text_structure(self, text: str) -> Dict[str, Any]:
-        """Analyze text structure and coherence."""
-        doc = self.nlp(text)
+    @requires(TAGGER, PARSER)
+    def extract_key_phrases(self, text: Union[str, Doc], num_phrases: int = 5) -> List[str]:
+        """Extract the noun phrases with the highest corpus TF-IDF weight."""
+        doc = ensure_doc(text, self.nlp, self.extract_key_phrases.required_components)
+        return rank_key_phrases([doc], self.idf_model, num_phrases)[0]
+
+    @requires(TAGGER, PARSER)
+    def extract_key_phrases_many(self, texts: Sequence[Union[str, Doc]], num_phrases: int = 5) -> List[List[str]]:
+        """Extract key phrases from many texts, parsed in one batch and scored together."""
+        docs = list(texts)
+        pending = [index for index, text in enumerate(texts) if not isinstance(text, Doc)]
+        parsed = parse_many([texts[index] for index in pending], self.extract_key_phrases_many.required_components, self.nlp)
+        for index, doc in zip(pending, parsed):
+            if isinstance(doc, Exception):
+                raise doc
+            docs[index] = doc
+        return rank_key_phrases(docs, self.idf_model, num_phrases)
+
+    @requires(PARSER, SENTS)
+    def analyze_text_structure(self, text: Union[str, Doc], coherence_score: Optional[float] = None) -> Dict[str, Any]:
+        """Analyze text structure and coherence; pass ``coherence_score`` if already computed."""
+        doc = ensure_doc(text, self.nlp, self.analyze_text_structure.required_components)
 
         # Analyze sentence structure
         sentence_types = defaultdict(int)
@@ -124,12 +206,26 @@ class TextOptimizer:
             'sentence_types': dict(sentence_types),
             'transition_words': transition_words,
             'avg_sentence_length': sum(len(sent.text.split()) for sent in doc.sents) / len(list(doc.sents)),
-            'coherence_score': self._calculate_coherence_score(doc)
+            'coherence_score': self._calculate_coherence_score(doc) if coherence_score is None else coherence_score
         }
 
-    def optimize_sentence_structure(self, sentence: str) -> str:
-        """Optimize sentence structure using advanced NLP analysis."""
-        doc = self.nlp(sentence)
+    @requires(PARSER)
+    def optimize_sentence_structure(self,
+                                    sentence: Union[str, Span, Doc],
+                                    replacements: Optional[Dict[int, str]] = None) -> str:
+        """Optimize sentence structure using advanced NLP analysis.
+
+        ``sentence`` may be a sentence Span of an already parsed Doc, which
+        is used as is instead of being parsed again. ``replacements`` maps
+        token indices to words written in their place, such as synonyms.
+        """
+        replacements = replacements or {}
+        if isinstance(sentence, Span):
+            doc = sentence
+            sentence = sentence.text
+        else:
+            doc = ensure_doc(sentence, self.nlp, self.optimize_sentence_structure.required_components)
+            sentence = doc.text
 
         # Handle long sentences
         if len(doc) > 20:
@@ -138,7 +234,7 @@ class TextOptimizer:
             current_split = []
 
             for token in doc:
-                current_split.append(token.text)
+                current_split.append(replacements.get(token.i, token.text))
 
                 # Check for natural breaking points
                 if (token.dep_ in ['cc', 'mark'] and len(current_split) > 5) or \
@@ -151,46 +247,47 @@ class TextOptimizer:
 
             return '. '.join(splits)
 
-        return sentence
+        return self._render(doc, replacements)
 
-    def calculate_readability_metrics(self, text: str) -> Dict[str, float]:
+    @requires(SENTS)
+    def calculate_readability_metrics(self, text: Union[str, Doc]) -> Dict[str, float]:
         """Calculate comprehensive readability metrics."""
-        metrics = {
-            'flesch_reading_ease': textstat.flesch_reading_ease(text),
-            'flesch_kincaid_grade': textstat.flesch_kincaid_grade(text),
-            'gunning_fog': textstat.gunning_fog(text),
-            'smog_index': textstat.smog_index(text),
-            'automated_readability_index': textstat.automated_readability_index(text),
-            'coleman_liau_index': textstat.coleman_liau_index(text),
-            'linsear_write_formula': textstat.linsear_write_formula(text),
-            'dale_chall_readability_score': textstat.dale_chall_readability_score(text)
-        }
-
-        # Add sentence structure metrics
-        doc = self.nlp(text)
-        metrics.update({
-            'avg_sentence_length': sum(len(sent.text.split()) for sent in doc.sents) / len(list(doc.sents)),
-            'avg_word_length': sum(len(token.text) for token in doc if not token.is_punct) / 
-                             len([token for token in doc if not token.is_punct]),
-            'complex_word_ratio': len([token for token in doc if len(token.text) > 6]) / 
-                                len([token for token in doc if not token.is_punct])
-        })
-
-        return metrics
-
-    def _calculate_coherence_score(self, doc) -> float:
-        """Calculate text coherence score based on semantic similarity."""
+        doc = ensure_doc(text, self.nlp, self.calculate_readability_metrics.required_components)
+        return readability_metrics(doc)
+
+    @requires(SENTS)
+    def sentence_embeddings(self, text: Union[str, Doc]) -> np.ndarray:
+        """One embedding row per sentence, from the source set by ``sentence_embedding``."""
+        doc = ensure_doc(text, self.nlp, self.sentence_embeddings.required_components)
+        settings = get_settings()
+        return sentence_embeddings(doc, settings.sentence_embedding, settings.sentence_embedding_hash_dim)
+
+    @requires(SENTS)
+    def sentence_similarity_matrix(self, text: Union[str, Doc]) -> np.ndarray:
+        """Cosine similarity of every pair of sentences."""
+        return similarity_matrix(self.sentence_embeddings(text))
+
+    @requires(SENTS)
+    def find_off_topic_sentences(self, text: Union[str, Doc], ratio: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Find sentences much less similar to the rest of the text than a typical sentence is."""
+        doc = ensure_doc(text, self.nlp, self.find_off_topic_sentences.required_components)
+        matrix = self.sentence_similarity_matrix(doc)
+        if ratio is None:
+            ratio = get_settings().off_topic_ratio
         sentences = list(doc.sents)
-        if len(sentences) < 2:
-            return 1.0
-
-        # Calculate similarity between consecutive sentences
-        similarities = []
-        for i in range(len(sentences) - 1):
-            similarity = sentences[i].similarity(sentences[i + 1])
-            similarities.append(similarity)
+        return [
+            {
+                'text': sentences[index].text,
+                'start': sentences[index].start_char,
+                'end': sentences[index].end_char,
+                'similarity': float((matrix[index].sum() - matrix[index, index]) / (len(matrix) - 1))
+            }
+            for index in off_topic(matrix, ratio)
+        ]
 
-        return sum(similarities) / len(similarities)
+    def _calculate_coherence_score(self, doc) -> float:
+        """Mean similarity of adjacent sentences, from one batched cosine computation."""
+        return coherence(self.sentence_embeddings(doc))
 
     def _convert_spacy_pos_to_wordnet(self, spacy_pos: str) -> Optional[str]:
         """Convert spaCy POS tags to WordNet POS tags."""
@@ -202,6 +299,19 @@ class TextOptimizer:
         }
         return pos_map.get(spacy_pos)
 
+    @property
+    def required_components(self) -> FrozenSet[str]:
+        """Pipeline capabilities needed by optimize_text."""
+        return required_components(
+            self.extract_key_phrases,
+            self.optimize_sentence_structure,
+            self.replace_with_synonyms,
+            self.calculate_readability_metrics,
+            self.analyze_text_structure,
+            self.identify_entities,
+            self.generate_suggestions,
+        )
+
     def optimize_text(self,
                      text: str,
                      optimization_level: str = 'medium',
@@ -210,8 +320,12 @@ class TextOptimizer:
         if not text:
             raise TextTooShortError("Input text cannot be empty")
 
-        if len(text) > 10000:
-            raise TextTooLongError("Input text exceeds maximum length of 10000 characters")
+        max_length = get_settings().max_text_length
+        if len(text) > max_length:
+            raise TextTooLongError(
+                f"Input text exceeds maximum length of {max_length} characters; "
+                "use streaming analysis for longer documents"
+            )
 
         if optimization_level not in ['light', 'medium', 'aggressive']:
             raise InvalidOptimizationLevelError(f"Invalid optimization level: {optimization_level}")
@@ -219,16 +333,19 @@ class TextOptimizer:
         preserve_keywords = set(k.lower() for k in (preserve_keywords or []))
 
         try:
-            # Process text with spaCy
-            doc = self.nlp(text)
+            # Parse the input once, running only the components the
+            # optimization steps below need
+            doc = parse(text, self.required_components, self.nlp)
 
             # Extract key phrases to preserve
             if not preserve_keywords:
-                preserve_keywords.update(self.extract_key_phrases(text))
+                preserve_keywords.update(self.extract_key_phrases(doc))
 
-            # Optimize sentence by sentence
+            # Optimize sentence by sentence, reusing the parse of every
+            # sentence that stays the same
+            sentences = list(doc.sents)
             optimized_sentences = []
-            for sent in doc.sents:
+            for sent in sentences:
                 # Skip optimization for sentences containing preserved keywords
                 if any(keyword in sent.text.lower() for keyword in preserve_keywords):
                     optimized_sentences.append(sent.text)
@@ -237,34 +354,52 @@ class TextOptimizer:
                 # Apply optimizations based on level
                 optimized = sent.text
                 if optimization_level in ['medium', 'aggressive']:
-                    optimized = self.optimize_sentence_structure(optimized)
-
-                if optimization_level == 'aggressive':
-                    optimized = self.replace_with_synonyms(optimized)
+                    replacements = self.synonym_replacements(sent) if optimization_level == 'aggressive' else None
+                    optimized = self.optimize_sentence_structure(sent, replacements)
 
                 optimized_sentences.append(optimized)
 
-            # Join sentences
-            optimized_text = ' '.join(optimized_sentences)
+            optimized_doc = self._assemble_doc(sentences, optimized_sentences)
+            optimized_text = optimized_doc.text
 
-            # Calculate comprehensive metrics
+            # Calculate comprehensive metrics, all from the one optimized Doc
+            coherence_score = self._calculate_coherence_score(optimized_doc)
             metrics = {
-                'readability': self.calculate_readability_metrics(optimized_text),
-                'structure': self.analyze_text_structure(optimized_text),
-                'entities': self.identify_entities(optimized_text),
-                'key_phrases': self.extract_key_phrases(optimized_text)
+                'readability': self.calculate_readability_metrics(optimized_doc),
+                'structure': self.analyze_text_structure(optimized_doc, coherence_score),
+                'entities': self.identify_entities(optimized_doc),
+                'key_phrases': self.extract_key_phrases(optimized_doc)
             }
 
             # Generate detailed suggestions
-            suggestions = self.generate_suggestions(self.nlp(optimized_text))
+            suggestions = self.generate_suggestions(optimized_doc, coherence_score)
 
             return optimized_text, metrics, suggestions
 
         except Exception as e:
             raise ProcessingError(f"Error during text optimization: {str(e)}")
 
-    def generate_suggestions(self, doc) -> List[Dict[str, Any]]:
-        """Generate detailed improvement suggestions."""
+    def _assemble_doc(self, sentences: List[Span], optimized: List[str]) -> Doc:
+        """Build the Doc of the optimized text from the original sentences.
+
+        Unchanged sentences are copied out of the original parse; only the
+        changed ones are parsed, together in one batch. Sentences are
+        separated by a single space unless one already ends in whitespace.
+        """
+        changed = [i for i, (sent, text) in enumerate(zip(sentences, optimized)) if text != sent.text]
+        parsed = parse_many([optimized[i] for i in changed], self.required_components, self.nlp)
+        docs = [sent.as_doc() for sent in sentences]
+        for i, doc in zip(changed, parsed):
+            if isinstance(doc, Exception):
+                raise doc
+            docs[i] = doc
+        if not docs:
+            return parse("", self.required_components, self.nlp)
+        return Doc.from_docs(docs, ensure_whitespace=True)
+
+    @requires(PARSER, SENTS)
+    def generate_suggestions(self, doc, coherence_score: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Generate detailed improvement suggestions; pass ``coherence_score`` if already computed."""
         suggestions = []
 
         # Analyze sentence length
@@ -301,7 +436,8 @@ class TextOptimizer:
             })
 
         # Analyze text coherence
-        coherence_score = self._calculate_coherence_score(doc)
+        if coherence_score is None:
+            coherence_score = self._calculate_coherence_score(doc)
         if coherence_score < 0.5:
             suggestions.append({
                 'type': 'coherence',
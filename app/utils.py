@@ -1,23 +1,17 @@
 import spacy
-import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union
+from spacy.tokens import Doc
+from .model_registry import get_nlp
+from .pipeline import NER, PARSER, SENTS, TAGGER, ensure_doc, requires
 
-def initialize_nlp(model_name: str = 'en_core_web_sm') -> spacy.Language:
-    """Initialize spaCy NLP model."""
-    try:
-        nlp = spacy.load(model_name)
-        return nlp
-    except OSError:
-        logging.warning(f"Downloading language model {model_name}")
-        spacy.cli.download(model_name)
-        return spacy.load(model_name)
+def initialize_nlp(model_name: Optional[str] = None) -> spacy.Language:
+    """Return the shared spaCy NLP model from the process-wide registry."""
+    return get_nlp(model_name)
 
-def calculate_text_metrics(text: str, nlp: Optional[spacy.Language] = None) -> Dict[str, Any]:
+@requires(TAGGER, NER, SENTS)
+def calculate_text_metrics(text: Union[str, Doc], nlp: Optional[spacy.Language] = None) -> Dict[str, Any]:
     """Calculate various text metrics."""
-    if nlp is None:
-        nlp = initialize_nlp()
-    
-    doc = nlp(text)
+    doc = ensure_doc(text, nlp, calculate_text_metrics.required_components)
     
     # Basic metrics
     metrics = {
@@ -41,12 +35,10 @@ def calculate_text_metrics(text: str, nlp: Optional[spacy.Language] = None) -> D
     
     return metrics
 
-def extract_sentences(text: str, nlp: Optional[spacy.Language] = None) -> list:
+@requires(PARSER, NER, SENTS)
+def extract_sentences(text: Union[str, Doc], nlp: Optional[spacy.Language] = None) -> list:
     """Extract sentences from text with additional metadata."""
-    if nlp is None:
-        nlp = initialize_nlp()
-    
-    doc = nlp(text)
+    doc = ensure_doc(text, nlp, extract_sentences.required_components)
     sentences = []
     
     for sent in doc.sents:
@@ -61,6 +53,7 @@ def extract_sentences(text: str, nlp: Optional[spacy.Language] = None) -> list:
     
     return sentences
 
+@requires(PARSER)
 def get_sentence_complexity(sent: spacy.tokens.Span) -> float:
     """Calculate sentence complexity score based on various factors."""
     complexity_score = 1.0
@@ -0,0 +1,15 @@
+"""Micro-benchmarks of the processors, TextOptimizer methods and API routes.
+
+Every case runs on deterministic synthetic texts of tweet, paragraph and
+document size and reports latency percentiles, throughput, spaCy parses
+per call and peak memory::
+
+    python -m benchmarks run --output results.json
+    python -m benchmarks run --filter optimize_text --sizes paragraph
+    python -m benchmarks run --update-baseline
+    python -m benchmarks compare results.json benchmarks/baseline.json
+
+``run`` compares with ``benchmarks/baseline.json`` when it exists and
+exits with status 1 on a regression. Baselines are machine-specific, so
+create one on the machine that runs the comparison.
+"""
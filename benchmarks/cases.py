@@ -0,0 +1,160 @@
+"""The benchmarked calls: processors, TextOptimizer methods and API routes."""
+import inspect
+import os
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from .harness import Case
+
+# Analyze in-process so parses are counted, and don't hold single requests
+# back waiting for others to batch with: benchmark requests come one at a time
+os.environ.setdefault("EXECUTOR_TYPE", "thread")
+os.environ.setdefault("MICROBATCH_WINDOW_MS", "0")
+
+PROCESSOR = "processor"
+OPTIMIZER = "optimizer"
+ROUTE = "route"
+
+OPTIMIZATION_LEVELS = ("light", "medium", "aggressive")
+
+# TextOptimizer methods that take a text (or a Doc parsed from it) as their only argument
+_TEXT_METHODS = (
+    "extract_key_phrases",
+    "identify_entities",
+    "analyze_text_structure",
+    "optimize_sentence_structure",
+    "calculate_readability_metrics",
+    "replace_with_synonyms",
+    "sentence_embeddings",
+    "sentence_similarity_matrix",
+    "find_off_topic_sentences",
+)
+
+
+def paragraphs(text: str) -> List[str]:
+    return [paragraph for paragraph in text.split("\n\n") if paragraph.strip()]
+
+
+def processor_cases() -> List[Case]:
+    from app.analysis import grammar_enhancer, sentiment_analyzer, style_processor
+
+    cases = [
+        Case("GrammarEnhancer.enhance_text", PROCESSOR, grammar_enhancer.enhance_text),
+        Case("SentimentAnalyzer.analyze_sentiment", PROCESSOR, sentiment_analyzer.analyze_sentiment),
+    ]
+    for guide in style_processor.library.names():
+        cases.append(Case(
+            f"StyleGuideProcessor.check_style[{guide}]", PROCESSOR,
+            lambda text, guide=guide: style_processor.check_style(text, guide),
+        ))
+    return cases
+
+
+def optimizer_cases(optimizer: Optional[Any] = None) -> List[Case]:
+    from app.pipeline import parse
+    from app.text_processor import TextOptimizer
+
+    optimizer = optimizer or TextOptimizer()
+
+    def parsed_for(method: Callable) -> Callable[[str], Any]:
+        return lambda text: parse(text, method.required_components, optimizer.nlp)
+
+    cases = [
+        Case(f"TextOptimizer.optimize_text[{level}]", OPTIMIZER,
+             lambda text, level=level: optimizer.optimize_text(text, level))
+        for level in OPTIMIZATION_LEVELS
+    ]
+    cases.extend(Case(f"TextOptimizer.{name}", OPTIMIZER, getattr(optimizer, name)) for name in _TEXT_METHODS)
+    cases.extend([
+        Case("TextOptimizer.extract_key_phrases_many", OPTIMIZER, optimizer.extract_key_phrases_many, paragraphs),
+        Case("TextOptimizer.get_synonyms", OPTIMIZER, lambda text: optimizer.get_synonyms("good", text)),
+        Case("TextOptimizer.synonym_replacements", OPTIMIZER, optimizer.synonym_replacements,
+             parsed_for(optimizer.synonym_replacements)),
+        Case("TextOptimizer.generate_suggestions", OPTIMIZER, optimizer.generate_suggestions,
+             parsed_for(optimizer.generate_suggestions)),
+    ])
+    return cases
+
+
+def route_cases(client: Optional[Any] = None) -> List[Case]:
+    from fastapi.testclient import TestClient
+
+    from app.analysis import style_processor
+    from app.main import app
+
+    client = client or TestClient(app)
+    guide = style_processor.library.names()[0]
+
+    def check(response) -> Any:
+        if response.status_code >= 400:
+            raise RuntimeError(f"{response.request.method} {response.request.url.path}: "
+                               f"{response.status_code} {response.text[:200]}")
+        return response
+
+    def post(path: str, body: Callable[[str], Dict[str, Any]]) -> Case:
+        return Case(f"POST {path}", ROUTE, lambda text: check(client.post(path, json=body(text))))
+
+    def item(text: str, **options: Any) -> Dict[str, Any]:
+        return {"text": text, "use_cache": False, **options}
+
+    def batch(text: str, **options: Any) -> Dict[str, Any]:
+        return {"items": [item(paragraph, **options) for paragraph in paragraphs(text)]}
+
+    def new_session(text: str) -> str:
+        return check(client.post("/sessions", json={"text": text, "style_guide": guide})).json()["session_id"]
+
+    cases = [
+        Case(f"GET {path}", ROUTE, lambda text, path=path: check(client.get(path)))
+        for path in ("/", "/style-guides", "/health", "/health/models", "/cache/stats", "/health/executor")
+    ]
+    cases.extend([
+        post("/analyze", lambda text: item(text, style_guide=guide)),
+        post("/enhance/grammar", item),
+        post("/analyze/style", lambda text: item(text, style_guide=guide)),
+        post("/analyze/sentiment", item),
+        post("/analyze/batch", lambda text: batch(text, style_guide=guide)),
+        post("/enhance/grammar/batch", batch),
+        post("/analyze/style/batch", lambda text: batch(text, style_guide=guide)),
+        post("/analyze/sentiment/batch", batch),
+        post("/analyze/stream", lambda text: {"text": text, "style_guide": guide}),
+        post("/sessions", lambda text: {"text": text, "style_guide": guide}),
+        Case("POST /sessions/{session_id}/edits", ROUTE,
+             lambda session: check(client.post(f"/sessions/{session}/edits",
+                                               json={"edits": [{"start": 0, "end": 0, "text": "Note that "}]})),
+             new_session, setup_each=True),
+        Case("GET /sessions/{session_id}", ROUTE,
+             lambda session: check(client.get(f"/sessions/{session}")), new_session),
+        Case("DELETE /sessions/{session_id}", ROUTE,
+             lambda session: check(client.delete(f"/sessions/{session}")), new_session, setup_each=True),
+    ])
+    return cases
+
+
+def all_cases() -> List[Case]:
+    return processor_cases() + optimizer_cases() + route_cases()
+
+
+def uncovered_methods(cases: List[Case]) -> List[str]:
+    """Public TextOptimizer methods that no case benchmarks."""
+    from app.text_processor import TextOptimizer
+
+    covered: Set[str] = {case.name.split("[")[0].split(".", 1)[1] for case in cases if case.group == OPTIMIZER}
+    methods = {
+        name for name, member in inspect.getmembers(TextOptimizer, inspect.isfunction)
+        if not name.startswith("_")
+    }
+    return sorted(methods - covered)
+
+
+def uncovered_routes(cases: List[Case]) -> List[str]:
+    """API routes that no case benchmarks."""
+    from fastapi.routing import APIRoute
+
+    from app.main import app
+
+    covered = {case.name for case in cases if case.group == ROUTE}
+    routes = {
+        f"{method} {route.path}"
+        for route in app.routes if isinstance(route, APIRoute)
+        for method in route.methods
+    }
+    return sorted(routes - covered)
@@ -0,0 +1,83 @@
+"""Deterministic synthetic corpora for the benchmarks.
+
+Texts are built from seeded templates, so every run, on every machine,
+benchmarks exactly the same input. The templates mix what the processors
+look for: grammar errors, style guide violations (jargon, contractions,
+passive voice, cliches), sentiment and emotion words, long sentences
+with conjunctions to split, and named entities.
+"""
+import random
+from typing import Dict, List
+
+# Target sizes in characters; "document" stays within the default max_text_length
+SIZES: Dict[str, int] = {
+    "tweet": 280,
+    "paragraph": 1200,
+    "document": 10000,
+}
+
+DEFAULT_SEED = 1234
+
+_WORDS = {
+    "det": ["The", "This", "Every", "Our", "That"],
+    "adj": ["quick", "careful", "good", "terrible", "happy", "worried", "complex", "simple", "excellent", "poor"],
+    "noun": ["team", "report", "customer", "engine", "manager", "proposal", "system", "result", "budget", "student"],
+    "plural": ["teams", "reports", "customers", "engines", "managers", "students"],
+    "verb_s": ["improves", "reviews", "explains", "supports", "delays", "describes"],
+    "participle": ["reviewed", "approved", "written", "delayed", "rejected"],
+    "vowel_noun": ["apple", "idea", "engine", "update", "hour"],
+    "adv": ["quickly", "clearly", "surprisingly", "carefully"],
+    "jargon": ["leverage synergy", "move the needle", "think outside the box", "circle back"],
+    "name": ["Alice Johnson", "Acme Corp", "London", "Microsoft", "Maria Garcia"],
+    "emotion": ["delighted", "furious", "scared", "amazed", "disappointed"],
+}
+
+_TEMPLATES = [
+    "{det} {adj} {noun} {verb_s} the {noun}.",
+    "The {plural} {verb_s} the {noun} every week.",  # subject-verb disagreement
+    "She bought a {vowel_noun} for the {noun}.",  # article error
+    "The {noun} was {participle} by the {noun} {adv}.",  # passive voice
+    "We need to {jargon} before the {noun} is {participle}.",
+    "I can't believe the {noun} didn't work, it's {adj}.",  # contractions
+    "{name} was {emotion} when the {noun} {verb_s} the {adj} {noun}.",
+    "At the end of the day, the {noun} {verb_s} the {noun}.",  # cliche
+    "The {adj} {noun} {verb_s} the {noun} and the {noun} {verb_s} the {adj} {noun}, "
+    "but the {noun} {verb_s} the {noun} because the {adj} {noun} {verb_s} the {noun} "
+    "while the {noun} {verb_s} the {adj} {noun}.",  # long sentence to split
+]
+
+
+def sentence(rng: random.Random) -> str:
+    template = rng.choice(_TEMPLATES)
+    pieces = template.split("{")
+    result = [pieces[0]]
+    for piece in pieces[1:]:
+        slot, rest = piece.split("}", 1)
+        result.append(rng.choice(_WORDS[slot]) + rest)
+    return "".join(result)
+
+
+def make_text(size: int, seed: int = DEFAULT_SEED) -> str:
+    """Whole sentences, in paragraphs of about five, up to ``size`` characters."""
+    rng = random.Random(f"{seed}:{size}")
+    paragraphs: List[List[str]] = [[]]
+    length = 0
+    misses = 0
+    # Stop once several sentences in a row don't fit in the space left
+    while misses < 20:
+        candidate = sentence(rng)
+        separator = 0 if not length else 2 if len(paragraphs[-1]) == 5 else 1
+        if length + separator + len(candidate) > size:
+            misses += 1
+            continue
+        misses = 0
+        if separator == 2:
+            paragraphs.append([])
+        paragraphs[-1].append(candidate)
+        length += separator + len(candidate)
+    return "\n\n".join(" ".join(paragraph) for paragraph in paragraphs)
+
+
+def make_corpus(seed: int = DEFAULT_SEED) -> Dict[str, str]:
+    """One text per named size."""
+    return {name: make_text(size, seed) for name, size in SIZES.items()}
@@ -0,0 +1,122 @@
+"""Timing, parse counting and peak memory for one benchmark case."""
+import gc
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import numpy as np
+import spacy
+
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass(frozen=True)
+class Case:
+    """One benchmarked call on a text of one size.
+
+    ``setup`` turns the text into the argument of ``run`` outside the
+    timed region: once per case, or before every call if ``setup_each``
+    (for calls that consume their argument, such as closing a session).
+    """
+    name: str
+    group: str
+    run: Callable[[Any], Any]
+    setup: Optional[Callable[[str], Any]] = None
+    setup_each: bool = False
+
+
+class ParseCounter:
+    """Counts the Docs produced by every ``Language`` while it is installed."""
+
+    def __init__(self):
+        self.count = 0
+        self.active = True  # parses made while inactive, such as in setup, aren't counted
+        self._lock = threading.Lock()
+
+    def add(self, n: int = 1) -> None:
+        if not self.active:
+            return
+        with self._lock:
+            self.count += n
+
+    @contextmanager
+    def installed(self) -> Iterator["ParseCounter"]:
+        call, pipe = spacy.Language.__call__, spacy.Language.pipe
+        counter = self
+
+        def counting_call(nlp, *args, **kwargs):
+            counter.add()
+            return call(nlp, *args, **kwargs)
+
+        def counting_pipe(nlp, *args, **kwargs):
+            for doc in pipe(nlp, *args, **kwargs):
+                counter.add()
+                yield doc
+
+        spacy.Language.__call__, spacy.Language.pipe = counting_call, counting_pipe
+        try:
+            yield self
+        finally:
+            spacy.Language.__call__, spacy.Language.pipe = call, pipe
+
+
+def summarize(durations: np.ndarray, chars: int) -> Dict[str, float]:
+    """Latency percentiles in milliseconds and throughput of a list of durations in seconds."""
+    mean = float(durations.mean())
+    summary = {f"p{q}_ms": float(np.percentile(durations, q) * 1000) for q in PERCENTILES}
+    summary.update({
+        "mean_ms": mean * 1000,
+        "min_ms": float(durations.min() * 1000),
+        "calls_per_s": 1 / mean if mean else float("inf"),
+        "chars_per_s": chars / mean if mean else float("inf"),
+    })
+    return summary
+
+
+def measure(case: Case, text: str, repeat: int = 20, warmup: int = 2) -> Dict[str, Any]:
+    """Time ``repeat`` calls of a case after ``warmup`` untimed ones.
+
+    Parses are counted over the timed calls and reported per call. Peak
+    memory is what Python allocated during one extra call, traced
+    separately so tracing doesn't slow the timed calls.
+    """
+    argument = None if case.setup_each else (case.setup(text) if case.setup else text)
+
+    def prepared() -> Any:
+        if case.setup_each:
+            return case.setup(text) if case.setup else text
+        return argument
+
+    for _ in range(warmup):
+        case.run(prepared())
+
+    counter = ParseCounter()
+    durations = np.zeros(repeat)
+    gc.collect()
+    with counter.installed():
+        for i in range(repeat):
+            counter.active = False
+            value = prepared()
+            counter.active = True
+            start = time.perf_counter()
+            case.run(value)
+            durations[i] = time.perf_counter() - start
+
+    value = prepared()
+    tracemalloc.start()
+    try:
+        case.run(value)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    result = summarize(durations, len(text))
+    result.update({
+        "repeat": repeat,
+        "parses_per_call": counter.count / repeat,
+        "peak_memory_kb": peak / 1024,
+    })
+    return result
@@ -0,0 +1,173 @@
+"""Run the benchmark cases, write the results and compare them with a baseline."""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+from typing import Any, Dict, Iterable, List, Optional
+
+import spacy
+
+from . import cases as benchmark_cases
+from .corpus import DEFAULT_SEED, SIZES, make_corpus
+from .harness import Case, measure
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Latency and memory may grow by this fraction of the baseline before it's a regression
+DEFAULT_TOLERANCE = 0.25
+# ... and by at least this much, so timer noise on sub-millisecond calls isn't flagged
+MIN_DELTA_MS = 0.1
+MIN_DELTA_KB = 16.0
+
+LATENCY_METRICS = ("p50_ms", "p95_ms")
+
+
+def result_key(case: Case, size: str) -> str:
+    return f"{case.name} @ {size}"
+
+
+def run_cases(cases: Iterable[Case], texts: Dict[str, str], repeat: int, warmup: int,
+              pattern: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """Measure every case on every text; a case that fails is recorded with its error."""
+    results = {}
+    for case in cases:
+        for size, text in texts.items():
+            key = result_key(case, size)
+            if pattern and pattern not in key:
+                continue
+            try:
+                results[key] = {"group": case.group, "size": size, "chars": len(text),
+                                **measure(case, text, repeat, warmup)}
+            except Exception as e:
+                results[key] = {"group": case.group, "size": size, "error": f"{type(e).__name__}: {e}"}
+            print(format_result(key, results[key]), file=sys.stderr)
+    return results
+
+
+def metadata(repeat: int, warmup: int, seed: int) -> Dict[str, Any]:
+    from app.config import get_settings
+
+    return {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "spacy": spacy.__version__,
+        "nlp_model": get_settings().nlp_model,
+        "repeat": repeat,
+        "warmup": warmup,
+        "seed": seed,
+    }
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            tolerance: float = DEFAULT_TOLERANCE) -> List[Dict[str, Any]]:
+    """Regressions of ``results`` against ``baseline``, for the cases both contain.
+
+    Latency and peak memory regress when they grow by more than
+    ``tolerance``; any extra parse per call is a regression, as is a case
+    that fails now but succeeded in the baseline.
+    """
+    regressions = []
+
+    def regressed(key: str, metric: str, old: float, new: float) -> None:
+        regressions.append({"case": key, "metric": metric, "baseline": old, "current": new})
+
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None or "error" in previous:
+            continue
+        if "error" in current:
+            regressed(key, "error", None, current["error"])
+            continue
+        for metric in LATENCY_METRICS:
+            old, new = previous[metric], current[metric]
+            if new > old * (1 + tolerance) and new - old > MIN_DELTA_MS:
+                regressed(key, metric, old, new)
+        old, new = previous["peak_memory_kb"], current["peak_memory_kb"]
+        if new > old * (1 + tolerance) and new - old > MIN_DELTA_KB:
+            regressed(key, "peak_memory_kb", old, new)
+        if current["parses_per_call"] > previous["parses_per_call"]:
+            regressed(key, "parses_per_call", previous["parses_per_call"], current["parses_per_call"])
+    return regressions
+
+
+def format_result(key: str, result: Dict[str, Any]) -> str:
+    if "error" in result:
+        return f"{key:<60} ERROR {result['error']}"
+    return (f"{key:<60} p50 {result['p50_ms']:9.2f} ms  p95 {result['p95_ms']:9.2f} ms  "
+            f"p99 {result['p99_ms']:9.2f} ms  {result['chars_per_s']:12.0f} chars/s  "
+            f"{result['parses_per_call']:5.2f} parses  {result['peak_memory_kb']:9.1f} KB")
+
+
+def format_regression(regression: Dict[str, Any]) -> str:
+    return f"REGRESSION {regression['case']}: {regression['metric']} {regression['baseline']} -> {regression['current']}"
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save(path: str, report: Dict[str, Any]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def report_regressions(report: Dict[str, Any], baseline_path: str, tolerance: float) -> int:
+    if not os.path.exists(baseline_path):
+        print(f"No baseline at {baseline_path}; skipping comparison", file=sys.stderr)
+        return 0
+    regressions = compare(report["results"], load(baseline_path)["results"], tolerance)
+    for regression in regressions:
+        print(format_regression(regression))
+    print(f"{len(regressions)} regressions against {baseline_path}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the processors, TextOptimizer methods and API routes")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="Run the benchmarks and compare them with the baseline")
+    run.add_argument("--sizes", nargs="+", choices=sorted(SIZES), default=list(SIZES),
+                     help="Corpus sizes to benchmark (default: all)")
+    run.add_argument("--filter", help="Only run cases whose name contains this string")
+    run.add_argument("--repeat", type=int, default=20, help="Timed calls per case (default: 20)")
+    run.add_argument("--warmup", type=int, default=2, help="Untimed calls per case first (default: 2)")
+    run.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Corpus seed")
+    run.add_argument("--output", help="Write the results as JSON to this file")
+    run.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline results to compare with")
+    run.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                     help=f"Allowed relative growth of latency and memory (default: {DEFAULT_TOLERANCE})")
+    run.add_argument("--update-baseline", action="store_true", help="Save the results as the new baseline")
+    check = commands.add_parser("compare", help="Compare two result files")
+    check.add_argument("results")
+    check.add_argument("baseline")
+    check.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        return report_regressions(load(args.results), args.baseline, args.tolerance)
+
+    corpus = make_corpus(args.seed)
+    texts = {size: corpus[size] for size in args.sizes}
+    cases = benchmark_cases.all_cases()
+    report = {
+        "meta": metadata(args.repeat, args.warmup, args.seed),
+        "uncovered": {
+            "methods": benchmark_cases.uncovered_methods(cases),
+            "routes": benchmark_cases.uncovered_routes(cases),
+        },
+        "results": run_cases(cases, texts, args.repeat, args.warmup, args.filter),
+    }
+    for kind, names in report["uncovered"].items():
+        for name in names:
+            print(f"Not benchmarked ({kind}): {name}", file=sys.stderr)
+    if args.output:
+        save(args.output, report)
+    if args.update_baseline:
+        save(args.baseline, report)
+        return 0
+    return report_regressions(report, args.baseline, args.tolerance)
@@ -1,5 +1,10 @@
+import os
 import pytest
 from fastapi.testclient import TestClient
+
+# Run analysis in-process so tests can observe and patch the spaCy pipeline
+os.environ.setdefault("EXECUTOR_TYPE", "thread")
+
 from app.main import app
 
 @pytest.fixture
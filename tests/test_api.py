@@ -1,6 +1,9 @@
+import asyncio
 import pytest
 from fastapi.testclient import TestClient
-from app.main import app
+from spacy.language import Language
+from app import main
+from app.main import app, result_cache
 from app.processors.style_guide import StyleGuideType
 
 @pytest.fixture
@@ -12,6 +15,15 @@ def test_health_check(client):
     assert response.status_code == 200
     assert response.json()["status"] == "healthy"
 
+def test_model_memory_reports_each_worker(client):
+    client.post("/analyze/sentiment", json={"text": "Warm up the model.", "use_cache": False})
+    report = client.get("/health/models").json()
+    assert report["executor"] == "thread"
+    assert report["reporting_workers"] == report["expected_workers"] == 1
+    [worker] = report["workers"]
+    assert worker["models"] and worker["models"][0]["loaded"]
+    assert report["total_rss_bytes"] == (worker["process_rss_bytes"] or 0)
+
 def test_grammar_enhancement(client):
     test_text = "The cats runs fast and I saw an cat."
     response = client.post(
@@ -104,4 +116,112 @@ def test_empty_text(client):
     assert response.status_code == 200
     data = response.json()
     assert data["grammar"]["improvement_score"] == 1.0
-    assert data["sentiment"]["polarity"] == 0
\ No newline at end of file
+    assert data["sentiment"]["polarity"] == 0
+
+def test_combined_analysis_parses_once(client, monkeypatch):
+    parsed = []
+    original_call = Language.__call__
+    original_pipe = Language.pipe
+
+    def counting_call(self, text, **kwargs):
+        parsed.append(kwargs.get("disable", []))
+        return original_call(self, text, **kwargs)
+
+    def counting_pipe(self, texts, **kwargs):
+        texts = list(texts)
+        parsed.extend(kwargs.get("disable", []) for _ in texts)
+        return original_pipe(self, texts, **kwargs)
+
+    monkeypatch.setattr(Language, "__call__", counting_call)
+    monkeypatch.setattr(Language, "pipe", counting_pipe)
+
+    response = client.post(
+        "/analyze",
+        json={
+            "text": "The product is great but the service were terrible.",
+            "style_guide": StyleGuideType.BUSINESS.value,
+            "use_cache": False
+        }
+    )
+    assert response.status_code == 200
+    assert len(parsed) == 1
+    # Nothing in grammar, business style or sentiment needs entities
+    assert "ner" in parsed[0]
+
+def test_result_cache_hit_and_bypass(client):
+    result_cache.clear()
+    payload = {"text": "This is a good product.", "style_guide": StyleGuideType.BUSINESS.value}
+
+    first = client.post("/analyze/style", json=payload)
+    second = client.post("/analyze/style", json=payload)
+    assert first.json() == second.json()
+    stats = client.get("/cache/stats").json()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+    client.post("/analyze/style", json={**payload, "use_cache": False})
+    assert client.get("/cache/stats").json()["hits"] == 1
+
+def test_batch_analysis_keeps_order_and_isolates_errors(client):
+    texts = ["This is a good product.", "This is a terrible product.", "Nothing special here."]
+    response = client.post(
+        "/analyze/style/batch",
+        json={
+            "items": [
+                {"text": texts[0], "style_guide": StyleGuideType.BUSINESS.value},
+                {"text": texts[1]},
+                {"text": texts[2], "style_guide": StyleGuideType.ACADEMIC.value}
+            ],
+            "batch_size": 2
+        }
+    )
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [item["index"] for item in items] == [0, 1, 2]
+    assert items[0]["result"]["original_text"] == texts[0]
+    assert items[1]["result"] is None
+    assert items[1]["error"]
+    assert items[2]["result"]["style_guide_type"] == StyleGuideType.ACADEMIC.value
+
+def test_batch_sentiment_matches_single(client):
+    texts = ["This is a good product.", "This is a terrible product."]
+    response = client.post(
+        "/analyze/sentiment/batch",
+        json={"items": [{"text": text, "use_cache": False} for text in texts]}
+    )
+    assert response.status_code == 200
+    for text, item in zip(texts, response.json()["items"]):
+        single = client.post("/analyze/sentiment", json={"text": text, "use_cache": False}).json()
+        assert item["result"] == single
+
+def test_batch_uses_one_pipe_call(client, monkeypatch):
+    piped = []
+    original_pipe = Language.pipe
+
+    def counting_pipe(self, texts, **kwargs):
+        texts = list(texts)
+        piped.append(len(texts))
+        return original_pipe(self, texts, **kwargs)
+
+    monkeypatch.setattr(Language, "pipe", counting_pipe)
+    response = client.post(
+        "/analyze/batch",
+        json={"items": [{"text": f"Sentence number {i} is fine.", "use_cache": False} for i in range(5)]}
+    )
+    assert response.status_code == 200
+    assert piped == [5]
+
+def test_coalesced_batch_is_split_across_idle_workers(monkeypatch):
+    chunks = []
+
+    async def run(func, tasks, batch_size):
+        chunks.append([text for _, text, _ in tasks])
+        return [(text, None) for _, text, _ in tasks]
+
+    monkeypatch.setattr(main.executor, "executor_type", "process")
+    monkeypatch.setattr(main.executor, "max_workers", 2)
+    monkeypatch.setattr(main.executor, "run", run)
+    tasks = [("sentiment", text, None) for text in ["a" * 30, "b" * 10, "c" * 10, "d" * 10]]
+    outcomes = asyncio.run(main.run_coalesced_batch(tasks))
+    assert outcomes == [(text, None) for _, text, _ in tasks]
+    assert chunks == [["a" * 30], ["b" * 10, "c" * 10, "d" * 10]]
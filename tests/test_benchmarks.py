@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+import spacy
+from benchmarks.corpus import SIZES, make_corpus, make_text
+from benchmarks.harness import Case, ParseCounter, measure, summarize
+from benchmarks.runner import compare
+
+def result(p50=1.0, p95=2.0, parses=1.0, memory=100.0):
+    return {"p50_ms": p50, "p95_ms": p95, "parses_per_call": parses, "peak_memory_kb": memory}
+
+def test_corpus_is_deterministic_and_sized():
+    corpus = make_corpus()
+    assert corpus == make_corpus()
+    assert make_text(1200, seed=1) != corpus["paragraph"]
+    for name, size in SIZES.items():
+        assert size * 0.9 <= len(corpus[name]) <= size
+        assert corpus[name].endswith(".")
+
+def test_summarize_percentiles_and_throughput():
+    summary = summarize(np.arange(1, 101) / 1000, chars=500)
+    assert summary["p50_ms"] == pytest.approx(50.5)
+    assert summary["p99_ms"] == pytest.approx(99.01)
+    assert summary["min_ms"] == pytest.approx(1.0)
+    assert summary["chars_per_s"] == pytest.approx(500 / 0.0505)
+
+def test_parse_counter_counts_calls_and_pipes_and_restores():
+    nlp = spacy.blank("en")
+    call, pipe = spacy.Language.__call__, spacy.Language.pipe
+    with ParseCounter().installed() as counter:
+        nlp("One.")
+        list(nlp.pipe(["Two.", "Three."]))
+        counter.active = False
+        nlp("Not counted.")
+    assert counter.count == 3
+    assert (spacy.Language.__call__, spacy.Language.pipe) == (call, pipe)
+
+def test_measure_counts_parses_outside_setup():
+    nlp = spacy.blank("en")
+    case = Case("tokens", "test", lambda doc: len(nlp(doc.text)), setup=nlp)
+    measured = measure(case, "Some text to tokenize.", repeat=5, warmup=1)
+    assert measured["repeat"] == 5
+    assert measured["parses_per_call"] == 1.0
+    assert measured["p50_ms"] > 0 and measured["peak_memory_kb"] > 0
+
+def test_measure_runs_setup_before_each_call():
+    created = []
+    case = Case("consume", "test", created.remove, setup=lambda text: created.append(text) or text,
+                setup_each=True)
+    measure(case, "x", repeat=3, warmup=1)
+    assert created == []
+
+def test_compare_flags_regressions():
+    baseline = {"same": result(), "slower": result(), "reparsed": result(), "broken": result(),
+                "noise": result(p50=0.01, p95=0.02), "failing": {"error": "missing model"}}
+    current = {"same": result(p50=1.2), "slower": result(p50=2.0, memory=200.0),
+               "reparsed": result(parses=2.0), "broken": {"error": "boom"},
+               "noise": result(p50=0.05, p95=0.06), "failing": result(), "new": result()}
+    flagged = {(r["case"], r["metric"]) for r in compare(current, baseline, tolerance=0.25)}
+    assert flagged == {
+        ("slower", "p50_ms"), ("slower", "peak_memory_kb"), ("reparsed", "parses_per_call"), ("broken", "error"),
+    }
@@ -0,0 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor
+from app.cache import ResultCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_key_depends_on_endpoint_text_and_params():
+    key = ResultCache.make_key("/analyze", "text", style_guide="academic")
+    assert key == ResultCache.make_key("/analyze", "text", style_guide="academic")
+    assert key != ResultCache.make_key("/analyze", "text", style_guide="business")
+    assert key != ResultCache.make_key("/analyze/style", "text", style_guide="academic")
+    assert key != ResultCache.make_key("/analyze", "other", style_guide="academic")
+
+def test_hit_and_miss_counters():
+    cache = ResultCache(maxsize=10, ttl=60)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    cache = ResultCache(maxsize=10, ttl=60, clock=clock)
+    cache.set("a", 1)
+    clock.now = 59
+    assert cache.get("a") == 1
+    clock.now = 60
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 0
+
+def test_lru_eviction():
+    cache = ResultCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+def test_zero_size_disables_cache():
+    cache = ResultCache(maxsize=0, ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+def test_concurrent_access():
+    cache = ResultCache(maxsize=50, ttl=60)
+
+    def worker(i):
+        cache.set(str(i % 100), i)
+        cache.get(str((i + 1) % 100))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(worker, range(2000)))
+    stats = cache.stats()
+    assert stats["size"] <= 50
+    assert stats["hits"] + stats["misses"] == 2000
@@ -0,0 +1,92 @@
+import sqlite3
+import numpy as np
+import spacy
+import pytest
+from app import pipeline
+from app.doc_store import DocStore, doc_from_bytes, doc_to_bytes, model_fingerprint
+
+@pytest.fixture
+def nlp():
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    return nlp
+
+@pytest.fixture
+def store(tmp_path):
+    return DocStore(str(tmp_path / "docs.sqlite"), max_entries=3, evict_interval=1)
+
+def test_round_trip_keeps_annotations(nlp):
+    doc = nlp("First sentence. Second sentence.")
+    restored = doc_from_bytes(doc_to_bytes(doc), nlp.vocab)
+    assert restored.text == doc.text
+    assert [s.text for s in restored.sents] == [s.text for s in doc.sents]
+
+def test_round_trip_keeps_tensor(nlp):
+    doc = nlp("First sentence. Second sentence.")
+    doc.tensor = np.arange(len(doc) * 4, dtype=np.float32).reshape(len(doc), 4)
+    restored = doc_from_bytes(doc_to_bytes(doc), nlp.vocab)
+    assert np.array_equal(restored.tensor, doc.tensor)
+
+def test_get_and_put(store, nlp):
+    text = "The store keeps parsed documents."
+    assert store.get(text, nlp) is None
+    store.put(text, nlp(text), nlp)
+    assert store.get(text, nlp).text == text
+    # Parses made with other components are stored separately
+    assert store.get(text, nlp, {"tokenizer"}) is None
+
+def test_shared_between_instances(tmp_path, nlp):
+    path = str(tmp_path / "docs.sqlite")
+    DocStore(path).put("Shared text.", nlp("Shared text."), nlp)
+    assert DocStore(path).get("Shared text.", nlp).text == "Shared text."
+
+def test_lru_eviction(store, nlp):
+    for i in range(5):
+        text = f"Document number {i}."
+        store.put(text, nlp(text), nlp)
+    assert store.stats()["entries"] == 3
+    assert store.get("Document number 0.", nlp) is None
+    assert store.get("Document number 4.", nlp) is not None
+
+def test_byte_bound(tmp_path, nlp):
+    store = DocStore(str(tmp_path / "docs.sqlite"), max_bytes=1, evict_interval=1)
+    store.put("Too big.", nlp("Too big."), nlp)
+    assert store.stats()["entries"] == 0
+
+def test_model_change_invalidates(store, nlp):
+    store.put("Versioned text.", nlp("Versioned text."), nlp)
+    other = spacy.blank("en")
+    other.meta["version"] = "9.9.9"
+    assert model_fingerprint(other) != model_fingerprint(nlp)
+    assert store.get("Versioned text.", other) is None
+
+    store.put("New text.", other("New text."), other)
+    assert store.get("Versioned text.", nlp) is None
+    assert store.stats()["entries"] == 1
+
+def test_hits_only_touch_stale_entries(store, nlp):
+    text = "Frequently read text."
+    store.put(text, nlp(text), nlp)
+    conn = store._connection()
+    conn.execute("UPDATE docs SET last_access = 100.0")
+    store.touch_interval = 3600
+    store.get(text, nlp)
+    assert conn.execute("SELECT last_access FROM docs").fetchone()[0] > 100.0
+    conn.execute("UPDATE docs SET last_access = ?", (1e12,))
+    store.get(text, nlp)
+    assert conn.execute("SELECT last_access FROM docs").fetchone()[0] == 1e12
+
+class BrokenStore(DocStore):
+    def get(self, *args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    def put(self, *args, **kwargs):
+        raise sqlite3.OperationalError("disk I/O error")
+
+def test_store_errors_fall_back_to_parsing(tmp_path, nlp, monkeypatch):
+    store = BrokenStore(str(tmp_path / "docs.sqlite"))
+    monkeypatch.setattr(pipeline, "_store_for", lambda text: store)
+    assert pipeline.parse("Parsed anyway.", None, nlp).text == "Parsed anyway."
+    assert [doc.text for doc in pipeline.parse_many(["One.", "Two."], None, nlp)] == ["One.", "Two."]
+    assert store.errors == 6
+    assert store.stats()["errors"] == 6
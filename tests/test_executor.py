@@ -0,0 +1,85 @@
+import asyncio
+import os
+import time
+import pytest
+from app.exceptions import ExecutorBusyError, InvalidConfigurationError
+from app.executor import AnalysisExecutor
+
+def slow_square(x):
+    time.sleep(0.2)
+    return x * x
+
+def test_runs_in_pool():
+    executor = AnalysisExecutor("thread", max_workers=2)
+    try:
+        assert asyncio.run(executor.run(slow_square, 3)) == 9
+    finally:
+        executor.shutdown()
+
+def test_event_loop_stays_responsive():
+    executor = AnalysisExecutor("thread", max_workers=1)
+
+    async def scenario():
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(executor.run(slow_square, 2), ticker())
+        return ticks
+
+    try:
+        ticks = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+    # The ticker kept running while the slow task occupied the pool
+    assert ticks[-1] - ticks[0] < 0.2
+
+def test_rejects_when_queue_is_full():
+    executor = AnalysisExecutor("thread", max_workers=1, max_pending=1)
+
+    async def scenario():
+        return await asyncio.gather(
+            executor.run(slow_square, 1),
+            executor.run(slow_square, 2),
+            return_exceptions=True
+        )
+
+    try:
+        results = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+    assert results[0] == 1
+    assert isinstance(results[1], ExecutorBusyError)
+    assert executor.stats()["rejected"] == 1
+
+def test_invalid_executor_type():
+    with pytest.raises(InvalidConfigurationError):
+        AnalysisExecutor("fiber")
+
+def test_process_workers_publish_memory_reports():
+    executor = AnalysisExecutor("process", max_workers=2)
+    try:
+        pids = set(asyncio.run(executor.run(os.getpid)) for _ in range(4))
+        deadline = time.monotonic() + 30
+        reports = []
+        # Workers report when they start, whether or not they've run a task
+        while len(reports) < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+            reports = asyncio.run(executor.worker_reports())
+    finally:
+        executor.shutdown()
+    reported = {report["pid"] for report in reports}
+    assert len(reported) == 2 and pids <= reported and os.getpid() not in reported
+    assert all(report["models"][0]["loaded"] for report in reports)
+    assert asyncio.run(executor.worker_reports()) == []
+
+def test_thread_mode_reports_this_process():
+    executor = AnalysisExecutor("thread", max_workers=2)
+    try:
+        [report] = asyncio.run(executor.worker_reports())
+    finally:
+        executor.shutdown()
+    assert report["pid"] == os.getpid()
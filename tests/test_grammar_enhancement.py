@@ -1,5 +1,10 @@
 import pytest
-from app.processors.grammar_enhancement import GrammarEnhancer
+import spacy
+from spacy.tokens import Doc
+from app.processors.grammar_enhancement import (
+    GrammarEnhancer, base_form, indefinite_article, match_case, third_person_form
+)
+from app.processors.grammar_rules import GrammarRule
 
 @pytest.fixture
 def grammar_enhancer():
@@ -37,4 +42,106 @@ def test_enhance_text(grammar_enhancer):
     text = "The cats runs fast and I saw an cat."
     enhanced_text, issues = grammar_enhancer.enhance_text(text)
     assert len(issues) > 0
-    assert isinstance(enhanced_text, str)
\ No newline at end of file
+    assert isinstance(enhanced_text, str)
+
+def parsed_doc(enhancer, words, tags, pos, deps, heads):
+    """Build an annotated Doc, so the checks don't depend on what the model predicts."""
+    spaces = [True] * (len(words) - 1) + [False]
+    return Doc(enhancer.nlp.vocab, words=words, spaces=spaces, tags=tags, pos=pos, deps=deps, heads=heads)
+
+def test_one_issue_per_agreement_error_in_long_sentences(grammar_enhancer):
+    words = ["The", "cat", "run"] + ["fast"] * 50 + ["."]
+    doc = parsed_doc(
+        grammar_enhancer, words,
+        tags=["DT", "NN", "VBP"] + ["RB"] * 50 + ["."],
+        pos=["DET", "NOUN", "VERB"] + ["ADV"] * 50 + ["PUNCT"],
+        deps=["det", "nsubj", "ROOT"] + ["advmod"] * 50 + ["punct"],
+        heads=[1, 2, 2] + [2] * 50 + [2],
+    )
+    issues = grammar_enhancer.check_subject_verb_agreement(doc)
+    assert issues == [{
+        'type': 'subject_verb_agreement', 'text': doc.text, 'subject': 'cat', 'verb': 'run',
+        'start': 0, 'end': len(doc.text)
+    }]
+
+def test_article_is_checked_against_the_next_word(grammar_enhancer):
+    doc = parsed_doc(
+        grammar_enhancer, ["I", "saw", "a", "big", "elephant", "and", "an", "cat"],
+        tags=["PRP", "VBD", "DT", "JJ", "NN", "CC", "DT", "NN"],
+        pos=["PRON", "VERB", "DET", "ADJ", "NOUN", "CCONJ", "DET", "NOUN"],
+        deps=["nsubj", "ROOT", "det", "amod", "dobj", "cc", "det", "conj"],
+        heads=[1, 1, 4, 4, 1, 4, 7, 4],
+    )
+    _, issues = grammar_enhancer.enhance_text(doc)
+    assert [(issue['type'], issue['article'], issue['noun']) for issue in issues] == [('article_usage', 'an', 'cat')]
+
+@pytest.mark.parametrize("words", [
+    ["I", "saw", "a", "user"],
+    ["I", "waited", "an", "hour"],
+    ["It", "was", "a", "one", "-", "time", "fee"],
+    ["He", "is", "an", "honest", "man"],
+])
+def test_articles_follow_pronunciation_not_spelling(grammar_enhancer, words):
+    heads = [1, 1, 3, 1] + list(range(4, len(words)))
+    doc = parsed_doc(
+        grammar_enhancer, words,
+        tags=["PRP", "VBD", "DT", "NN"] + ["NN"] * (len(words) - 4),
+        pos=["PRON", "VERB", "DET", "NOUN"] + ["NOUN"] * (len(words) - 4),
+        deps=["nsubj", "ROOT", "det", "dobj"] + ["dep"] * (len(words) - 4),
+        heads=heads,
+    )
+    enhanced_text, issues = grammar_enhancer.enhance_text(doc)
+    assert enhanced_text == doc.text
+    assert issues == []
+
+def test_indefinite_article():
+    assert [indefinite_article(word) for word in ["cat", "apple", "Euro", "unit", "uncle", "heir", "hat"]] == [
+        "a", "an", "a", "a", "an", "an", "a"
+    ]
+    assert indefinite_article("FBI") is None
+
+def test_registered_rules_run_in_the_same_pass(grammar_enhancer):
+    grammar_enhancer.add_rule(GrammarRule(
+        name='double_negative',
+        pattern=[{'LOWER': {'IN': ["don't", 'not']}}, {'LOWER': {'IN': ['nothing', 'nobody']}}],
+        check=lambda first, second: {'text_pair': f"{first.text} {second.text}"}
+    ))
+    doc = parsed_doc(
+        grammar_enhancer, ["I", "not", "nothing"], tags=["PRP", "RB", "NN"], pos=["PRON", "PART", "PRON"],
+        deps=["nsubj", "ROOT", "dobj"], heads=[1, 1, 1],
+    )
+    _, issues = grammar_enhancer.enhance_text(doc)
+    assert [issue['type'] for issue in issues] == ['double_negative']
+
+def test_rules_needing_missing_annotations_are_skipped():
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    enhancer = GrammarEnhancer(nlp=nlp)
+    _, issues = enhancer.enhance_text(nlp("I saw an cat."))
+    assert issues == []
+
+def test_fixes_are_applied_with_an_offset_map(grammar_enhancer):
+    doc = parsed_doc(
+        grammar_enhancer, ["An", "cat", "run", "and", "a", "owl", "watches", "."],
+        tags=["DT", "NN", "VBP", "CC", "DT", "NN", "VBZ", "."],
+        pos=["DET", "NOUN", "VERB", "CCONJ", "DET", "NOUN", "VERB", "PUNCT"],
+        deps=["det", "nsubj", "ROOT", "cc", "det", "nsubj", "conj", "punct"],
+        heads=[1, 2, 2, 2, 5, 6, 2, 2],
+    )
+    enhancement = grammar_enhancer.enhance(doc)
+    assert enhancement.enhanced_text == "A cat runs and an owl watches ."
+    assert [(edit.source, edit.replacement) for edit in enhancement.edits] == [
+        ('article_usage', 'A'), ('subject_verb_agreement', 'runs'), ('article_usage', 'an')
+    ]
+    # "owl" moves by the one character the earlier fixes added in total
+    start = doc.text.index("owl")
+    assert enhancement.offset_map.map_span(start, start + 3) == (start + 1, start + 4)
+
+def test_verb_forms():
+    assert [third_person_form(verb) for verb in ["run", "watch", "try", "play", "have", "go"]] == [
+        "runs", "watches", "tries", "plays", "has", "goes"
+    ]
+    assert [base_form(verb) for verb in ["runs", "watches", "tries", "has", "passes", "is"]] == [
+        "run", "watch", "try", "have", "pass", "are"
+    ]
+    assert match_case("an", "A") == "An" and match_case("runs", "RUN") == "RUNS"
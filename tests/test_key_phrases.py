@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+import spacy
+from spacy.tokens import Doc
+from app.exceptions import InvalidIdfModelError
+from app.key_phrases import IdfModel, main, rank_key_phrases, top_k
+from app.text_processor import TextOptimizer
+
+nlp = spacy.blank("en")
+
+def parsed(text):
+    """A Doc for "<adj> <noun> <verb> <adj> <noun> ." with the annotations noun_chunks needs."""
+    words = text.split()
+    return Doc(
+        nlp.vocab, words=words,
+        pos=["ADJ", "NOUN", "VERB", "ADJ", "NOUN", "PUNCT"],
+        deps=["amod", "nsubj", "ROOT", "amod", "dobj", "punct"],
+        heads=[1, 2, 2, 4, 2, 2],
+    )
+
+CORPUS = ["green tea", "black tea", "Tea people", "busy tea"]
+
+def test_fit_matches_smoothed_idf(tmp_path):
+    model = IdfModel.fit(CORPUS, nlp)
+    assert model.documents == 4
+    ids = np.array([nlp.vocab.strings[word] for word in ["tea", "green", "unseen"]], dtype=np.uint64)
+    assert model.weights(ids) == pytest.approx([1.0, np.log(5 / 2) + 1, np.log(5) + 1])
+
+    model.save(str(tmp_path / "idf"))
+    loaded = IdfModel.load(str(tmp_path / "idf"))
+    assert isinstance(loaded.keys, np.memmap)
+    assert loaded.weights(ids) == pytest.approx(model.weights(ids))
+
+    IdfModel.fit(CORPUS[:2], nlp).save(str(tmp_path / "idf"))
+    assert loaded.weights(ids) == pytest.approx(model.weights(ids))
+    assert IdfModel.load(str(tmp_path / "idf")).documents == 2
+
+def test_fit_merges_counts_across_chunks(monkeypatch):
+    monkeypatch.setattr("app.key_phrases.FIT_CHUNK_DOCS", 1)
+    chunked = IdfModel.fit(CORPUS, nlp)
+    monkeypatch.undo()
+    whole = IdfModel.fit(CORPUS, nlp)
+    assert chunked.keys.tolist() == whole.keys.tolist()
+    assert chunked.idf.tolist() == whole.idf.tolist()
+
+def test_rare_terms_rank_first():
+    doc = parsed("Green tea helps busy people .")
+    # Without a corpus every term weighs 1 and ties keep document order
+    assert rank_key_phrases([doc], IdfModel.empty()) == [["green tea", "busy people"]]
+    assert rank_key_phrases([doc], IdfModel.fit(CORPUS, nlp), num_phrases=1) == [["busy people"]]
+
+def test_batch_scores_match_single_documents():
+    model = IdfModel.fit(CORPUS, nlp)
+    docs = [parsed("Green tea helps busy people ."), parsed("Black tea wakes tired people ."), Doc(nlp.vocab, words=[])]
+    assert rank_key_phrases(docs, model) == [rank_key_phrases([doc], model)[0] for doc in docs]
+
+def test_top_k_is_stable_for_ties():
+    assert top_k(np.array([1.0, 3.0, 3.0, 2.0]), 2).tolist() == [1, 2]
+    assert top_k(np.array([2.0, 2.0, 2.0]), 2).tolist() == [0, 1]
+    assert top_k(np.array([1.0]), 5).tolist() == [0]
+
+def test_optimizer_uses_the_configured_model():
+    optimizer = TextOptimizer(nlp, idf_model=IdfModel.fit(CORPUS, nlp))
+    doc = parsed("Green tea helps busy people .")
+    assert optimizer.extract_key_phrases(doc, num_phrases=1) == ["busy people"]
+    assert optimizer.extract_key_phrases_many([doc, doc], num_phrases=1) == [["busy people"], ["busy people"]]
+
+def test_cli_fit_and_info(tmp_path, capsys):
+    corpus = tmp_path / "corpus.txt"
+    corpus.write_text("\n".join(CORPUS) + "\n\n", encoding="utf-8")
+    assert main(["fit", str(corpus), str(tmp_path / "idf")]) == 0
+    assert "from 4 documents" in capsys.readouterr().out
+    assert main(["info", str(tmp_path / "idf")]) == 0
+
+def test_missing_model_is_rejected(tmp_path):
+    with pytest.raises(InvalidIdfModelError):
+        IdfModel.load(str(tmp_path / "missing"))
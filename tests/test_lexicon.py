@@ -0,0 +1,86 @@
+import os
+import numpy as np
+import pytest
+import spacy
+from app.exceptions import InvalidLexiconError
+from app.processors.lexicon import CompactLexicon, build_lexicon, main, term_id
+from app.processors.sentiment_analyzer import SentimentAnalyzer
+
+nlp = spacy.blank("en")
+
+SOURCE = (
+    "term\tpolarity\tsubjectivity\tintensifier\tnegator\tjoy\ttrust\n"
+    "good\t0.5\t0.6\t\t\t0.2\t\n"
+    "Awful\t-0.8\t0.9\t\t\t\t\n"
+    "reliable\t0.3\t0.2\t\t\t\t0.7\n"
+    "very\t\t\t1.5\t\t\t\n"
+    "not\t\t\t\t-1.0\t\t\n"
+    "# comment\t\t\t\t\t\t\n"
+)
+
+@pytest.fixture
+def lexicon_dir(tmp_path):
+    source = tmp_path / "terms.tsv"
+    source.write_text(SOURCE, encoding="utf-8")
+    path = tmp_path / "lexicon"
+    build_lexicon([str(source)], str(path))
+    return str(path)
+
+def test_build_and_memory_map(lexicon_dir):
+    lexicon = CompactLexicon.load(lexicon_dir)
+    assert isinstance(lexicon.keys, np.memmap) and isinstance(lexicon.scores, np.memmap)
+    assert len(lexicon) == 5
+    assert lexicon.extra_columns == ("joy", "trust")
+    assert "AWFUL" in lexicon and "fine" not in lexicon
+    assert lexicon.get("good") == pytest.approx({"polarity": 0.5, "subjectivity": 0.6, "joy": 0.2})
+    assert lexicon.get("fine") is None
+
+def test_keys_are_token_lower_ids(lexicon_dir):
+    lexicon = CompactLexicon.load(lexicon_dir)
+    doc = nlp("Good and not GOOD")
+    found, rows = lexicon.lookup(np.array([token.lower for token in doc], dtype=np.uint64))
+    assert found.tolist() == [True, False, True, True]
+    assert term_id("Good") == doc[0].lower
+
+def test_later_sources_override_earlier(tmp_path):
+    first, second = tmp_path / "a.csv", tmp_path / "b.csv"
+    first.write_text("term,polarity\ngood,0.5\nbad,-0.5\n", encoding="utf-8")
+    second.write_text("term,polarity\ngood,0.9\n", encoding="utf-8")
+    lexicon = build_lexicon([str(first), str(second)], str(tmp_path / "out"))
+    assert lexicon.get("good") == pytest.approx({"polarity": 0.9})
+    assert lexicon.get("bad") == pytest.approx({"polarity": -0.5})
+
+def test_rebuild_replaces_the_directory_without_touching_mapped_files(lexicon_dir, tmp_path):
+    old = CompactLexicon.load(lexicon_dir)
+    source = tmp_path / "new.csv"
+    source.write_text("term,polarity\nfine,0.4\n", encoding="utf-8")
+    build_lexicon([str(source)], lexicon_dir)
+    # The old mapping still reads the old arrays
+    assert old.get("good") == pytest.approx({"polarity": 0.5, "subjectivity": 0.6, "joy": 0.2})
+    new = CompactLexicon.load(lexicon_dir)
+    assert len(new) == 1 and "fine" in new
+    assert sorted(os.listdir(tmp_path)) == ["lexicon", "new.csv", "terms.tsv"]
+
+def test_invalid_sources_are_rejected(tmp_path):
+    source = tmp_path / "terms.txt"
+    source.write_text("good 1\n", encoding="utf-8")
+    with pytest.raises(InvalidLexiconError):
+        build_lexicon([str(source)], str(tmp_path / "out"))
+    with pytest.raises(InvalidLexiconError):
+        CompactLexicon.load(str(tmp_path / "missing"))
+
+def test_weighted_scores_with_negation_and_intensifiers(lexicon_dir):
+    analyzer = SentimentAnalyzer(nlp, lexicon=CompactLexicon.load(lexicon_dir))
+    assert analyzer.emotions == ("joy", "trust")
+    good = analyzer.analyze_sentiment("good service")
+    assert good.polarity == pytest.approx(0.25)
+    assert good.subjectivity == pytest.approx(0.3)
+    assert good.emotional_tone == pytest.approx({"joy": 0.1, "trust": 0.0})
+    assert analyzer.analyze_sentiment("very good service").polarity == pytest.approx(0.25)
+    assert analyzer.analyze_sentiment("not good service").polarity == pytest.approx(-0.5 / 3)
+    # Negation doesn't reach past punctuation
+    assert analyzer.analyze_sentiment("not , good").polarity == pytest.approx(0.25)
+
+def test_cli_info(lexicon_dir, capsys):
+    assert main(["info", lexicon_dir]) == 0
+    assert "5 terms" in capsys.readouterr().out
@@ -0,0 +1,34 @@
+import spacy
+from app.model_registry import ModelRegistry, get_model_registry, get_nlp
+from app.processors.grammar_enhancement import GrammarEnhancer
+from app.processors.sentiment_analyzer import SentimentAnalyzer
+from app.processors.style_guide import StyleGuideProcessor
+from app.utils import initialize_nlp
+
+def test_get_or_load_returns_same_instance():
+    registry = ModelRegistry()
+    blank = spacy.blank("en")
+    registry.register("blank_en", blank)
+    assert registry.is_loaded("blank_en")
+    assert registry.get("blank_en") is blank
+    assert registry.get("blank_en") is registry.get("blank_en")
+
+def test_memory_footprint():
+    registry = ModelRegistry()
+    registry.register("blank_en", spacy.blank("en"))
+    footprint = registry.memory_footprint("blank_en")
+    assert footprint["loaded"] is True
+    assert footprint["serialized_bytes"] > 0
+    assert footprint["strings"] > 0
+    assert registry.memory_footprint("missing")["loaded"] is False
+
+    report = registry.memory_report()
+    assert [m["model"] for m in report["models"]] == ["blank_en"]
+
+def test_processors_share_one_model():
+    nlp = get_nlp()
+    assert initialize_nlp() is nlp
+    assert GrammarEnhancer().nlp is nlp
+    assert SentimentAnalyzer().nlp is nlp
+    assert StyleGuideProcessor().nlp is nlp
+    assert get_model_registry().loaded_models() == [get_model_registry().default_model]
@@ -0,0 +1,52 @@
+import pytest
+import spacy
+from app.pipeline import (
+    NER, PARSER, SENTS, TAGGER, TOKENIZER,
+    disabled_components, ensure_doc, parse, required_components, requires, token_pattern_components
+)
+from app.processors.sentiment_analyzer import SentimentAnalyzer
+from app.processors.style_guide import StyleGuideProcessor, StyleGuideType
+
+@pytest.fixture
+def nlp():
+    return spacy.load("en_core_web_sm")
+
+def test_requires_declares_components():
+    @requires(TAGGER, PARSER)
+    def check(doc):
+        return doc
+
+    assert check.required_components == frozenset({TAGGER, PARSER})
+    assert required_components(check, SentimentAnalyzer.analyze_sentiment) == frozenset({TOKENIZER, TAGGER, PARSER})
+
+def test_requires_rejects_unknown_component():
+    with pytest.raises(ValueError):
+        requires("coref")
+
+def test_token_pattern_components():
+    assert token_pattern_components([{"LOWER": "be"}]) == frozenset({TOKENIZER})
+    assert token_pattern_components([{"LOWER": "be"}, {"TAG": "VBN"}]) == frozenset({TOKENIZER, TAGGER})
+
+def test_tokenizer_only_disables_everything(nlp):
+    assert disabled_components(nlp, {TOKENIZER}) == nlp.pipe_names
+
+def test_ner_only_disables_parser_and_tagger(nlp):
+    disabled = disabled_components(nlp, {NER})
+    assert "ner" not in disabled
+    assert "parser" in disabled
+    assert "tagger" in disabled
+
+def test_sentence_boundaries_from_parser(nlp):
+    doc = parse("First sentence here. Second one follows.", {SENTS}, nlp)
+    assert len(list(doc.sents)) == 2
+    assert not doc.ents
+
+def test_ensure_doc_keeps_parsed_doc(nlp):
+    doc = nlp("Already parsed.")
+    assert ensure_doc(doc, nlp, {TOKENIZER}) is doc
+
+def test_style_guide_requirements():
+    processor = StyleGuideProcessor()
+    assert processor.required_components(StyleGuideType.BUSINESS) == frozenset({TOKENIZER, TAGGER})
+    assert processor.required_components(StyleGuideType.ACADEMIC) == frozenset({SENTS})
+    assert processor.required_components(StyleGuideType.TECHNICAL) == frozenset({TAGGER})
@@ -0,0 +1,66 @@
+import pytest
+import spacy
+import textstat
+from textstat.backend.counts import _count_syllables
+from app.readability import ReadabilityCounts, count_syllables, readability_metrics, word_features
+
+nlp = spacy.blank("en")
+nlp.add_pipe("sentencizer")
+
+PROSE = (
+    "The implementation of artificial intelligence algorithms requires careful consideration. "
+    "Moreover, the utilization of sophisticated mathematical frameworks enables efficient solutions! "
+    "We don't think it's well-known. Cats sat on the mat, and the dog barked loudly at them. "
+    "Did the committee approve the extraordinarily complicated proposal? Yes it did, eventually."
+)
+
+INDICES = [
+    "flesch_reading_ease", "flesch_kincaid_grade", "gunning_fog", "smog_index",
+    "automated_readability_index", "coleman_liau_index", "linsear_write_formula",
+    "dale_chall_readability_score",
+]
+
+@pytest.fixture
+def textstat_with_pyphen(monkeypatch):
+    """textstat with syllables from pyphen alone, as the engine counts them."""
+    monkeypatch.setattr(_count_syllables, "get_cmudict", lambda lang: {})
+    _count_syllables.count_syllables.cache_clear()
+    yield textstat
+    _count_syllables.count_syllables.cache_clear()
+
+def test_indices_match_textstat(textstat_with_pyphen):
+    metrics = readability_metrics(nlp(PROSE))
+    for name in INDICES:
+        assert metrics[name] == pytest.approx(getattr(textstat_with_pyphen, name)(PROSE), abs=0.01), name
+
+def test_linsear_write_reads_the_first_hundred_words(textstat_with_pyphen):
+    text = " ".join([PROSE] * 6)
+    assert readability_metrics(nlp(text))["linsear_write_formula"] == pytest.approx(
+        textstat_with_pyphen.linsear_write_formula(text), abs=0.01
+    )
+
+def test_counts_words_like_textstat():
+    counts = ReadabilityCounts.from_doc(nlp("We don't think it's well-known . Really?"))
+    # Contractions and hyphenated words are one word; a lone "." isn't a word
+    assert counts.words == 6
+    assert counts.runs == 7
+    # The second sentence is too short to count, but there is always one
+    assert counts.sentences == 1
+    assert counts.characters == len("We don't think it's well-known . Really?".replace(" ", ""))
+
+def test_structural_metrics():
+    metrics = readability_metrics(nlp("Short words here. Considerably longer vocabulary appears."))
+    assert metrics["avg_sentence_length"] == 3.5
+    assert metrics["complex_word_ratio"] == pytest.approx(3 / 7)
+
+def test_word_features_are_memoized():
+    word_features.cache_clear()
+    readability_metrics(nlp("The cat and the Cat and the cat"))
+    assert word_features.cache_info().currsize == 3
+    assert word_features("cat") == (1, 3, True)
+    assert count_syllables("The cat, the hat") == 4
+
+def test_empty_doc():
+    metrics = readability_metrics(nlp(""))
+    assert set(metrics) == set(INDICES) | {"avg_sentence_length", "avg_word_length", "complex_word_ratio"}
+    assert all(value == 0.0 for value in metrics.values())
@@ -0,0 +1,70 @@
+import asyncio
+from app.scheduler import MicroBatcher, split_batch
+
+def test_coalesces_concurrent_submissions():
+    batches = []
+
+    async def run_batch(tasks):
+        batches.append(list(tasks))
+        return [task * 10 for task in tasks]
+
+    async def scenario():
+        batcher = MicroBatcher(run_batch, window=0.01, max_batch_size=100)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        return batcher, results
+
+    batcher, results = asyncio.run(scenario())
+    assert results == [0, 10, 20, 30, 40]
+    assert batches == [[0, 1, 2, 3, 4]]
+    assert batcher.stats()["avg_batch_size"] == 5
+
+def test_max_batch_size_flushes_early():
+    batches = []
+
+    async def run_batch(tasks):
+        batches.append(list(tasks))
+        return list(tasks)
+
+    async def scenario():
+        batcher = MicroBatcher(run_batch, window=10, max_batch_size=2)
+        return await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(i) for i in range(4))), timeout=1
+        )
+
+    assert asyncio.run(scenario()) == [0, 1, 2, 3]
+    assert batches == [[0, 1], [2, 3]]
+
+def test_batch_failure_reaches_every_submitter():
+    async def run_batch(tasks):
+        raise RuntimeError("pool exploded")
+
+    async def scenario():
+        batcher = MicroBatcher(run_batch, window=0.001)
+        return await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+def test_max_batch_weight_flushes_early():
+    batches = []
+
+    async def run_batch(tasks):
+        batches.append(list(tasks))
+        return list(tasks)
+
+    async def scenario():
+        batcher = MicroBatcher(run_batch, window=10, max_batch_size=100, max_batch_weight=10, weight=len)
+        return await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(text) for text in ["aaaaaa", "bbbbbb", "cc", "dddddddddd"])), timeout=1
+        )
+
+    assert asyncio.run(scenario()) == ["aaaaaa", "bbbbbb", "cc", "dddddddddd"]
+    assert batches == [["aaaaaa", "bbbbbb"], ["cc", "dddddddddd"]]
+
+def test_split_batch_balances_weight_and_keeps_order():
+    assert split_batch([1, 1, 1, 1], 2, float) == [[1, 1], [1, 1]]
+    assert split_batch([10, 1, 1], 3, float) == [[10], [1], [1]]
+    assert split_batch([8, 1, 1, 1, 1], 2, float) == [[8], [1, 1, 1, 1]]
+    assert split_batch([1, 2], 8, float) == [[1], [2]]
+    assert split_batch([1, 2, 3], 1, float) == [[1, 2, 3]]
+    assert split_batch([], 4, float) == []
@@ -1,4 +1,6 @@
+import random
 import pytest
+import spacy
 from app.processors.sentiment_analyzer import SentimentAnalyzer, SentimentScore
 
 @pytest.fixture
@@ -48,4 +50,34 @@ def test_sentiment_summary(sentiment_analyzer):
     score = sentiment_analyzer.analyze_sentiment(text)
     summary = sentiment_analyzer.get_sentiment_summary(score)
     assert isinstance(summary, str)
-    assert 'positive' in summary.lower()
\ No newline at end of file
+    assert 'positive' in summary.lower()
+
+def reference_score(analyzer, doc):
+    """The per-token scoring the vectorized pass replaced."""
+    total_words = len([token for token in doc if not token.is_punct])
+    lowered = [token.text.lower() for token in doc]
+    positive = sum(1 for word in lowered if word in analyzer.positive_words)
+    negative = sum(1 for word in lowered if word in analyzer.negative_words)
+    subjective = sum(1 for word in lowered if word in analyzer.positive_words | analyzer.negative_words)
+    distinct = set(lowered)
+    return (
+        (positive - negative) / total_words if total_words else 0.0,
+        subjective / total_words if total_words else 0.0,
+        {
+            emotion: len(distinct & set(words)) / len(distinct) if distinct else 0.0
+            for emotion, words in analyzer.emotion_categories.items()
+        },
+    )
+
+def test_vectorized_scores_match_per_token_scoring():
+    nlp = spacy.blank("en")
+    analyzer = SentimentAnalyzer(nlp)
+    vocabulary = ["Good", "BAD", "great", "poor", "happy", "Happy", "sad", "the", "product", "!", ",", "worried", "  "]
+    rng = random.Random(0)
+    texts = ["", "!!!", "Good good GOOD."] + [
+        " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 30))) for _ in range(200)
+    ]
+    for text in texts:
+        doc = nlp(text)
+        score = analyzer.analyze_sentiment(doc)
+        assert (score.polarity, score.subjectivity, score.emotional_tone) == reference_score(analyzer, doc)
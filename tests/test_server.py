@@ -0,0 +1,134 @@
+import os
+import pytest
+from app import server
+from app.server import PreforkServer, main, parse_args
+
+ENV = ("EXECUTOR_TYPE", "EXECUTOR_WORKERS", "SESSION_STORE_PATH", "WEB_CONCURRENCY")
+
+@pytest.fixture
+def clean_env(monkeypatch):
+    for name in ENV:
+        monkeypatch.delenv(name, raising=False)
+    return monkeypatch
+
+@pytest.fixture
+def started(monkeypatch):
+    """Servers main() would have run, with the environment they saw."""
+    runs = []
+
+    def run(self):
+        session_path = os.environ.get("SESSION_STORE_PATH")
+        runs.append({
+            "workers": self.workers,
+            "env": {name: os.environ.get(name) for name in ENV},
+            "session_dir_exists": session_path is not None and os.path.isdir(os.path.dirname(session_path)),
+        })
+
+    monkeypatch.setattr(PreforkServer, "run", run)
+    monkeypatch.setattr(server.logging, "basicConfig", lambda **kwargs: None)
+    return runs
+
+def test_parse_args_defaults(clean_env):
+    clean_env.setattr(server.os, "cpu_count", lambda: 3)
+    args = parse_args([])
+    assert (args.host, args.port, args.workers, args.log_level) == ("127.0.0.1", 8000, 3, "info")
+
+def test_web_concurrency_sets_the_worker_count(clean_env):
+    clean_env.setenv("WEB_CONCURRENCY", "5")
+    assert parse_args([]).workers == 5
+    assert parse_args(["--workers", "2"]).workers == 2
+
+def test_main_shares_sessions_between_several_workers(clean_env, started):
+    main(["--workers", "4"])
+    [run] = started
+    assert run["workers"] == 4
+    assert run["env"]["EXECUTOR_TYPE"] == "thread"
+    assert run["env"]["EXECUTOR_WORKERS"] == "1"
+    assert run["env"]["SESSION_STORE_PATH"].endswith("sessions.sqlite")
+    assert run["session_dir_exists"]
+    # The temporary session store is removed when the server stops
+    assert not os.path.exists(os.path.dirname(run["env"]["SESSION_STORE_PATH"]))
+
+def test_main_keeps_configured_settings(clean_env, started):
+    clean_env.setenv("EXECUTOR_TYPE", "process")
+    clean_env.setenv("SESSION_STORE_PATH", "/data/sessions.sqlite")
+    main(["--workers", "2"])
+    assert started[0]["env"]["EXECUTOR_TYPE"] == "process"
+    assert started[0]["env"]["SESSION_STORE_PATH"] == "/data/sessions.sqlite"
+
+def test_main_with_one_worker_changes_nothing(clean_env, started):
+    main(["--workers", "1"])
+    assert started[0]["env"] == {name: None for name in ENV}
+
+class FakeProcesses:
+    """Stands in for fork/wait: each spawned worker exits as scripted."""
+
+    def __init__(self, exits):
+        self.exits = list(exits)  # slots whose worker exits next, in order
+        self.next_pid = 100
+        self.spawned = []
+
+    def spawn(self, server, slot):
+        self.next_pid += 1
+        server.children[self.next_pid] = slot
+        self.spawned.append(slot)
+
+    def wait(self, server):
+        if not self.exits:
+            raise ChildProcessError
+        slot, stop = self.exits.pop(0)
+        if stop:
+            server._stopping = True
+        pid = next(pid for pid, child_slot in server.children.items() if child_slot == slot)
+        return pid, 256
+
+class FakeSocket:
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+@pytest.fixture
+def supervised(monkeypatch):
+    """A PreforkServer whose run() loop forks and waits on FakeProcesses."""
+    monkeypatch.setattr(server, "bind_socket", lambda host, port: FakeSocket())
+    monkeypatch.setattr(server, "preload", lambda: None)
+    monkeypatch.setattr(server.signal, "signal", lambda signum, handler: None)
+    monkeypatch.setattr(server.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(server.os, "fork", lambda: pytest.fail("forked a real process"))
+
+    def start(exits, workers=2):
+        prefork = PreforkServer("127.0.0.1", 0, workers)
+        processes = FakeProcesses(exits)
+        monkeypatch.setattr(prefork, "spawn", lambda slot: processes.spawn(prefork, slot))
+        monkeypatch.setattr(server.os, "wait", lambda: processes.wait(prefork))
+        prefork.run()
+        return prefork, processes
+
+    return start
+
+def test_crashed_worker_is_restarted_in_its_slot(supervised):
+    prefork, processes = supervised([(1, False), (0, True), (1, False)])
+    assert processes.spawned == [0, 1, 1]
+    assert prefork.children == {}
+    assert prefork._sock.closed
+
+def test_workers_are_not_restarted_while_stopping(supervised):
+    prefork, processes = supervised([(0, True), (1, False)])
+    assert processes.spawned == [0, 1]
+    assert prefork.children == {}
+
+def test_stop_signals_every_worker(monkeypatch):
+    killed = []
+    monkeypatch.setattr(server.os, "kill", lambda pid, signum: killed.append((pid, signum)))
+    prefork = PreforkServer("127.0.0.1", 0, 2)
+    prefork.children = {11: 0, 12: 1}
+    prefork.stop(server.signal.SIGTERM, None)
+    assert prefork._stopping
+    assert killed == [(11, server.signal.SIGTERM), (12, server.signal.SIGTERM)]
+
+def test_spawn_records_the_forked_worker(monkeypatch):
+    monkeypatch.setattr(server.os, "fork", lambda: 42)
+    prefork = PreforkServer("127.0.0.1", 0, 1)
+    prefork.spawn(0)
+    assert prefork.children == {42: 0}
@@ -0,0 +1,185 @@
+import pytest
+from spacy.language import Language
+from app.exceptions import InvalidEditError, SessionConflictError, SessionNotFoundError
+from app.models import ChunkSentiment, ChunkStats, StreamChunk, StyleIssue, TextEdit
+from app.sessions import (
+    DocumentSession, ParagraphAnalysis, SessionManager, SharedSessionManager, apply_edits, resolve_edit,
+    split_paragraphs
+)
+
+def fake_analysis(paragraph):
+    """Flag every occurrence of the word 'bad' as a style issue."""
+    issues = []
+    position = paragraph.find("bad")
+    while position != -1:
+        issues.append(StyleIssue(
+            rule_name="no_bad", description="", text="bad", suggestion="good",
+            start=position, end=position + 3, severity=1
+        ))
+        position = paragraph.find("bad", position + 1)
+    chunk = StreamChunk(
+        index=0, start=0, end=len(paragraph), grammar_issues=[], style_issues=issues,
+        sentiment=ChunkSentiment(polarity=0.0, subjectivity=0.0, objectivity=1.0, emotional_tone={"joy": 0.0}),
+        stats=ChunkStats(words=len(paragraph.split()), tokens=len(paragraph.split()), sentences=1, syllables=1)
+    )
+    # Capitalized words stand in for the nouns of the terminology check
+    terms = tuple((word, paragraph.index(word)) for word in paragraph.rstrip(".").split() if word[0].isupper())
+    return ParagraphAnalysis(chunk, terms)
+
+def revise(session, text):
+    paragraphs = session.pending(text)
+    return session.revise(text, {p: fake_analysis(p) for p in paragraphs}, session.version)
+
+DOCUMENT = "\n\n".join(f"Paragraph {i} is bad." for i in range(20))
+
+def test_split_paragraphs():
+    assert split_paragraphs("One.\n\n  \nTwo.\n\n") == [(0, 4), (9, 13)]
+
+def test_apply_edits_is_relative_to_current_version():
+    assert apply_edits("hello world", [TextEdit(start=6, end=11, text="there"), TextEdit(start=0, end=0, text=">")]) == ">hello there"
+    with pytest.raises(InvalidEditError):
+        apply_edits("hello", [TextEdit(start=0, end=3, text=""), TextEdit(start=2, end=4, text="")])
+    with pytest.raises(InvalidEditError):
+        apply_edits("hello", [TextEdit(start=3, end=9, text="")])
+    with pytest.raises(InvalidEditError):
+        resolve_edit("hello", None, None)
+
+def test_initial_revision_reports_all_issues():
+    session = DocumentSession("s")
+    delta = revise(session, DOCUMENT)
+    assert delta.version == 1
+    assert delta.reanalyzed_paragraphs == 20
+    assert len(delta.added) == delta.metrics.style_issue_count == 20
+    for issue in delta.added:
+        assert DOCUMENT[issue.start:issue.end] == "bad"
+
+def test_one_word_edit_reanalyzes_one_paragraph():
+    session = DocumentSession("s")
+    revise(session, DOCUMENT)
+    position = DOCUMENT.index("Paragraph 3 is bad") + len("Paragraph 3 is ")
+    text = apply_edits(DOCUMENT, [TextEdit(start=position, end=position + 3, text="fine")])
+    delta = revise(session, text)
+    assert delta.reanalyzed_paragraphs == 1
+    assert delta.reused_paragraphs == 19
+    assert len(delta.removed) == 1 and delta.added == []
+    # Issues after the edit shift by one character
+    assert len(delta.moved) == 16
+    for move in delta.moved:
+        assert text[move.start:move.end] == "bad"
+    assert delta.metrics_delta["style_issue_count"] == -1
+
+def test_stale_revision_conflicts():
+    session = DocumentSession("s")
+    revise(session, "One bad.")
+    with pytest.raises(SessionConflictError):
+        session.revise("Two.", {"Two.": fake_analysis("Two.")}, 0)
+
+def test_changed_style_guide_reanalyzes_everything():
+    session = DocumentSession("s")
+    paragraphs = session.pending(DOCUMENT, "v1")
+    session.revise(DOCUMENT, {p: fake_analysis(p) for p in paragraphs}, 0, "v1")
+    assert session.pending(DOCUMENT, "v1") == []
+    paragraphs = session.pending(DOCUMENT, "v2")
+    assert len(paragraphs) == 20
+    delta = session.revise(DOCUMENT, {p: fake_analysis(p) for p in paragraphs}, 1, "v2")
+    assert delta.reused_paragraphs == 0
+
+def test_terminology_is_checked_across_paragraphs():
+    session = DocumentSession("s")
+    text = "Uses Server.\n\nAlso uses SERVER."
+    delta = revise(session, text)
+    assert [(issue.type, issue.text) for issue in delta.added] == [("inconsistent_terminology", "SERVER")]
+    assert delta.metrics.style_issue_count == 1
+
+    # Editing the first paragraph changes the verdict on the reused second one
+    position = text.index("Server")
+    delta = revise(session, apply_edits(text, [TextEdit(start=position, end=position + 6, text="SERVER")]))
+    assert delta.reanalyzed_paragraphs == 1 and delta.reused_paragraphs == 1
+    assert delta.removed and not delta.added
+    assert delta.metrics.style_issue_count == 0
+
+def test_session_manager_expires_and_evicts():
+    now = [0.0]
+    manager = SessionManager(max_sessions=2, ttl=10, clock=lambda: now[0])
+    first = manager.create()
+    manager.create()
+    manager.create()
+    with pytest.raises(SessionNotFoundError):
+        manager.get(first.id)
+    assert manager.stats()["evictions"] == 1
+    session = manager.create()
+    now[0] = 11
+    with pytest.raises(SessionNotFoundError):
+        manager.get(session.id)
+
+def test_shared_sessions_are_visible_to_every_worker(tmp_path):
+    path = str(tmp_path / "sessions.sqlite")
+    first, second = SharedSessionManager(path, 10, 60), SharedSessionManager(path, 10, 60)
+    session = first.create("technical")
+    revise(session, DOCUMENT)
+    first.save(session, 0)
+
+    loaded = second.get(session.id)
+    assert loaded.state() == session.state()
+    assert loaded.pending(DOCUMENT) == []
+    position = DOCUMENT.index("bad")
+    delta = revise(loaded, apply_edits(DOCUMENT, [TextEdit(start=position, end=position + 3, text="fine")]))
+    assert delta.reanalyzed_paragraphs == 1
+    second.save(loaded, 1)
+
+    # A revision based on the version another worker already replaced is rejected
+    stale = first.get(session.id)
+    stale.version = 1
+    with pytest.raises(SessionConflictError):
+        first.save(stale, 1)
+    first.delete(session.id)
+    with pytest.raises(SessionNotFoundError):
+        second.get(session.id)
+
+def test_shared_sessions_expire_and_evict(tmp_path):
+    now = [0.0]
+    manager = SharedSessionManager(str(tmp_path / "sessions.sqlite"), 2, 10, clock=lambda: now[0])
+    first = manager.create()
+    now[0] = 1
+    manager.create()
+    now[0] = 2
+    manager.create()
+    with pytest.raises(SessionNotFoundError):
+        manager.get(first.id)
+    assert manager.stats()["sessions"] == 2
+    session = manager.create()
+    now[0] = 20
+    with pytest.raises(SessionNotFoundError):
+        manager.get(session.id)
+
+def test_session_api_reuses_paragraphs(client, monkeypatch):
+    piped = []
+    original_pipe = Language.pipe
+
+    def counting_pipe(self, texts, **kwargs):
+        texts = list(texts)
+        piped.append(len(texts))
+        return original_pipe(self, texts, **kwargs)
+
+    monkeypatch.setattr(Language, "pipe", counting_pipe)
+    text = "\n\n".join(f"I think paragraph {i} is fine." for i in range(20))
+    created = client.post("/sessions", json={"text": text, "style_guide": "academic"}).json()
+    session_id = created["session_id"]
+    assert created["reanalyzed_paragraphs"] == 20
+
+    position = text.index("paragraph 5") + len("paragraph ")
+    response = client.post(
+        f"/sessions/{session_id}/edits",
+        json={"edits": [{"start": position, "end": position + 1, "text": "five"}], "base_version": 1}
+    )
+    assert response.status_code == 200
+    delta = response.json()
+    assert delta["reanalyzed_paragraphs"] == 1
+    assert piped[-1] == 1
+
+    stale = client.post(f"/sessions/{session_id}/edits", json={"text": "New.", "base_version": 1})
+    assert stale.status_code == 409
+    state = client.get(f"/sessions/{session_id}").json()
+    assert state["version"] == 2
+    assert client.delete(f"/sessions/{session_id}").status_code == 204
+    assert client.get(f"/sessions/{session_id}").status_code == 404
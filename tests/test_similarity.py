@@ -0,0 +1,74 @@
+import warnings
+import numpy as np
+import pytest
+import spacy
+from app.doc_store import doc_from_bytes, doc_to_bytes
+from app.similarity import (
+    HASHED, TENSOR, VECTORS, coherence, embedding_source, off_topic, sentence_embeddings, similarity_matrix
+)
+from app.text_processor import TextOptimizer
+
+TEXT = "Cats chase mice. Cats sleep all day. Mice fear cats. Stock markets fell sharply."
+
+def blank():
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    return nlp
+
+def loop_coherence(doc):
+    """Adjacent-sentence similarity the way spaCy computes it, one pair at a time."""
+    sentences = list(doc.sents)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return np.mean([a.similarity(b) for a, b in zip(sentences, sentences[1:])])
+
+def test_hashed_fallback_without_a_model():
+    doc = blank()(TEXT)
+    assert embedding_source(doc) == HASHED
+    embeddings = sentence_embeddings(doc, hash_dim=4096)
+    assert embeddings.shape == (4, 4096)
+    matrix = similarity_matrix(embeddings)
+    assert matrix[0, 1] > 0 and matrix[0, 3] == 0
+    assert np.diag(matrix) == pytest.approx(1.0)
+
+def test_tensor_matches_span_similarity():
+    doc = blank()(TEXT)
+    doc.tensor = np.random.default_rng(0).normal(size=(len(doc), 8)).astype(np.float32)
+    assert embedding_source(doc) == TENSOR
+    assert embedding_source(doc, HASHED) == HASHED
+    assert coherence(sentence_embeddings(doc)) == pytest.approx(loop_coherence(doc), abs=1e-5)
+
+def test_stored_doc_keeps_tensor_embeddings():
+    doc = blank()(TEXT)
+    doc.tensor = np.random.default_rng(0).normal(size=(len(doc), 8)).astype(np.float32)
+    restored = doc_from_bytes(doc_to_bytes(doc), doc.vocab)
+    assert embedding_source(restored) == TENSOR
+    assert np.array_equal(sentence_embeddings(restored), sentence_embeddings(doc))
+
+def test_vectors_match_span_similarity():
+    nlp = blank()
+    rng = np.random.default_rng(1)
+    for word in ["Cats", "chase", "mice", "sleep", "Mice", "cats", "fear"]:
+        nlp.vocab.set_vector(word, rng.normal(size=6).astype(np.float32))
+    doc = nlp(TEXT)
+    assert embedding_source(doc) == VECTORS
+    assert coherence(sentence_embeddings(doc)) == pytest.approx(loop_coherence(doc), abs=1e-5)
+
+def test_unknown_source_is_rejected():
+    with pytest.raises(ValueError):
+        embedding_source(blank()("Hi."), "bert")
+
+def test_coherence_of_short_and_empty_texts():
+    nlp = blank()
+    assert coherence(sentence_embeddings(nlp("One sentence only."))) == 1.0
+    assert coherence(sentence_embeddings(nlp(""))) == 1.0
+
+def test_off_topic_sentences():
+    optimizer = TextOptimizer(blank())
+    found = optimizer.find_off_topic_sentences(TEXT)
+    assert [item["text"] for item in found] == ["Stock markets fell sharply."]
+    assert found[0]["start"] == TEXT.index("Stock")
+    assert off_topic(np.eye(2), 0.5) == []
+    assert optimizer._calculate_coherence_score(optimizer.nlp(TEXT)) == pytest.approx(
+        coherence(sentence_embeddings(optimizer.nlp(TEXT)))
+    )
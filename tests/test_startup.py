@@ -0,0 +1,36 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from app.assets import IMPORT_TIME_BUDGET_SECONDS, measure_import_time
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Heavy modules that must only be imported on first use
+DEFERRED_MODULES = ["sklearn", "nltk", "textstat"]
+
+
+def import_app_in_subprocess():
+    code = (
+        "import json, sys; import app.main; "
+        "from app.model_registry import get_model_registry; "
+        f"print(json.dumps({{'modules': [m for m in {DEFERRED_MODULES!r} if m in sys.modules], "
+        "'models': get_model_registry().loaded_models()}))"
+    )
+    env = dict(os.environ, EXECUTOR_TYPE="thread")
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=ROOT, env=env
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_import_defers_heavy_modules_and_models():
+    result = import_app_in_subprocess()
+    assert result["modules"] == []
+    assert result["models"] == []
+
+
+def test_import_time_within_budget():
+    assert measure_import_time("app.main") <= IMPORT_TIME_BUDGET_SECONDS
@@ -0,0 +1,78 @@
+import json
+from app.streaming import StreamAggregator, count_syllables, iter_windows, split_sentences
+from app.models import ChunkSentiment, ChunkStats, StreamChunk
+
+TEXT = " ".join(f"Sentence {i} is short." for i in range(50))
+
+def test_split_sentences_covers_text():
+    spans = list(split_sentences(TEXT, 1000))
+    assert len(spans) == 50
+    assert spans[0][0] == 0 and spans[-1][1] == len(TEXT)
+    assert all(a[1] == b[0] for a, b in zip(spans, spans[1:]))
+
+def test_long_sentence_is_split():
+    text = "word " * 500
+    spans = list(split_sentences(text, 100))
+    assert all(end - start <= 100 for start, end in spans)
+    assert "".join(text[start:end] for start, end in spans) == text
+
+def test_windows_own_disjoint_regions_with_overlap():
+    windows = list(iter_windows(TEXT, 100, 1))
+    assert len(windows) > 1
+    assert windows[0].start == windows[0].own_start == 0
+    assert windows[-1].end == len(TEXT)
+    for previous, window in zip(windows, windows[1:]):
+        assert window.own_start == previous.end
+        assert window.start < window.own_start  # one sentence of context
+    assert sum(window.sentences for window in windows) == 50
+
+def test_windows_without_overlap():
+    windows = list(iter_windows(TEXT, 100, 0))
+    assert all(window.start == window.own_start for window in windows)
+
+def test_count_syllables():
+    assert count_syllables("the") == 1
+    assert count_syllables("reading is wonderful") > 3
+
+def make_chunk(index, polarity, tokens):
+    return StreamChunk(
+        index=index,
+        start=index * 10,
+        end=index * 10 + 10,
+        grammar_issues=[],
+        sentiment=ChunkSentiment(
+            polarity=polarity,
+            subjectivity=abs(polarity),
+            objectivity=1 - abs(polarity),
+            emotional_tone={"joy": 0.0, "sadness": 0.0, "anger": 0.0, "fear": 0.0, "surprise": 0.0}
+        ),
+        stats=ChunkStats(words=tokens, tokens=tokens, sentences=1, syllables=tokens)
+    )
+
+def test_aggregator_weights_by_tokens():
+    aggregator = StreamAggregator()
+    aggregator.add(make_chunk(0, 0.5, 10))
+    aggregator.add(make_chunk(1, -0.1, 30))
+    summary = aggregator.summary()
+    assert summary.chunks == 2
+    assert summary.length == 20
+    assert abs(summary.sentiment.polarity - (0.5 * 10 - 0.1 * 30) / 40) < 1e-9
+    assert summary.readability.words == 40
+    assert summary.compliance_score is None
+
+def test_stream_endpoint_offsets(client):
+    text = " ".join(f"I think sentence {i} isn't long." for i in range(200))
+    response = client.post(
+        "/analyze/stream",
+        json={"text": text, "style_guide": "academic", "window_chars": 500}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    chunks, summary = lines[:-1], lines[-1]
+    assert summary["type"] == "summary"
+    assert summary["chunks"] == len(chunks) > 1
+    issues = [issue for chunk in chunks for issue in chunk["style_issues"]]
+    assert len(issues) == summary["style_issue_count"] == 400
+    for issue in issues:
+        assert text[issue["start"]:issue["end"]] == issue["text"]
@@ -0,0 +1,132 @@
+import json
+import os
+import pytest
+from app.exceptions import InvalidStyleGuideError, UnknownStyleGuideError
+from app.processors.style_library import StyleGuideLibrary, StyleGuideSpec, keywords_pattern, rule_from_dict
+from app.processors.style_matcher import StyleRule, keyword_alternatives
+
+BUILTIN = StyleGuideSpec("business", (StyleRule("jargon", "", r"\b(synergy)\b", "", 2),))
+
+ACME_YAML = """
+description: House style
+rules:
+  - name: jargon
+    keywords: [synergy, paradigm shift]
+    severity: 2
+  - name: future
+    pattern: '\\b(will|shall)\\s+\\w+\\b'
+"""
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def write(path, content, mtime):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.utime(path, ns=(mtime, mtime))
+
+def test_keywords_compile_to_the_keyword_trie():
+    assert keyword_alternatives(keywords_pattern(["synergy", "paradigm shift"])) == ["synergy", "paradigm shift"]
+    assert keyword_alternatives(keywords_pattern(["C++"])) is None
+
+def test_rule_needs_exactly_one_form():
+    with pytest.raises(InvalidStyleGuideError):
+        rule_from_dict({"name": "empty"})
+    with pytest.raises(InvalidStyleGuideError):
+        rule_from_dict({"name": "both", "pattern": "a", "keywords": ["b"]})
+    with pytest.raises(InvalidStyleGuideError):
+        rule_from_dict({"name": "bad", "pattern": "("})
+
+def test_loads_yaml_and_json_guides(tmp_path):
+    write(tmp_path / "acme.yaml", ACME_YAML, 1)
+    write(tmp_path / "other.json", json.dumps({"name": "globex", "rules": [{"name": "x", "keywords": ["foo"]}]}), 1)
+    library = StyleGuideLibrary([BUILTIN], str(tmp_path))
+    assert library.names() == ["acme", "business", "globex"]
+    acme = library.get("acme")
+    assert acme.spec.description == "House style"
+    matches = acme.compiled.match_text("Synergy will help.")
+    assert [(acme.compiled.rules[i].name, s, e) for i, s, e in sorted(matches)] == [
+        ("jargon", 0, 7), ("future", 8, 17)
+    ]
+    with pytest.raises(UnknownStyleGuideError):
+        library.get("missing")
+
+def test_listing_reports_rule_counts(tmp_path):
+    write(tmp_path / "acme.yaml", ACME_YAML, 1)
+    listing = StyleGuideLibrary([BUILTIN], str(tmp_path)).listing()
+    guides = {guide["name"]: guide for guide in listing["guides"]}
+    assert guides["acme"]["rule_count"] == 2
+    assert guides["business"]["source"] == "builtin"
+    assert guides["acme"]["compile_ms"] >= 0
+    assert listing["errors"] == {}
+
+def test_reloads_changed_files_after_poll_interval(tmp_path):
+    clock = FakeClock()
+    path = tmp_path / "acme.yaml"
+    write(path, ACME_YAML, 1)
+    library = StyleGuideLibrary([BUILTIN], str(tmp_path), poll_interval=2.0, clock=clock)
+    before = library.get("acme")
+    builtin = library.get("business")
+
+    write(path, ACME_YAML.replace("paradigm shift", "leverage"), 2)
+    assert library.get("acme") is before  # not polled yet
+    clock.now = 3.0
+    assert library.get("acme") is before  # the reload runs in the background
+    library.wait_for_reload()
+    after = library.get("acme")
+    assert after.content_hash != before.content_hash
+    assert library.reloads == 1
+    # Unchanged guides keep their compiled matchers
+    assert library.get("business").compiled is builtin.compiled
+
+def test_file_overrides_builtin_and_removal_restores_it(tmp_path):
+    clock = FakeClock()
+    path = tmp_path / "business.json"
+    write(path, json.dumps({"rules": [{"name": "x", "keywords": ["foo"]}]}), 1)
+    library = StyleGuideLibrary([BUILTIN], str(tmp_path), clock=clock)
+    assert library.get("business").spec.source == str(path)
+    os.remove(path)
+    clock.now = 10.0
+    assert library.refresh()
+    assert library.get("business").spec.source == "builtin"
+
+def test_broken_file_keeps_previous_version(tmp_path):
+    clock = FakeClock()
+    path = tmp_path / "acme.yaml"
+    write(path, ACME_YAML, 1)
+    library = StyleGuideLibrary([BUILTIN], str(tmp_path), clock=clock)
+    before = library.get("acme")
+    write(path, "rules: [{name: broken}]", 2)
+    clock.now = 10.0
+    library.refresh()
+    assert library.get("acme") is before
+    assert str(path) in library.listing()["errors"]
+
+def test_invalid_token_pattern_is_rejected_on_load(tmp_path):
+    clock = FakeClock()
+    path = tmp_path / "acme.yaml"
+    write(path, ACME_YAML, 1)
+    library = StyleGuideLibrary([BUILTIN], str(tmp_path), clock=clock)
+    before = library.get("acme")
+    write(path, ACME_YAML + "  - name: bad\n    token_pattern: [{NOTANATTR: foo}]\n", 2)
+    clock.now = 10.0
+    library.refresh()
+    assert library.get("acme") is before
+    assert "NOTANATTR" in library.listing()["errors"][str(path)]
+
+def test_identical_content_is_compiled_once(tmp_path):
+    clock = FakeClock()
+    path = tmp_path / "acme.yaml"
+    write(path, ACME_YAML, 1)
+    library = StyleGuideLibrary([BUILTIN], str(tmp_path), clock=clock)
+    before = library.get("acme")
+    write(path, ACME_YAML + "\n# comment only\n", 2)
+    clock.now = 10.0
+    library.refresh()
+    after = library.get("acme")
+    assert library.reloads == 1
+    assert after.compiled is before.compiled
@@ -0,0 +1,75 @@
+import re
+import spacy
+from app.pipeline import TOKENIZER
+from app.processors.style_guide import CompiledStyleGuide, StyleGuideProcessor, StyleGuideType, StyleRule
+from app.processors.style_library import StyleGuideLibrary, StyleGuideSpec
+from app.processors.style_matcher import keyword_alternatives
+
+nlp = spacy.blank("en")
+
+RULES = [
+    StyleRule("first_person", "", r"\b(I|me|my|we)\b", "", 2),
+    StyleRule("certainty", "", r"\b(of|of course|everyone knows)\b", "", 3),
+    StyleRule("contractions", "", r"\b\w+'\w+\b", "", 1),
+    StyleRule("future", "", r"\b(will|shall)\s+\w+\b", "", 1),
+    StyleRule("repeated", "", r"\b(\w+) \1\b", "", 1),
+]
+
+def finditer_violations(rules, text):
+    return [
+        (rule.name, m.start(), m.end())
+        for rule in rules
+        for m in re.finditer(rule.pattern, text, re.IGNORECASE)
+    ]
+
+def test_keyword_alternatives():
+    assert keyword_alternatives(r"\b(clearly|of course)\b") == ["clearly", "of course"]
+    assert keyword_alternatives(r"\b(will|shall)\s+\w+\b") is None
+    assert keyword_alternatives(r"\b\w+'\w+\b") is None
+
+def test_matches_per_rule_finditer():
+    guide = CompiledStyleGuide(RULES)
+    texts = [
+        "I'm sure we will see it. Of course everyone knows that that is true.",
+        "Of  course, my my plans shall work; of course they will.",
+        "",
+    ]
+    for text in texts:
+        got = [(v.rule_name, v.start, v.end) for v in guide.match(nlp(text))]
+        assert got == finditer_violations(RULES, text)
+
+def test_builtin_guides_match_per_rule_finditer():
+    processor = StyleGuideProcessor(nlp)
+    text = "Obviously I think it's clear that we will leverage this Synergy. It shall be so."
+    for rules in processor.style_guides.values():
+        regex_rules = [rule for rule in rules if not rule.token_pattern]
+        got = [(v.rule_name, v.start, v.end) for v in CompiledStyleGuide(regex_rules).match(nlp(text))]
+        assert got == finditer_violations(regex_rules, text)
+
+def test_token_pattern_rule():
+    rule = StyleRule("be_word", "", None, "", 1, token_pattern=[{"LOWER": "was"}, {"IS_ALPHA": True}])
+    guide = CompiledStyleGuide([rule])
+    violations = guide.match(nlp("The report was written today."))
+    assert [(v.text, v.start) for v in violations] == [("was written", 11)]
+    assert guide.required_components == frozenset({TOKENIZER})
+
+class UnusedPipeline:
+    """Stands in for the model where no parse may happen."""
+    def __call__(self, *args, **kwargs):
+        raise AssertionError("text was parsed")
+    pipe = __call__
+
+def test_lexical_guides_skip_the_parse():
+    processor = StyleGuideProcessor(UnusedPipeline())
+    violations = processor.check_style("It was really very good.", StyleGuideType.CREATIVE)
+    assert [v.text for v in violations] == ["really", "very"]
+    processor.library = StyleGuideLibrary([StyleGuideSpec("lexical", tuple(RULES))])
+    assert not processor.needs_doc("lexical")
+    violations = processor.check_style("Of course I will go.", "lexical")
+    assert [v.rule_name for v in violations] == ["first_person", "certainty", "future"]
+
+def test_linguistic_guides_parse_with_required_components():
+    processor = StyleGuideProcessor(nlp)
+    assert processor.needs_doc(StyleGuideType.ACADEMIC)
+    assert processor.needs_doc(StyleGuideType.BUSINESS)
+    assert not processor.needs_doc(StyleGuideType.CREATIVE)
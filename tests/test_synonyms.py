@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+import spacy
+from spacy.tokens import Doc
+from app.exceptions import InvalidSynonymIndexError
+from app.synonyms import SynonymIndex, main, rank_synonyms
+from app.text_processor import TextOptimizer
+
+nlp = spacy.blank("en")
+
+ENTRIES = [
+    (("quick", "a"), ["fast", "speedy"]),
+    (("dog", "n"), ["hound", "canine"]),
+    (("run", "v"), ["sprint"]),
+    (("run", "n"), ["streak", "outing"]),
+    (("café", "n"), ["bistro"]),
+]
+
+def tagged(words, pos, lemmas=None, ents=None):
+    # No space before punctuation or after the last word
+    spaces = [not following in (".", None) for following in words[1:] + [None]]
+    return Doc(nlp.vocab, words=words, spaces=spaces, pos=pos,
+               lemmas=lemmas or [word.lower() for word in words], ents=ents)
+
+class FakeLemma:
+    def __init__(self, name, count):
+        self._name, self._count = name, count
+
+    def name(self):
+        return self._name
+
+    def count(self):
+        return self._count
+
+class FakeSynset:
+    def __init__(self, *lemmas):
+        self._lemmas = lemmas
+
+    def lemmas(self):
+        return self._lemmas
+
+class FakeWordNet:
+    def synsets(self, lemma, pos=None):
+        return [
+            FakeSynset(FakeLemma("quick", 5), FakeLemma("fast", 1), FakeLemma("speedy", 0)),
+            FakeSynset(FakeLemma("quick", 1), FakeLemma("speedy", 1), FakeLemma("rapid_fire", 9)),
+        ]
+
+def test_ranking_prefers_common_senses():
+    # fast: (1 + 1) / 1 = 2; speedy: (0 + 1) / 1 + (1 + 1) / 2 = 2, then alphabetical
+    assert rank_synonyms(FakeWordNet(), "Quick", "a") == ("fast", "speedy")
+    assert rank_synonyms(FakeWordNet(), "quick", "a", limit=1) == ("fast",)
+
+def test_lookup_by_lemma_and_pos(tmp_path):
+    SynonymIndex.from_entries(ENTRIES).save(str(tmp_path / "index"))
+    index = SynonymIndex.load(str(tmp_path / "index"))
+    assert isinstance(index.keys, np.memmap)
+    assert len(index) == 5
+    assert index.lookup("run", "v") == ("sprint",)
+    assert index.lookup("Run", "n") == ("streak", "outing")
+    assert index.lookup("run", "a") == ()
+    assert index.lookup("café", "n") == ("bistro",)
+
+    SynonymIndex.from_entries(ENTRIES[:1]).save(str(tmp_path / "index"))
+    assert index.lookup("run", "v") == ("sprint",)
+    assert len(SynonymIndex.load(str(tmp_path / "index"))) == 1
+
+def test_empty_index():
+    assert SynonymIndex.from_entries([]).lookup("dog", "n") == ()
+
+def test_get_synonyms_uses_pos_from_parsed_context():
+    optimizer = TextOptimizer(nlp, synonym_index=SynonymIndex.from_entries(ENTRIES))
+    context = tagged(["We", "run", "daily"], ["PRON", "VERB", "ADV"])
+    assert optimizer.get_synonyms("run", context) == ["sprint"]
+    assert optimizer.get_synonyms("run", pos="NOUN") == ["streak", "outing"]
+    # Without a POS, every part of speech is merged
+    assert optimizer.get_synonyms("run") == ["streak", "outing", "sprint"]
+    assert optimizer.get_synonyms("run", pos="PRON") == []
+
+def test_replacements_need_one_cached_lookup_per_content_token():
+    optimizer = TextOptimizer(nlp, synonym_index=SynonymIndex.from_entries(ENTRIES))
+    doc = tagged(
+        ["The", "Quick", "dogs", "and", "the", "quick", "dog", "run", "."],
+        ["DET", "ADJ", "NOUN", "CCONJ", "DET", "ADJ", "NOUN", "VERB", "PUNCT"],
+        lemmas=["the", "quick", "dog", "and", "the", "quick", "dog", "run", "."],
+    )
+    # Inflected forms such as "dogs" are left alone
+    assert optimizer.replace_with_synonyms(doc) == "The Fast dogs and the fast hound sprint."
+    info = optimizer.synonyms.cache_info()
+    assert (info.hits, info.misses) == (1, 3)
+    assert optimizer.replace_with_synonyms(doc[4:7]) == "the fast hound"
+
+def test_named_entities_are_not_replaced():
+    optimizer = TextOptimizer(nlp, synonym_index=SynonymIndex.from_entries(ENTRIES))
+    doc = tagged(["Quick", "runs"], ["PROPN", "VERB"], lemmas=["quick", "run"], ents=["B-ORG", "O"])
+    assert optimizer.synonym_replacements(doc) == {}
+
+def test_named_entities_survive_parsing_a_string():
+    ruled = spacy.blank("en")
+    ruled.add_pipe("attribute_ruler").add_patterns([
+        {"patterns": [[{"LOWER": "quick"}]], "attrs": {"POS": "ADJ"}},
+        {"patterns": [[{"LOWER": "dog"}]], "attrs": {"POS": "NOUN"}},
+        {"patterns": [[{"LOWER": "run"}]], "attrs": {"POS": "VERB"}},
+    ])
+    ruled.add_pipe("entity_ruler").add_patterns([{"label": "ORG", "pattern": "Quick Dog"}])
+    optimizer = TextOptimizer(ruled, synonym_index=SynonymIndex.from_entries(ENTRIES))
+    assert optimizer.replace_with_synonyms("Quick Dog will run the quick dog") == (
+        "Quick Dog will sprint the fast hound"
+    )
+
+def test_structure_optimization_writes_replacements():
+    optimizer = TextOptimizer(nlp)
+    doc = tagged(["The", "quick", "dog"], ["DET", "ADJ", "NOUN"])
+    assert optimizer.optimize_sentence_structure(doc[:], {1: "fast"}) == "The fast dog"
+
+def test_cli_info(tmp_path, capsys):
+    SynonymIndex.from_entries(ENTRIES).save(str(tmp_path / "index"))
+    assert main(["info", str(tmp_path / "index")]) == 0
+    assert "5 entries, 8 words" in capsys.readouterr().out
+
+def test_missing_index_is_rejected(tmp_path):
+    with pytest.raises(InvalidSynonymIndexError):
+        SynonymIndex.load(str(tmp_path / "missing"))
@@ -0,0 +1,44 @@
+import random
+from app.processors.text_edits import EditOp, OffsetMap, apply_edits, resolve_conflicts
+
+def test_higher_priority_and_narrower_edits_win():
+    edits = [EditOp(0, 10, "x", priority=0), EditOp(2, 4, "y", priority=1), EditOp(3, 8, "z", priority=1)]
+    accepted, rejected = resolve_conflicts(edits)
+    assert accepted == [EditOp(2, 4, "y", priority=1)]
+    assert len(rejected) == 2
+
+def test_insertions_conflict_only_at_the_same_point_or_inside_a_replacement():
+    accepted, rejected = resolve_conflicts([
+        EditOp(5, 5, "a"), EditOp(5, 5, "b"), EditOp(5, 8, "c", priority=1), EditOp(8, 8, "d"), EditOp(6, 6, "e")
+    ])
+    assert accepted == [EditOp(5, 5, "a"), EditOp(5, 8, "c", priority=1), EditOp(8, 8, "d")]
+    assert sorted(edit.replacement for edit in rejected) == ["b", "e"]
+
+def test_apply_matches_sequential_slicing():
+    rng = random.Random(0)
+    for _ in range(500):
+        text = "".join(rng.choice("ab ") for _ in range(rng.randint(0, 60)))
+        proposed = []
+        for _ in range(rng.randint(0, 10)):
+            start = rng.randint(0, len(text))
+            end = rng.randint(start, min(len(text), start + 5))
+            proposed.append(EditOp(start, end, "X" * rng.randint(0, 3), rng.randint(0, 2)))
+        edits, _ = resolve_conflicts(proposed)
+        expected = text
+        for edit in reversed(edits):
+            expected = expected[:edit.start] + edit.replacement + expected[edit.end:]
+        enhanced, offset_map = apply_edits(text, edits)
+        assert enhanced == expected
+        # Characters outside every edit keep their identity
+        for position in range(len(text)):
+            if not any(edit.start <= position < edit.end or edit.start == edit.end == position for edit in edits):
+                assert enhanced[offset_map.map(position)] == text[position]
+
+def test_offset_map_spans():
+    text = "the cat run fast"
+    enhanced, offset_map = apply_edits(text, [EditOp(8, 11, "runs"), EditOp(0, 3, "The")])
+    assert enhanced == "The cat runs fast"
+    assert offset_map.map_span(12, 16) == (13, 17)  # after the edits
+    assert offset_map.map_span(8, 11) == (8, 12)  # the replaced word
+    assert offset_map.map_span(9, 10) == (8, 12)  # inside a replacement: widened to cover it
+    assert len(OffsetMap([])) == 0
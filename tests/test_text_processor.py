@@ -1,4 +1,5 @@
 import pytest
+from app import text_processor
 from app.text_processor import TextOptimizer
 from app.exceptions import TextTooShortError, TextTooLongError
 
@@ -26,4 +27,28 @@ def test_preserve_keywords():
     keywords = ["quick", "fox"]
     result, _, _ = optimizer.optimize_text(text, preserve_keywords=keywords)
     assert "quick" in result
-    assert "fox" in result
\ No newline at end of file
+    assert "fox" in result
+
+def test_optimize_text_parses_input_once(monkeypatch):
+    optimizer = TextOptimizer()
+    calls = {"parse": 0, "parse_many": []}
+    parse, parse_many = text_processor.parse, text_processor.parse_many
+
+    def counting_parse(*args, **kwargs):
+        calls["parse"] += 1
+        return parse(*args, **kwargs)
+
+    def counting_parse_many(texts, *args, **kwargs):
+        calls["parse_many"].append(len(texts))
+        return parse_many(texts, *args, **kwargs)
+
+    monkeypatch.setattr(text_processor, "parse", counting_parse)
+    monkeypatch.setattr(text_processor, "parse_many", counting_parse_many)
+    long_sentence = "The committee reviewed the proposal in detail, and the members discussed it at length, " \
+                    "but they could not agree on the budget because the numbers were incomplete."
+    text = f"The cat sat on the mat. {long_sentence} The dog slept."
+    result, metrics, suggestions = optimizer.optimize_text(text, preserve_keywords=["cat"])
+    assert calls["parse"] == 1
+    # Only the one restructured sentence is parsed again
+    assert calls["parse_many"] == [1]
+    assert result.startswith("The cat sat on the mat. ") and result.endswith(" The dog slept.")